@@ -1,7 +1,9 @@
 """
 Caching Library - Cross-Cutting Concern.
 
-Provides in-memory LRU caching with optional TTL support.
+Provides in-memory LRU caching with optional TTL support, an optional
+persistent (sqlite) tier that survives process restarts, and a shared
+stat-validated file content cache.
 Part of the CORE libraries - Tier 2.
 
 Usage:
@@ -35,11 +37,63 @@ Usage:
 
     stats = my_func.cache.stats()
     # {'hits': 50, 'misses': 10, 'hit_rate': 83.3, ...}
+
+    # Byte-weighted eviction (large PLANs cost more than small status dicts)
+    cache = LRUCache(max_size=10_000, max_bytes=50 * 1024 * 1024, name="prompts")
+    cache.stats()  # {..., 'bytes': 1234567, 'max_bytes': 52428800, 'evictions': 3}
+
+    # Custom weigher
+    cache = LRUCache(max_bytes=10_000_000, weigher=lambda lines: sum(map(len, lines)))
+
+    # Long-lived processes: reclaim expired entries in the background
+    cache = LRUCache(max_size=500, ttl=60, name="plan_state", sweep_interval=30)
+    cache.purge_expired()  # Or reclaim on demand
+    cache.stop_sweeper()
+
+    # Coroutines and shared backends (concurrent misses compute once per key;
+    # default keys include the function, so load_plan/aload_plan never collide)
+    plans = LRUCache(max_size=200, name="plans")
+
+    @cached(cache=plans)
+    def load_plan(path: str):
+        ...
+
+    @cached(cache=plans)
+    async def aload_plan(path: str):
+        ...
+
+    # Shared file reads (re-read only when mtime/size change)
+    from core.libraries.caching import read_text, read_head
+    content = read_text(plan_path)
+    header = read_head(doc_path, 50)
+
+    # Persistent second tier (survives process restarts, byte budget enforced)
+    disk = DiskCache("~/.cache/llm/plans.sqlite", max_bytes=32 * 1024 * 1024)
+    cache = LRUCache(max_size=100, name="plans", disk_cache=disk)
+
+    # Opt-in via environment: returns None unless LLM_CACHE_DIR is set
+    @cached(max_size=50, name="plan_cache", disk_cache=get_default_disk_cache("plan_cache"))
+    def parse(path: str):
+        ...
 """
 
-from LLM.core.libraries.caching.lru_cache import LRUCache, cached
+from LLM.core.libraries.caching.disk_cache import DiskCache, get_default_disk_cache
+from LLM.core.libraries.caching.lru_cache import LRUCache, cached, estimate_size
+from LLM.core.libraries.caching.file_cache import (
+    FileContentCache,
+    read_text,
+    read_lines,
+    read_head,
+)
 
 __all__ = [
     "LRUCache",
     "cached",
+    "estimate_size",
+    "DiskCache",
+    "get_default_disk_cache",
+    "FileContentCache",
+    "read_text",
+    "read_lines",
+    "read_head",
 ]
@@ -0,0 +1,286 @@
+"""
+Persistent disk-backed cache tier (sqlite).
+
+Survives process restarts so short-lived CLI runs can reuse results
+computed by earlier invocations. Used standalone or as the second tier
+of an LRUCache.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling the shared persistent cache directory
+CACHE_DIR_ENV = "LLM_CACHE_DIR"
+
+
+class DiskCache:
+    """Thread- and process-safe persistent cache backed by a sqlite file.
+
+    Values are pickled; each entry's size is the length of its pickled blob.
+    When the total size exceeds max_bytes, least recently accessed entries
+    are evicted until the cache fits the budget again.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        name: str = "default",
+    ):
+        """Initialize disk cache.
+
+        Args:
+            path: Path to the sqlite database file (created if missing)
+            max_bytes: Byte budget for all stored values (default: 64 MiB)
+            ttl: Time-to-live in seconds (None = no expiration)
+            name: Name for this cache (for logging)
+
+        Entries can also carry their own time-to-live (see set()); an entry
+        expires when either its own or the cache-wide ttl has passed.
+        """
+        self.path = Path(path)
+        self.max_bytes = max(1, int(max_bytes))
+        self.ttl = ttl
+        self.name = name
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " expires REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)"
+        )
+
+        logger.debug(
+            f"Initialized disk cache '{name}': path={self.path}, "
+            f"max_bytes={self.max_bytes}, ttl={ttl}s"
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get value from cache.
+
+        Args:
+            key: Cache key
+            default: Default value if key not found, expired or unreadable
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created, expires FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return default
+
+            blob, created, expires = row
+            now = time.time()
+            if (expires is not None and now >= expires) or (
+                self.ttl is not None and now - created > self.ttl
+            ):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._misses += 1
+                logger.debug(f"Disk cache '{self.name}' expired key: {key}")
+                return default
+
+            try:
+                value = pickle.loads(blob)
+            except Exception as e:
+                # Stale or incompatible pickle (e.g. class moved) - drop it
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._misses += 1
+                logger.debug(f"Disk cache '{self.name}' dropped unreadable key {key}: {e}")
+                return default
+
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set value in cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache (must be picklable)
+            ttl: Time-to-live of this entry in seconds (None = only the
+                cache-wide ttl applies)
+
+        Returns:
+            True if stored, False if the value is unpicklable or exceeds max_bytes
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Disk cache '{self.name}' cannot pickle key {key}: {e}")
+            return False
+
+        size = len(blob)
+        if size > self.max_bytes:
+            logger.debug(
+                f"Disk cache '{self.name}' skipped key {key}: "
+                f"{size} bytes exceeds budget {self.max_bytes}"
+            )
+            return False
+
+        now = time.time()
+        expires = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, value, size, created, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(blob), size, now, now, expires),
+            )
+            self._enforce_budget()
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete key from cache.
+
+        Args:
+            key: Cache key to delete
+
+        Returns:
+            True if key was deleted, False if not found
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        """Clear all items from cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            logger.debug(f"Disk cache '{self.name}' cleared")
+
+    def size(self) -> int:
+        """Get current number of entries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def total_bytes(self) -> int:
+        """Get total size of stored values in bytes."""
+        with self._lock:
+            return self._total_bytes()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, size, bytes and hit rate
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            hit_rate = (self._hits / lookups * 100) if lookups > 0 else 0.0
+
+            return {
+                "name": self.name,
+                "path": str(self.path),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": count,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hit_rate": hit_rate,
+                "ttl": self.ttl,
+            }
+
+    def close(self) -> None:
+        """Close the underlying sqlite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _total_bytes(self) -> int:
+        """Sum of entry sizes (caller must hold the lock)."""
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently accessed entries until within max_bytes.
+
+        Caller must hold the lock.
+        """
+        excess = self._total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+
+        victims = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed ASC"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        self._evictions += len(victims)
+        logger.debug(
+            f"Disk cache '{self.name}' evicted {len(victims)} entries ({freed} bytes)"
+        )
+
+
+def get_default_disk_cache(
+    name: str, max_bytes: int = 64 * 1024 * 1024
+) -> Optional[DiskCache]:
+    """Get a DiskCache under the directory named by LLM_CACHE_DIR.
+
+    Persistence is opt-in: returns None when LLM_CACHE_DIR is unset or the
+    database cannot be opened, so callers fall back to memory-only caching.
+
+    Args:
+        name: Cache name (also used as the database file name)
+        max_bytes: Byte budget for the cache
+
+    Returns:
+        DiskCache instance or None
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+
+    try:
+        return DiskCache(
+            Path(cache_dir).expanduser() / f"{name}.sqlite",
+            max_bytes=max_bytes,
+            name=name,
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Persistent cache '{name}' unavailable ({e}); using memory only")
+        return None
@@ -0,0 +1,219 @@
+"""
+Stat-validated file content cache.
+
+Shares decoded file contents between the PLAN/SUBPLAN/EXECUTION readers of a
+process. Entries are keyed on (path, st_mtime_ns, st_size), so an edited file
+is re-read on the next access without explicit invalidation.
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from LLM.core.libraries.caching.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+class FileContentCache:
+    """Thread-safe cache of text file contents validated by os.stat().
+
+    Every read costs one stat() call; the file is only opened and decoded
+    when its (mtime_ns, size) changed since the last read.
+
+    Example:
+        files = FileContentCache.get_instance()
+        content = files.read_text(plan_path)
+        lines = files.read_lines(plan_path)      # Like f.readlines()
+        header = files.read_head(plan_path, 50)  # First 50 lines
+    """
+
+    _instance: Optional["FileContentCache"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        max_bytes: int = 64 * 1024 * 1024,
+        name: str = "file_content",
+    ):
+        """Initialize file content cache.
+
+        Args:
+            max_size: Maximum number of files to keep
+            max_bytes: Budget for cached contents (characters, approx. bytes)
+            name: Name for the underlying LRUCache
+        """
+        self._cache = LRUCache(
+            max_size=max_size, max_bytes=max_bytes, weigher=len, name=name
+        )
+
+    @classmethod
+    def get_instance(cls) -> "FileContentCache":
+        """Get the process-wide shared cache.
+
+        Returns:
+            FileContentCache instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = FileContentCache()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Reset shared instance (useful for testing)."""
+        with cls._instance_lock:
+            cls._instance = None
+
+    def read_text(
+        self, path: PathLike, encoding: str = "utf-8", errors: Optional[str] = None
+    ) -> str:
+        """Read a file's full text, served from cache when unchanged.
+
+        Args:
+            path: File path
+            encoding: Text encoding (default: utf-8)
+            errors: Decoding error handler (as for open())
+
+        Returns:
+            File contents (newlines translated as in text-mode open())
+
+        Raises:
+            OSError: If the file cannot be stat'ed or read (e.g. FileNotFoundError)
+        """
+        path_str = os.path.abspath(os.fspath(path))
+        st = os.stat(path_str)
+        key = self._make_key(path_str, st, encoding, errors)
+
+        content = self._cache.get(key)
+        if content is not None:
+            return content
+
+        with open(path_str, "r", encoding=encoding, errors=errors) as f:
+            content = f.read()
+            # Key on the stat of the handle actually read (file may have changed)
+            key = self._make_key(path_str, os.fstat(f.fileno()), encoding, errors)
+
+        logger.debug(f"File cache read {path_str} ({len(content)} chars)")
+        self._cache.set(key, content)
+        return content
+
+    def read_lines(
+        self, path: PathLike, encoding: str = "utf-8", errors: Optional[str] = None
+    ) -> List[str]:
+        """Read a file's lines with line endings kept (like f.readlines()).
+
+        Args:
+            path: File path
+            encoding: Text encoding (default: utf-8)
+            errors: Decoding error handler
+
+        Returns:
+            List of lines
+        """
+        return _split_lines(self.read_text(path, encoding, errors))
+
+    def read_head(
+        self,
+        path: PathLike,
+        n: int,
+        encoding: str = "utf-8",
+        errors: Optional[str] = None,
+    ) -> List[str]:
+        """Read the first n lines of a file (like f.readlines()[:n]).
+
+        Args:
+            path: File path
+            n: Number of lines
+            encoding: Text encoding (default: utf-8)
+            errors: Decoding error handler
+
+        Returns:
+            Up to n lines with line endings kept
+        """
+        if n <= 0:
+            return []
+
+        text = self.read_text(path, encoding, errors)
+        # Only split the prefix we need
+        end = -1
+        for _ in range(n):
+            end = text.find("\n", end + 1)
+            if end == -1:
+                break
+        head = text if end == -1 else text[: end + 1]
+        return _split_lines(head)
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        """Drop cached contents.
+
+        Stat validation makes this unnecessary for normal edits; use it for
+        writes that preserve mtime and size.
+
+        Args:
+            path: File to drop (None = drop everything)
+        """
+        if path is None:
+            self._cache.clear()
+            return
+
+        prefix = f"{os.path.abspath(os.fspath(path))}\0"
+        for key in self._cache.keys():
+            if key.startswith(prefix):
+                self._cache.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics (see LRUCache.stats)."""
+        return self._cache.stats()
+
+    @staticmethod
+    def _make_key(
+        path_str: str, st: os.stat_result, encoding: str, errors: Optional[str]
+    ) -> str:
+        """Build cache key from path, stat identity and decoding options."""
+        return f"{path_str}\0{st.st_mtime_ns}\0{st.st_size}\0{encoding}\0{errors}"
+
+
+def _split_lines(text: str) -> List[str]:
+    """Split text into lines keeping "\\n", matching file.readlines()."""
+    lines = text.split("\n")
+    result = [line + "\n" for line in lines[:-1]]
+    if lines[-1]:
+        result.append(lines[-1])
+    return result
+
+
+def read_text(
+    path: PathLike, encoding: str = "utf-8", errors: Optional[str] = None
+) -> str:
+    """Read a file through the shared FileContentCache.
+
+    Args:
+        path: File path
+        encoding: Text encoding (default: utf-8)
+        errors: Decoding error handler
+
+    Returns:
+        File contents
+    """
+    return FileContentCache.get_instance().read_text(path, encoding, errors)
+
+
+def read_lines(
+    path: PathLike, encoding: str = "utf-8", errors: Optional[str] = None
+) -> List[str]:
+    """Read a file's lines through the shared FileContentCache."""
+    return FileContentCache.get_instance().read_lines(path, encoding, errors)
+
+
+def read_head(
+    path: PathLike, n: int, encoding: str = "utf-8", errors: Optional[str] = None
+) -> List[str]:
+    """Read the first n lines of a file through the shared FileContentCache."""
+    return FileContentCache.get_instance().read_head(path, n, encoding, errors)
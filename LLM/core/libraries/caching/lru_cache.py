@@ -1,43 +1,155 @@
 """
-LRU Cache implementation with TTL support.
+LRU Cache implementation with TTL support and an optional persistent tier.
 """
 
+import sys
 import time
+import asyncio
+import inspect
 import logging
 import threading
-from typing import Any, Optional, Dict, Callable
-from collections import OrderedDict
+import weakref
+from typing import Any, Optional, Deque, Dict, Callable, List, Tuple
+from collections import OrderedDict, deque
+from concurrent.futures import Future
 from functools import wraps
 
+from LLM.core.libraries.caching.disk_cache import DiskCache
+from LLM.core.libraries.metrics.registry import MetricRegistry
+
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a value in bytes.
+
+    str/bytes are weighed by length; other objects by a sys.getsizeof walk
+    over containers and instance attributes (shared objects counted once).
+
+    Args:
+        value: Value to weigh
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+
+    return total
+
+
+class _CacheEntry:
+    """Compact cache entry (no per-entry dict)."""
+
+    __slots__ = ("value", "weight", "expires_at")
+
+    def __init__(self, value: Any, weight: int, expires_at: Optional[float]):
+        self.value = value
+        self.weight = weight
+        self.expires_at = expires_at
+
 
 class LRUCache:
     """Thread-safe LRU cache with optional TTL (Time-To-Live).
 
     Implements Least Recently Used eviction policy. When the cache is full,
     the least recently used item is evicted.
+
+    With max_bytes set, entries are also weighed (by weigher, default
+    estimate_size) and least recently used items are evicted until the
+    total weight fits the budget.
+
+    Expiry: all entries share one TTL, so expiry times are monotonic in
+    insertion order and are indexed by a FIFO queue. Expired entries are
+    reclaimed in O(1) amortized time on every set(), in bulk by
+    purge_expired(), and optionally by a background daemon sweeper.
+
+    An optional DiskCache acts as a second tier: writes go through to disk,
+    and memory misses are served from disk (and promoted) when possible.
+    Disk entries expire after disk_ttl, independently of ttl, so a short
+    in-memory ttl does not cut the disk tier's lifetime across runs.
+
+    Every cache publishes its hits/misses (cache_operations_total), evictions,
+    expirations and current size to the MetricRegistry, labelled by name, so
+    they appear in export_prometheus_text().
     """
 
     def __init__(
-        self, max_size: int = 1000, ttl: Optional[float] = None, name: str = "default"
+        self,
+        max_size: int = 1000,
+        ttl: Optional[float] = None,
+        name: str = "default",
+        disk_cache: Optional[DiskCache] = None,
+        max_bytes: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+        sweep_interval: Optional[float] = None,
+        disk_ttl: Optional[float] = None,
     ):
         """Initialize LRU cache.
 
         Args:
             max_size: Maximum number of items to store
             ttl: Time-to-live in seconds (None = no expiration)
-            name: Name for this cache (for logging)
+            name: Name for this cache (for logging and metric labels)
+            disk_cache: Optional persistent second tier
+            max_bytes: Optional weight budget in bytes (None = count-only limit)
+            weigher: Function returning an entry's weight in bytes
+                (default: estimate_size; weights are only tracked when
+                max_bytes or weigher is given)
+            sweep_interval: If set (and ttl is set), start a daemon thread that
+                purges expired entries every sweep_interval seconds
+            disk_ttl: Time-to-live in seconds of disk tier entries (None = only
+                the DiskCache's own ttl applies)
         """
         self.max_size = max(1, max_size)
         self.ttl = ttl
+        self.disk_ttl = disk_ttl
         self.name = name
-        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.disk_cache = disk_cache
+        self.max_bytes = max(1, int(max_bytes)) if max_bytes is not None else None
+        self.weigher = weigher or (estimate_size if max_bytes is not None else None)
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
+        # (expires_at, key, entry) in expiry order; stale records are skipped lazily
+        self._expiry_queue: Deque[Tuple[float, str, _CacheEntry]] = deque()
         self._lock = threading.Lock()
         self._hits = 0
         self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._bytes = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+        self._init_metrics()
+
+        logger.debug(
+            f"Initialized LRU cache '{name}': max_size={max_size}, "
+            f"max_bytes={max_bytes}, ttl={ttl}s"
+        )
 
-        logger.debug(f"Initialized LRU cache '{name}': max_size={max_size}, ttl={ttl}s")
+        if sweep_interval is not None:
+            self.start_sweeper(sweep_interval)
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache.
@@ -50,26 +162,48 @@ class LRUCache:
             Cached value or default
         """
         with self._lock:
-            if key not in self._cache:
+            entry = self._cache.get(key)
+            if entry is not None:
+                # Check TTL expiration
+                if entry.expires_at is not None and time.monotonic() >= entry.expires_at:
+                    # Expired - remove and fall through to the disk tier
+                    self._remove(key)
+                    self._expirations += 1
+                    self._record_expirations(1)
+                    self._publish_size()
+                    logger.debug(f"Cache '{self.name}' expired key: {key}")
+                else:
+                    # Move to end (most recently used)
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    self._record_lookup(self._hit_labels)
+                    return entry.value
+
+            if self.disk_cache is None:
                 self._misses += 1
+                self._record_lookup(self._miss_labels)
                 return default
 
-            entry = self._cache[key]
-
-            # Check TTL expiration
-            if self.ttl is not None:
-                age = time.time() - entry["timestamp"]
-                if age > self.ttl:
-                    # Expired - remove and return default
-                    del self._cache[key]
-                    self._misses += 1
-                    logger.debug(f"Cache '{self.name}' expired key: {key}")
-                    return default
+        # Disk lookup happens outside the lock so memory hits are never blocked on I/O
+        value = self.disk_cache.get(key, _MISSING)
+        if value is _MISSING:
+            with self._lock:
+                self._misses += 1
+                self._record_lookup(self._miss_labels)
+            return default
 
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
+        weight = self._weigh(value)
+        with self._lock:
             self._hits += 1
-            return entry["value"]
+            self._record_lookup(self._hit_labels)
+            entry = self._cache.get(key)
+            if entry is not None and (
+                entry.expires_at is None or time.monotonic() < entry.expires_at
+            ):
+                # A set() landed while we read the disk; keep its newer value
+                return entry.value
+            self._store(key, value, weight)
+        return value
 
     def set(self, key: str, value: Any) -> None:
         """Set value in cache.
@@ -78,26 +212,173 @@ class LRUCache:
             key: Cache key
             value: Value to cache
         """
+        # Weigh outside the lock - walking large values can be slow
+        weight = self._weigh(value)
         with self._lock:
-            if key in self._cache:
-                # Update existing - move to end
-                self._cache[key] = {
-                    "value": value,
-                    "timestamp": time.time(),
-                }
-                self._cache.move_to_end(key)
-            else:
-                # Add new entry
-                if len(self._cache) >= self.max_size:
-                    # Evict least recently used (first item)
-                    evicted_key = next(iter(self._cache))
-                    del self._cache[evicted_key]
-                    logger.debug(f"Cache '{self.name}' evicted key: {evicted_key}")
-
-                self._cache[key] = {
-                    "value": value,
-                    "timestamp": time.time(),
-                }
+            self._store(key, value, weight)
+
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, value, ttl=self.disk_ttl)
+
+    def purge_expired(self) -> int:
+        """Remove all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            return self._purge_expired(time.monotonic())
+
+    def start_sweeper(self, interval: float) -> None:
+        """Start a daemon thread that purges expired entries periodically.
+
+        No-op if the cache has no TTL or a sweeper is already running.
+
+        Args:
+            interval: Seconds between sweeps
+        """
+        if self.ttl is None or (self._sweeper is not None and self._sweeper.is_alive()):
+            return
+
+        self._sweeper_stop.clear()
+        # Hold only a weak reference so an abandoned cache can still be collected
+        self._sweeper = threading.Thread(
+            target=_sweep_loop,
+            args=(weakref.ref(self), self._sweeper_stop, max(0.01, interval)),
+            name=f"lru-cache-sweeper-{self.name}",
+            daemon=True,
+        )
+        self._sweeper.start()
+        logger.debug(f"Cache '{self.name}' sweeper started (interval={interval}s)")
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper (if running)."""
+        self._sweeper_stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1.0)
+            self._sweeper = None
+
+    def _init_metrics(self) -> None:
+        """Look up the shared cache metrics and pre-build this cache's labels."""
+        registry = MetricRegistry.get_instance()
+        self._operations_metric = registry.get("cache_operations_total")
+        self._evictions_metric = registry.get("cache_evictions_total")
+        self._expirations_metric = registry.get("cache_expirations_total")
+        self._entries_metric = registry.get("cache_entries")
+        self._bytes_metric = registry.get("cache_bytes")
+
+        self._name_labels = {"cache_name": self.name}
+        self._hit_labels = {
+            "cache_name": self.name,
+            "operation": "get",
+            "result": "hit",
+        }
+        self._miss_labels = {
+            "cache_name": self.name,
+            "operation": "get",
+            "result": "miss",
+        }
+
+    def _record_lookup(self, labels: Dict[str, str]) -> None:
+        """Count a hit or miss (caller must hold the lock)."""
+        if self._operations_metric is not None:
+            self._operations_metric.inc(labels=labels)
+
+    def _record_expirations(self, count: int) -> None:
+        """Count expired entries (caller must hold the lock)."""
+        if self._expirations_metric is not None:
+            self._expirations_metric.inc(count, labels=self._name_labels)
+
+    def _publish_size(self) -> None:
+        """Update the size gauges (caller must hold the lock)."""
+        if self._entries_metric is not None:
+            self._entries_metric.set(len(self._cache), labels=self._name_labels)
+        if self._bytes_metric is not None and self.weigher is not None:
+            self._bytes_metric.set(self._bytes, labels=self._name_labels)
+
+    def _weigh(self, value: Any) -> int:
+        """Weigh a value (0 when weights are not tracked)."""
+        if self.weigher is None:
+            return 0
+        try:
+            return max(0, int(self.weigher(value)))
+        except Exception as e:
+            logger.warning(f"Cache '{self.name}' weigher failed: {e}")
+            return estimate_size(value)
+
+    def _store(self, key: str, value: Any, weight: int) -> None:
+        """Insert or refresh an in-memory entry (caller must hold the lock)."""
+        if key in self._cache:
+            self._remove(key)
+
+        expires_at = None
+        if self.ttl is not None:
+            now = time.monotonic()
+            # Amortized O(1): reclaim whatever has expired at the queue head
+            self._purge_expired(now)
+            expires_at = now + self.ttl
+
+        if self.max_bytes is not None and weight > self.max_bytes:
+            # Would evict everything and still not fit - keep it out of memory
+            logger.debug(
+                f"Cache '{self.name}' skipped key {key}: "
+                f"{weight} bytes exceeds budget {self.max_bytes}"
+            )
+            self._publish_size()
+            return
+
+        # Evict least recently used (first items) until the new entry fits
+        while self._cache and (
+            len(self._cache) >= self.max_size
+            or (self.max_bytes is not None and self._bytes + weight > self.max_bytes)
+        ):
+            evicted_key = next(iter(self._cache))
+            self._remove(evicted_key)
+            self._evictions += 1
+            if self._evictions_metric is not None:
+                self._evictions_metric.inc(labels=self._name_labels)
+            logger.debug(f"Cache '{self.name}' evicted key: {evicted_key}")
+
+        entry = _CacheEntry(value, weight, expires_at)
+        self._cache[key] = entry
+        self._bytes += weight
+
+        if expires_at is not None:
+            self._expiry_queue.append((expires_at, key, entry))
+            # Refreshed/deleted keys leave stale records behind; keep the queue bounded
+            if len(self._expiry_queue) > 2 * len(self._cache) + 64:
+                self._expiry_queue = deque(
+                    record
+                    for record in self._expiry_queue
+                    if self._cache.get(record[1]) is record[2]
+                )
+
+        self._publish_size()
+
+    def _remove(self, key: str) -> Optional[_CacheEntry]:
+        """Remove an entry and release its weight (caller must hold the lock)."""
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.weight
+        return entry
+
+    def _purge_expired(self, now: float) -> int:
+        """Pop expired records from the queue head (caller must hold the lock)."""
+        queue = self._expiry_queue
+        removed = 0
+        while queue and queue[0][0] <= now:
+            _, key, entry = queue.popleft()
+            # Skip stale records (key refreshed, evicted or deleted since)
+            if self._cache.get(key) is entry:
+                self._remove(key)
+                removed += 1
+
+        if removed:
+            self._expirations += removed
+            self._record_expirations(removed)
+            self._publish_size()
+            logger.debug(f"Cache '{self.name}' purged {removed} expired entries")
+        return removed
 
     def delete(self, key: str) -> bool:
         """Delete key from cache.
@@ -109,58 +390,114 @@ class LRUCache:
             True if key was deleted, False if not found
         """
         with self._lock:
-            if key in self._cache:
-                del self._cache[key]
-                return True
-            return False
+            deleted = self._remove(key) is not None
+            self._publish_size()
+
+        if self.disk_cache is not None:
+            deleted = self.disk_cache.delete(key) or deleted
+        return deleted
 
     def clear(self) -> None:
-        """Clear all items from cache."""
+        """Clear all items from cache (including the disk tier)."""
         with self._lock:
             self._cache.clear()
+            self._expiry_queue.clear()
             self._hits = 0
             self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
+            self._bytes = 0
+            self._publish_size()
             logger.debug(f"Cache '{self.name}' cleared")
 
+        if self.disk_cache is not None:
+            self.disk_cache.clear()
+
     def size(self) -> int:
         """Get current cache size."""
         with self._lock:
             return len(self._cache)
 
+    def keys(self) -> List[str]:
+        """Get a snapshot of in-memory keys (least recently used first)."""
+        with self._lock:
+            return list(self._cache)
+
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics.
 
         Returns:
-            Dictionary with hits, misses, size, and hit rate
+            Dictionary with hits, misses, evictions, expirations, size, bytes
+            and hit rate (bytes is None when weights are not tracked; a "disk"
+            entry with tier stats is added when a disk tier is attached)
         """
         with self._lock:
             total = self._hits + self._misses
             hit_rate = (self._hits / total * 100) if total > 0 else 0.0
 
-            return {
+            stats = {
                 "name": self.name,
                 "hits": self._hits,
                 "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
                 "size": len(self._cache),
                 "max_size": self.max_size,
+                "bytes": self._bytes if self.weigher is not None else None,
+                "max_bytes": self.max_bytes,
                 "hit_rate": hit_rate,
                 "ttl": self.ttl,
             }
 
+        if self.disk_cache is not None:
+            stats["disk"] = self.disk_cache.stats()
+        return stats
+
+
+def _sweep_loop(
+    cache_ref: "weakref.ref[LRUCache]", stop: threading.Event, interval: float
+) -> None:
+    """Background sweeper body: purge expired entries until stopped or collected."""
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        try:
+            cache.purge_expired()
+        except Exception as e:
+            logger.warning(f"Cache '{cache.name}' sweep failed: {e}")
+        del cache
+
 
 def cached(
     max_size: int = 1000,
     ttl: Optional[float] = None,
     key_func: Optional[Callable] = None,
     name: Optional[str] = None,
+    disk_cache: Optional[DiskCache] = None,
+    cache: Optional[LRUCache] = None,
+    max_bytes: Optional[int] = None,
+    sweep_interval: Optional[float] = None,
+    disk_ttl: Optional[float] = None,
 ):
     """Decorator to cache function results.
 
+    Works on plain functions and on ``async def`` coroutine functions. Concurrent
+    misses on the same key are single-flight: the first caller computes the
+    value while the others wait for (and share) its result or exception.
+
     Args:
         max_size: Maximum cache size
         ttl: Time-to-live in seconds
         key_func: Optional function to generate cache key from args/kwargs
         name: Optional name for the cache
+        disk_cache: Optional persistent second tier (results must be picklable)
+        cache: Optional existing LRUCache to share between decorated functions
+            (overrides all cache construction arguments); default keys are
+            then prefixed with the function's module and qualified name
+        max_bytes: Optional weight budget in bytes (see LRUCache)
+        sweep_interval: Optional background sweep interval for expired entries
+        disk_ttl: Time-to-live in seconds of disk tier entries (see LRUCache)
 
     Usage:
         @cached(max_size=100, ttl=3600)
@@ -172,9 +509,24 @@ def cached(
         def get_user(user_id):
             # Custom cache key
             ...
+
+        @cached(max_size=100)
+        async def fetch_plan(path):
+            # Coroutines are awaited once per key; concurrent awaiters share it
+            ...
     """
-    cache_name = name or "decorator"
-    cache = LRUCache(max_size=max_size, ttl=ttl, name=cache_name)
+    # A shared cache holds several functions' results: keep their keys apart
+    namespaced = cache is not None and key_func is None
+    if cache is None:
+        cache = LRUCache(
+            max_size=max_size,
+            ttl=ttl,
+            name=name or "decorator",
+            disk_cache=disk_cache,
+            max_bytes=max_bytes,
+            sweep_interval=sweep_interval,
+            disk_ttl=disk_ttl,
+        )
 
     def _default_key_func(*args, **kwargs):
         """Generate cache key from function arguments."""
@@ -184,31 +536,108 @@ def cached(
 
     key_generator = key_func or _default_key_func
 
+    def _make_key(func, args, kwargs) -> Any:
+        """Generate cache key, or _MISSING if key generation fails."""
+        try:
+            key = key_generator(*args, **kwargs)
+            if namespaced:
+                key = f"{func.__module__}.{func.__qualname__}:{key}"
+            return key
+        except Exception as e:
+            logger.warning(f"Cache key generation failed for {func.__name__}: {e}")
+            return _MISSING
+
     def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            return _async_decorator(func)
+
+        # Single-flight: concurrent misses on one key wait for the first caller
+        in_flight: Dict[str, Future] = {}
+        in_flight_lock = threading.Lock()
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Generate cache key
-            try:
-                cache_key = key_generator(*args, **kwargs)
-            except Exception as e:
-                logger.warning(f"Cache key generation failed for {func.__name__}: {e}")
+            cache_key = _make_key(func, args, kwargs)
+            if cache_key is _MISSING:
                 # Bypass cache if key generation fails
                 return func(*args, **kwargs)
 
             # Check cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
+            cached_value = cache.get(cache_key, _MISSING)
+            if cached_value is not _MISSING:
                 logger.debug(f"Cache hit for {func.__name__}: {cache_key}")
                 return cached_value
 
+            with in_flight_lock:
+                future = in_flight.get(cache_key)
+                is_leader = future is None
+                if is_leader:
+                    future = Future()
+                    in_flight[cache_key] = future
+
+            if not is_leader:
+                logger.debug(f"Waiting on in-flight call for {func.__name__}: {cache_key}")
+                return future.result()
+
             # Call function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result)
-            logger.debug(f"Cached result for {func.__name__}: {cache_key}")
-            return result
+            try:
+                # A leader that just finished may have filled the cache between
+                # our miss and taking leadership
+                result = cache.get(cache_key, _MISSING)
+                if result is not _MISSING:
+                    future.set_result(result)
+                    return result
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            else:
+                cache.set(cache_key, result)
+                future.set_result(result)
+                logger.debug(f"Cached result for {func.__name__}: {cache_key}")
+                return result
+            finally:
+                with in_flight_lock:
+                    in_flight.pop(cache_key, None)
 
         # Attach cache for inspection
         wrapper.cache = cache
         return wrapper
 
+    def _async_decorator(func):
+        # In-flight tasks keyed by (event loop, cache key) - futures are loop-bound
+        in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Future] = {}
+
+        def _on_done(flight_key, task: asyncio.Future) -> None:
+            in_flight.pop(flight_key, None)
+            if not task.cancelled() and task.exception() is None:
+                cache.set(flight_key[1], task.result())
+                logger.debug(f"Cached result for {func.__name__}: {flight_key[1]}")
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = _make_key(func, args, kwargs)
+            if cache_key is _MISSING:
+                return await func(*args, **kwargs)
+
+            cached_value = cache.get(cache_key, _MISSING)
+            if cached_value is not _MISSING:
+                logger.debug(f"Cache hit for {func.__name__}: {cache_key}")
+                return cached_value
+
+            flight_key = (asyncio.get_running_loop(), cache_key)
+            task = in_flight.get(flight_key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                in_flight[flight_key] = task
+                task.add_done_callback(lambda t: _on_done(flight_key, t))
+            else:
+                logger.debug(f"Waiting on in-flight call for {func.__name__}: {cache_key}")
+
+            # Shield so one cancelled caller does not cancel the shared computation
+            return await asyncio.shield(task)
+
+        wrapper.cache = cache
+        return wrapper
+
     return decorator
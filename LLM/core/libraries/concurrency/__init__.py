@@ -24,6 +24,42 @@ Usage:
         desc="Processing items"
     )
 
+    # Streaming over a generator/cursor with bounded memory
+    for chunk, result in iter_concurrent_map(
+        chunk_cursor,
+        process_item,
+        max_workers=10,
+        max_in_flight=50,   # Backpressure: at most 50 queued tasks
+        order_window=100,   # Optional: yield in input order
+    ):
+        save(chunk, result)
+
+    # Helpers reuse process-wide shared thread pools; size or stop them with
+    ExecutorRegistry.get_instance().configure("tpm", max_workers=300)
+    shutdown_shared_executors()  # Graceful shutdown (waits for running tasks)
+
+    # asyncio counterparts (coroutines instead of threads, e.g. AsyncOpenAI)
+    results = await arun_concurrent_map(chunks, aextract, max_concurrency=500)
+    results = await arun_llm_concurrent(
+        chunks=chunks,
+        agent_factory=lambda: MyAsyncAgent(),
+        method_name='aprocess',
+        max_concurrency=500,
+        qps=50
+    )
+    pairs = await arun_with_tpm(chunks, aextract, estimate_tokens_fn=estimate)
+
+    # Resumable runs: outcomes are journaled; a rerun skips items already done
+    checkpoint = CheckpointStore("runs/extraction.sqlite", name="extraction")
+    pairs = run_concurrent_with_tpm(
+        chunks,
+        extract,
+        estimate_tokens_fn=estimate,
+        checkpoint=checkpoint,
+        item_id_fn=lambda chunk: chunk["chunk_id"],
+    )
+    failed = [(c, r.error) for c, r in pairs if isinstance(r, ItemFailure)]
+
     # LLM concurrent calls with retry and throttling
     results = run_llm_concurrent(
         chunks=chunks,
@@ -36,15 +72,39 @@ Usage:
 """
 
 from LLM.core.libraries.concurrency.executor import (
+    iter_concurrent_map,
     run_concurrent_map,
     run_concurrent_with_limit,
     run_llm_concurrent,
 )
-from LLM.core.libraries.concurrency.tpm_processor import run_concurrent_with_tpm
+from LLM.core.libraries.concurrency.pools import (
+    ExecutorRegistry,
+    get_shared_executor,
+    shutdown_shared_executors,
+)
+from LLM.core.libraries.concurrency.checkpoint import CheckpointStore
+from LLM.core.libraries.concurrency.tpm_processor import (
+    ItemFailure,
+    run_concurrent_with_tpm,
+)
+from LLM.core.libraries.concurrency.async_executor import (
+    arun_concurrent_map,
+    arun_llm_concurrent,
+    arun_with_tpm,
+)
 
 __all__ = [
+    "iter_concurrent_map",
     "run_concurrent_map",
     "run_concurrent_with_limit",
     "run_llm_concurrent",
     "run_concurrent_with_tpm",
+    "ItemFailure",
+    "CheckpointStore",
+    "ExecutorRegistry",
+    "get_shared_executor",
+    "shutdown_shared_executors",
+    "arun_concurrent_map",
+    "arun_llm_concurrent",
+    "arun_with_tpm",
 ]
@@ -0,0 +1,266 @@
+"""
+Asyncio execution helpers (coroutine counterparts of executor/tpm_processor).
+
+I/O-bound work such as AsyncOpenAI calls runs as coroutines on one event
+loop, bounded by semaphores, so thousands of in-flight calls do not need
+thousands of threads.
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from LLM.core.libraries.concurrency.tpm_processor import (
+    ItemFailure,
+    _succeeded,
+    _usage_total_tokens,
+)
+from LLM.core.libraries.metrics.tokens import capture_usage, estimate_item_tokens
+from LLM.core.libraries.rate_limiting import TPMLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class _AsyncThrottle:
+    """Spaces call starts at least 1/rate seconds apart across all coroutines."""
+
+    def __init__(self, rate_per_second: Optional[float]):
+        self.min_interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next_ts = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait for the next free slot (slots are claimed under the lock)."""
+        if self.min_interval <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_ts)
+            self._next_ts = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def arun_concurrent_map(
+    items: Sequence[Any],
+    worker_fn: Callable[[Any], Awaitable[Any]],
+    max_concurrency: int = 100,
+    preserve_order: bool = True,
+    on_error: Optional[Callable[[Exception, Any], Any]] = None,
+    desc: Optional[str] = None,
+) -> List[Any]:
+    """Await worker_fn over items with bounded concurrency.
+
+    Args:
+        items: Items to process
+        worker_fn: Coroutine function to apply to each item
+        max_concurrency: Maximum number of coroutines running worker_fn at once
+        preserve_order: If True, returns results in same order as items
+            (otherwise in completion order)
+        on_error: Error handler that can return fallback value
+        desc: Optional description for logging
+
+    Returns:
+        List of results in same order as input (if preserve_order=True)
+
+    Example:
+        results = await arun_concurrent_map(chunks, extract, max_concurrency=200)
+    """
+    if desc:
+        logger.debug(f"Starting async processing: {desc} ({len(items)} items)")
+
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency or 1)))
+    completed: List[Any] = []
+
+    async def _run(item: Any) -> Any:
+        async with semaphore:
+            try:
+                res = await worker_fn(item)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                res = on_error(e, item)
+        completed.append(res)
+        return res
+
+    tasks = [asyncio.ensure_future(_run(item)) for item in items]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # First failure (or cancellation): stop the remaining work
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    if desc:
+        logger.debug(f"Completed async processing: {desc}")
+
+    return list(results) if preserve_order else completed
+
+
+async def arun_llm_concurrent(
+    chunks: Sequence[Any],
+    agent_factory: Callable[[], Any],
+    method_name: str,
+    max_concurrency: int = 100,
+    retries: int = 1,
+    backoff_s: float = 0.5,
+    qps: Optional[float] = None,
+    jitter: bool = False,
+    on_error: Optional[Callable[[Exception, Any], Any]] = None,
+    preserve_order: bool = True,
+) -> List[Any]:
+    """Concurrent async LLM calls with retries, QPS throttle, and ordering.
+
+    Async counterpart of run_llm_concurrent(). The agent's method must be a
+    coroutine function (e.g. awaiting acall_llm with an AsyncOpenAI client).
+
+    Args:
+        chunks: Items to process
+        agent_factory: Factory function that returns an agent; called once and
+            shared by all coroutines (they interleave on one thread)
+        method_name: Name of the async method to call on the agent
+        max_concurrency: Maximum number of in-flight calls
+        retries: Number of retries per item
+        backoff_s: Initial backoff in seconds
+        qps: Optional queries per second limit (shared by all calls)
+        jitter: Whether to add jitter to backoff
+        on_error: Error handler for failed items
+        preserve_order: If True, returns results in same order as input
+
+    Returns:
+        List of results
+    """
+    agent = agent_factory()
+    method = getattr(agent, method_name)
+    throttle = _AsyncThrottle(qps if qps and qps > 0 else None)
+
+    async def _worker(chunk: Any) -> Any:
+        """Worker coroutine with retry logic."""
+        attempt = 0
+        while True:
+            try:
+                await throttle.wait()
+                return await method(chunk)
+            except Exception as e:
+                attempt += 1
+                if attempt > max(0, retries):
+                    if on_error:
+                        return on_error(e, chunk)
+                    raise
+
+                sleep_s = backoff_s * (2 ** (attempt - 1))
+                if jitter:
+                    sleep_s *= 0.75 + random.random() * 0.5
+                await asyncio.sleep(sleep_s)
+
+    return await arun_concurrent_map(
+        chunks,
+        _worker,
+        max_concurrency=max_concurrency,
+        preserve_order=preserve_order,
+    )
+
+
+async def arun_with_tpm(
+    items: List[Any],
+    processor_fn: Callable[[Any], Awaitable[Any]],
+    estimate_tokens_fn: Optional[Callable[[Any], int]] = None,
+    max_concurrency: int = 300,
+    target_tpm: int = 950000,
+    target_rpm: int = 20000,
+    limiter_name: str = "default",
+    progress_name: str = "items",
+    log_every: Optional[int] = None,
+    actual_tokens_fn: Optional[Callable[[Any], Optional[int]]] = None,
+) -> List[Tuple[Any, Any]]:
+    """Process items as coroutines with TPM/RPM limits.
+
+    Async counterpart of run_concurrent_with_tpm(): slots are refilled
+    continuously, each item reserves its estimated tokens before running and
+    is reconciled with its actual usage (the result's own usage if it
+    carries one, else the usage of the acall_llm calls processor_fn made),
+    and failures yield an ItemFailure.
+
+    Args:
+        items: List of items to process
+        processor_fn: Coroutine function processing each item
+        estimate_tokens_fn: Function to estimate tokens for an item
+            (default: metrics.tokens.estimate_item_tokens)
+        max_concurrency: Maximum in-flight items
+        target_tpm: Target tokens per minute
+        target_rpm: Target requests per minute
+        limiter_name: Name for rate limiters (for logging)
+        progress_name: Name for progress logging (e.g., "chunks")
+        log_every: Log progress every N completed items
+            (default: max_concurrency * 2, max 1000)
+        actual_tokens_fn: Function returning actual tokens used from a result
+            (default: its usage.total_tokens if present); when it returns
+            None, the usage captured from processor_fn's LLM calls is used
+
+    Returns:
+        List of (item, result) tuples in original order
+    """
+    if not items:
+        return []
+
+    if estimate_tokens_fn is None:
+        estimate_tokens_fn = estimate_item_tokens
+
+    total = len(items)
+    log_every = log_every or min(max_concurrency * 2, 1000)
+    logger.info(
+        f"[{limiter_name}] Processing {total} {progress_name} with "
+        f"{max_concurrency} coroutines (TPM={target_tpm:,}, RPM={target_rpm})"
+    )
+
+    tpm_limiter = TPMLimiter(tpm=target_tpm, name=limiter_name)
+    rpm_throttle = _AsyncThrottle(max(1, target_rpm) / 60.0)
+    get_actual_tokens = actual_tokens_fn or _usage_total_tokens
+    overall_start = time.time()
+    done = 0
+    successful = 0
+
+    async def process_with_tracking(item: Any) -> Tuple[Any, Any]:
+        """Process item with TPM/RPM tracking."""
+        nonlocal done, successful
+        try:
+            reservation = await tpm_limiter.areserve(estimate_tokens_fn(item))
+            await rpm_throttle.wait()
+            with capture_usage() as usage:
+                result = await processor_fn(item)
+            try:
+                actual = get_actual_tokens(result)
+                if actual is None and usage.calls:
+                    actual = usage.total_tokens
+                tpm_limiter.reconcile(reservation, actual)
+            except Exception as e:
+                logger.debug(f"[{limiter_name}] Could not read token usage: {e}")
+        except Exception as e:
+            logger.error(f"[{limiter_name}] Error processing item: {e}")
+            result = ItemFailure(e)
+
+        done += 1
+        if _succeeded(result):
+            successful += 1
+        if done % log_every == 0:
+            logger.info(
+                f"[{limiter_name}] Progress: {done}/{total} {progress_name} "
+                f"({tpm_limiter.current_usage()/1000:.0f}k TPM, "
+                f"{successful} successful)"
+            )
+        return item, result
+
+    results = await arun_concurrent_map(
+        items, process_with_tracking, max_concurrency=max_concurrency
+    )
+
+    overall_elapsed = time.time() - overall_start
+    logger.info(
+        f"[{limiter_name}] Complete: {successful}/{total} {progress_name} "
+        f"in {overall_elapsed:.1f}s ({overall_elapsed/60:.1f} minutes)"
+    )
+    return results
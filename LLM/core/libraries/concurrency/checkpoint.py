@@ -0,0 +1,187 @@
+"""
+Checkpoint journal for resumable bulk processing.
+
+Long run_concurrent_with_tpm jobs record each item's outcome as it
+completes, so a crashed or interrupted run can be resumed without paying
+again for the items that already succeeded.
+"""
+
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class CheckpointStore:
+    """Thread- and process-safe journal of per-item results (sqlite file).
+
+    Each item id maps to its latest outcome: "done" with the pickled result,
+    or "failed" with the error message and the number of failed attempts.
+    Writes are committed one by one, so everything recorded before a crash
+    survives it.
+
+    Example:
+        checkpoint = CheckpointStore("runs/extraction.sqlite", name="extraction")
+
+        results = run_concurrent_with_tpm(
+            chunks,
+            extract,
+            estimate_tokens,
+            checkpoint=checkpoint,
+            item_id_fn=lambda chunk: chunk["chunk_id"],
+        )
+        # After a crash, the same call skips chunks already done and
+        # re-queues the failed ones
+    """
+
+    def __init__(self, path: Union[str, Path], name: str = "default"):
+        """Initialize checkpoint store.
+
+        Args:
+            path: Path to the sqlite database file (created if missing)
+            name: Name for this checkpoint (for logging)
+        """
+        self.path = Path(path)
+        self.name = name
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            " item_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " result BLOB,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+
+        logger.debug(f"Initialized checkpoint '{name}': path={self.path}")
+
+    def record_success(self, item_id: str, result: Any) -> bool:
+        """Record a completed item and its result.
+
+        Args:
+            item_id: Stable item identifier
+            result: Result to restore on resume (must be picklable)
+
+        Returns:
+            True if recorded, False if the result cannot be pickled (the
+            item will then be processed again on resume)
+        """
+        try:
+            blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(
+                f"Checkpoint '{self.name}' cannot pickle result of {item_id}: {e}"
+            )
+            return False
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO items (item_id, status, result, error, attempts, updated) "
+                "VALUES (?, ?, ?, NULL, 1, ?) "
+                "ON CONFLICT(item_id) DO UPDATE SET status = excluded.status, "
+                "result = excluded.result, error = NULL, "
+                "attempts = items.attempts + 1, updated = excluded.updated",
+                (item_id, STATUS_DONE, sqlite3.Binary(blob), time.time()),
+            )
+        return True
+
+    def record_failure(self, item_id: str, error: str) -> None:
+        """Record a failed item (re-queued on resume).
+
+        Args:
+            item_id: Stable item identifier
+            error: Error description
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO items (item_id, status, result, error, attempts, updated) "
+                "VALUES (?, ?, NULL, ?, 1, ?) "
+                "ON CONFLICT(item_id) DO UPDATE SET status = excluded.status, "
+                "result = NULL, error = excluded.error, "
+                "attempts = items.attempts + 1, updated = excluded.updated",
+                (item_id, STATUS_FAILED, error, time.time()),
+            )
+
+    def completed(self, item_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Load results of completed items.
+
+        Results that can no longer be unpickled (e.g. a class moved) are
+        skipped, so those items are processed again.
+
+        Args:
+            item_ids: Only load these ids (None = all completed items)
+
+        Returns:
+            Dictionary mapping item ids to their results
+        """
+        wanted = None if item_ids is None else set(item_ids)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id, result FROM items WHERE status = ?", (STATUS_DONE,)
+            ).fetchall()
+
+        results = {}
+        for item_id, blob in rows:
+            if wanted is not None and item_id not in wanted:
+                continue
+            try:
+                results[item_id] = pickle.loads(blob)
+            except Exception as e:
+                logger.debug(
+                    f"Checkpoint '{self.name}' dropped unreadable result {item_id}: {e}"
+                )
+        return results
+
+    def failed(self) -> Set[str]:
+        """Get ids of items whose latest attempt failed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item_id FROM items WHERE status = ?", (STATUS_FAILED,)
+            ).fetchall()
+        return {item_id for (item_id,) in rows}
+
+    def clear(self) -> None:
+        """Remove all recorded items."""
+        with self._lock:
+            self._conn.execute("DELETE FROM items")
+            logger.debug(f"Checkpoint '{self.name}' cleared")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get checkpoint statistics.
+
+        Returns:
+            Dictionary with name, path and done/failed item counts
+        """
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM items GROUP BY status"
+                ).fetchall()
+            )
+        return {
+            "name": self.name,
+            "path": str(self.path),
+            "done": counts.get(STATUS_DONE, 0),
+            "failed": counts.get(STATUS_FAILED, 0),
+        }
+
+    def close(self) -> None:
+        """Close the underlying sqlite connection."""
+        with self._lock:
+            self._conn.close()
@@ -3,53 +3,128 @@ Concurrency execution helpers for parallel and async operations.
 """
 
 import time
+import pickle
 import random
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Dict
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+)
+
+from LLM.core.libraries.concurrency.pools import ExecutorRegistry
 
 logger = logging.getLogger(__name__)
 
 
 def run_concurrent_map(
-    items: Sequence[Any],
+    items: Iterable[Any],
     worker_fn: Callable[[Any], Any],
     max_workers: int = 4,
     preserve_order: bool = True,
     on_error: Optional[Callable[[Exception, Any], Any]] = None,
     desc: Optional[str] = None,
+    pool_name: Optional[str] = "default",
+    executor: str = "thread",
+    chunksize: Optional[int] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
 ) -> List[Any]:
     """Run worker_fn over items concurrently.
 
+    executor="process" runs CPU-bound work (parsing, regex scans) in a
+    ProcessPoolExecutor so it scales with cores instead of the GIL. Items are
+    shipped to workers in chunks; worker_fn and initializer must be
+    picklable (module-level functions), otherwise the call falls back to
+    threads. Threads share the calling process's state, so on threads the
+    initializer runs once, in the calling process, before any item.
+
     Args:
-        items: Items to process
+        items: Items to process (any iterable; on threads it is consumed
+            lazily, as workers free up)
         worker_fn: Function to apply to each item
         max_workers: Maximum number of concurrent workers
         preserve_order: If True, returns results in same order as items
+            (otherwise in completion order)
         on_error: Error handler that can return fallback value
         desc: Optional description for logging
+        pool_name: Shared pool to run on (see ExecutorRegistry); None uses a
+            private per-call ThreadPoolExecutor
+        executor: "thread" (default) or "process"
+        chunksize: Items per task sent to a worker process
+            (default: spread items over ~4 chunks per worker)
+        initializer: Called once in each worker process, e.g. to load an
+            ontology into module state (once in the calling process when
+            running on threads)
+        initargs: Arguments for initializer
 
     Returns:
         List of results in same order as input (if preserve_order=True)
+
+    Example:
+        # CPU-bound: parse PLAN files on all cores
+        plans = run_concurrent_map(
+            plan_paths, parse_plan_file, max_workers=os.cpu_count(), executor="process"
+        )
     """
+    if executor not in ("thread", "process"):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+
+    if executor == "process" and not isinstance(items, Sequence):
+        items = list(items)
+
     if desc:
-        logger.debug(f"Starting concurrent processing: {desc} ({len(items)} items)")
+        count = f" ({len(items)} items)" if isinstance(items, Sized) else ""
+        logger.debug(f"Starting concurrent processing: {desc}{count}")
 
-    results: List[Tuple[int, Any]] = []
-    with ThreadPoolExecutor(max_workers=max(1, int(max_workers or 1))) as pool:
-        futures = []
-        for idx, it in enumerate(items):
-            futures.append((idx, pool.submit(worker_fn, it)))
+    workers = max(1, int(max_workers or 1))
 
-        for idx, fut in futures:
-            try:
-                res = fut.result()
-            except Exception as e:
-                if on_error is not None:
-                    res = on_error(e, items[idx])
-                else:
-                    raise
-            results.append((idx, res))
+    if executor == "process" and items:
+        if _is_picklable(worker_fn) and _is_picklable(initializer):
+            results = _run_process_map(
+                items, worker_fn, workers, on_error, chunksize, initializer, initargs
+            )
+            if preserve_order:
+                results.sort(key=lambda x: x[0])
+            if desc:
+                logger.debug(f"Completed concurrent processing: {desc}")
+            return [r for _, r in results]
+
+        logger.debug(
+            f"{getattr(worker_fn, '__name__', worker_fn)!r} is not picklable; "
+            "running on threads instead of processes"
+        )
+
+    if initializer is not None and items:
+        initializer(*initargs)
+
+    pool, owned = _resolve_pool(pool_name, workers)
+    try:
+        results = [
+            (idx, res)
+            for idx, _, res in _stream_map(
+                pool, items, worker_fn, in_flight_limit=workers, on_error=on_error
+            )
+        ]
+    finally:
+        _release_pool(pool, owned, pool_name, workers)
 
     if preserve_order:
         results.sort(key=lambda x: x[0])
@@ -60,6 +135,303 @@ def run_concurrent_map(
     return [r for _, r in results]
 
 
+def _is_picklable(obj: Any) -> bool:
+    """Check whether obj can be sent to a worker process."""
+    if obj is None:
+        return True
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+def _run_chunk(
+    worker_fn: Callable[[Any], Any], chunk: List[Any]
+) -> List[Tuple[bool, Any]]:
+    """Apply worker_fn to a chunk inside a worker process.
+
+    Returns:
+        (ok, result_or_exception) per item, so one failure does not lose the
+        rest of the chunk
+    """
+    outcomes = []
+    for item in chunk:
+        try:
+            outcomes.append((True, worker_fn(item)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+def _run_process_map(
+    items: Sequence[Any],
+    worker_fn: Callable[[Any], Any],
+    workers: int,
+    on_error: Optional[Callable[[Exception, Any], Any]],
+    chunksize: Optional[int],
+    initializer: Optional[Callable[..., None]],
+    initargs: Tuple[Any, ...],
+) -> List[Tuple[int, Any]]:
+    """Run worker_fn over items in a ProcessPoolExecutor, chunk by chunk.
+
+    Returns:
+        (index, result) pairs in completion order
+    """
+    total = len(items)
+    if not chunksize:
+        chunksize = max(1, -(-total // (workers * 4)))
+
+    results: List[Tuple[int, Any]] = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=initargs
+    ) as pool:
+        futures: Dict[Future, int] = {}
+        for start in range(0, total, chunksize):
+            chunk = list(items[start : start + chunksize])
+            futures[pool.submit(_run_chunk, worker_fn, chunk)] = start
+
+        try:
+            for fut in as_completed(futures):
+                start = futures[fut]
+                for offset, (ok, value) in enumerate(fut.result()):
+                    idx = start + offset
+                    if not ok:
+                        if on_error is None:
+                            raise value
+                        value = on_error(value, items[idx])
+                    results.append((idx, value))
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            raise
+
+    return results
+
+
+def iter_concurrent_map(
+    items: Iterable[Any],
+    worker_fn: Callable[[Any], Any],
+    max_workers: int = 4,
+    max_in_flight: Optional[int] = None,
+    order_window: Optional[int] = None,
+    on_error: Optional[Callable[[Exception, Any], Any]] = None,
+    desc: Optional[str] = None,
+    pool_name: Optional[str] = "default",
+) -> Iterator[Tuple[Any, Any]]:
+    """Stream worker_fn over an iterable with bounded memory.
+
+    Items are pulled lazily (generators and DB cursors are never
+    materialised); at most max_in_flight tasks are queued at a time and
+    the source is only advanced when a slot frees up (backpressure).
+
+    Args:
+        items: Any iterable of items (consumed lazily)
+        worker_fn: Function to apply to each item
+        max_workers: Maximum number of concurrent workers
+        max_in_flight: Maximum submitted-but-unfinished tasks
+            (default: 2 * max_workers, never less than max_workers)
+        order_window: If set, yield in input order, looking at most this many
+            items ahead of the oldest unyielded one (bounds the reorder buffer).
+            If None, yield in completion order.
+        on_error: Error handler that can return fallback value; if None the
+            first error is raised from the iterator
+        desc: Optional description for logging
+        pool_name: Shared pool to run on (see ExecutorRegistry); on a shared
+            pool at most max_workers tasks are submitted at a time. None
+            uses a private per-call ThreadPoolExecutor.
+
+    Yields:
+        (item, result) tuples as results become available
+
+    Example:
+        for chunk, result in iter_concurrent_map(cursor, extract, max_workers=8):
+            save(chunk, result)
+
+    Note:
+        Closing the iterator early (break) cancels queued tasks and waits
+        for the running ones to finish.
+    """
+    workers = max(1, int(max_workers or 1))
+    window = max(1, int(order_window)) if order_window is not None else None
+    pool, owned = _resolve_pool(pool_name, workers)
+    if owned:
+        in_flight_limit = max(workers, int(max_in_flight or 2 * workers))
+    else:
+        # Never hold more than our share of a shared pool's threads
+        in_flight_limit = min(workers, int(max_in_flight or workers))
+
+    if desc:
+        logger.debug(
+            f"Starting streaming processing: {desc} "
+            f"(workers={workers}, max_in_flight={in_flight_limit}, window={window})"
+        )
+
+    count = 0
+    stream = _stream_map(pool, items, worker_fn, in_flight_limit, window, on_error)
+    try:
+        for _, item, res in stream:
+            count += 1
+            yield item, res
+    finally:
+        stream.close()
+        _release_pool(pool, owned, pool_name, workers)
+
+    if desc:
+        logger.debug(f"Completed streaming processing: {desc} ({count} items)")
+
+
+def _resolve_pool(pool_name: Optional[str], workers: int) -> Tuple[Executor, bool]:
+    """Pick the shared pool when it fits, else a private one.
+
+    Args:
+        pool_name: Shared pool name (None = always private)
+        workers: Concurrency the caller needs
+
+    Returns:
+        (executor, owned) - hand both to _release_pool() when done
+    """
+    registry = ExecutorRegistry.get_instance()
+    if pool_name is not None and registry.fits(pool_name, workers):
+        return registry.lease(pool_name, workers), False
+    return ThreadPoolExecutor(max_workers=workers), True
+
+
+def _release_pool(
+    pool: Executor, owned: bool, pool_name: Optional[str], workers: int
+) -> None:
+    """Shut down a private pool or return the workers leased on a shared one."""
+    if owned:
+        pool.shutdown(wait=True)
+    else:
+        ExecutorRegistry.get_instance().release(pool_name, workers)
+
+
+def _stream_map(
+    pool: Executor,
+    items: Iterable[Any],
+    worker_fn: Callable[[Any], Any],
+    in_flight_limit: int,
+    window: Optional[int] = None,
+    on_error: Optional[Callable[[Exception, Any], Any]] = None,
+) -> Iterator[Tuple[int, Any, Any]]:
+    """Core scheduling loop shared by run_concurrent_map and iter_concurrent_map.
+
+    Args:
+        pool: Executor to submit to
+        items: Iterable of items (consumed lazily)
+        worker_fn: Function to apply to each item
+        in_flight_limit: Maximum submitted-but-unfinished tasks
+        window: Ordered-yield window (None = completion order)
+        on_error: Error handler that can return fallback value
+
+    Yields:
+        (index, item, result) tuples; in input order when window is set,
+        otherwise in completion order
+    """
+    source = iter(items)
+    exhausted = False
+    pending: Dict[Future, Tuple[int, Any]] = {}
+    reorder: Dict[int, Tuple[int, Any, Any]] = {}
+    submitted = 0
+    yielded = 0
+
+    try:
+        while True:
+            # Refill free slots (ordered mode also bounds the reorder buffer)
+            while (
+                not exhausted
+                and len(pending) < in_flight_limit
+                and (window is None or submitted - yielded < window)
+            ):
+                try:
+                    item = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(worker_fn, item)] = (submitted, item)
+                submitted += 1
+
+            if not pending and not reorder:
+                return
+
+            if pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idx, item = pending.pop(fut)
+                    try:
+                        res = fut.result()
+                    except Exception as e:
+                        if on_error is None:
+                            raise
+                        res = on_error(e, item)
+
+                    if window is None:
+                        yielded += 1
+                        yield idx, item, res
+                    else:
+                        reorder[idx] = (idx, item, res)
+
+            # Release the contiguous prefix of completed items
+            while yielded in reorder:
+                triple = reorder.pop(yielded)
+                yielded += 1
+                yield triple
+    finally:
+        # Early close or error: drop queued work and let running tasks finish
+        # before the caller releases (or shuts down) the pool
+        for fut in pending:
+            fut.cancel()
+        wait(pending)
+
+
+class _QPSThrottle:
+    """Thread-safe QPS limiter shared by every worker that holds it.
+
+    Each caller claims the next start slot under the lock (slots are spaced
+    1/qps apart) and then sleeps outside the lock, so waiting workers never
+    block each other from claiming later slots.
+    """
+
+    def __init__(self, qps: float):
+        self.min_interval = 1.0 / qps
+        self._next_ts = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until this caller's slot is reached."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_ts)
+            self._next_ts = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# Process-wide throttles shared by run_llm_concurrent calls with the same
+# qps_group (calls without a group share the throttle for their qps)
+_qps_groups: Dict[str, _QPSThrottle] = {}
+_qps_groups_lock = threading.Lock()
+
+
+def _get_qps_throttle(
+    qps: Optional[float], group: Optional[str], private: bool = False
+) -> Optional[_QPSThrottle]:
+    """Get the throttle for a call (process-wide per group, or private)."""
+    if not qps or qps <= 0:
+        return None
+    if private:
+        return _QPSThrottle(qps)
+    if group is None:
+        group = f"qps={qps:g}"
+    with _qps_groups_lock:
+        throttle = _qps_groups.get(group)
+        if throttle is None or throttle.min_interval != 1.0 / qps:
+            throttle = _QPSThrottle(qps)
+            _qps_groups[group] = throttle
+        return throttle
+
+
 def run_llm_concurrent(
     chunks: Sequence[Any],
     agent_factory: Callable[[], Any],
@@ -71,12 +443,19 @@ def run_llm_concurrent(
     jitter: bool = False,
     on_error: Optional[Callable[[Exception, Any], Any]] = None,
     preserve_order: bool = True,
+    qps_group: Optional[str] = None,
+    private_qps: bool = False,
 ) -> List[Any]:
     """Concurrent LLM calls with retries, QPS throttle, and ordering.
 
+    The QPS limit is enforced across all workers (every attempt, including
+    retries, takes a slot) and, by default, across every concurrent call
+    with the same qps in the process. Agents are pooled per worker thread: each
+    thread creates one agent on first use and reuses it for later items.
+
     Args:
         chunks: Items to process
-        agent_factory: Factory function that returns a fresh agent (thread-safe)
+        agent_factory: Factory function that returns a fresh agent
         method_name: Method name to call on agent
         max_workers: Maximum number of concurrent workers
         retries: Number of retries per item
@@ -84,37 +463,40 @@ def run_llm_concurrent(
         qps: Optional queries per second limit
         jitter: Whether to add jitter to backoff
         on_error: Error handler for failed items
-        preserve_order: If True, returns results in same order as input
+        preserve_order: Kept for compatibility; results are always returned
+            in input order
+        qps_group: Optional name; calls with the same group share one
+            process-wide QPS budget (default: calls with the same qps share one)
+        private_qps: Give this call its own QPS budget instead of a shared one
 
     Returns:
         List of results
 
     Note:
-        agent_factory must return a fresh agent for thread-safe isolation.
+        An agent is only ever used by the thread that created it, so agents
+        need not be thread-safe; they must tolerate processing several items
+        in sequence.
     """
+    throttle = _get_qps_throttle(qps, qps_group, private_qps)
+    # One agent per worker thread, scoped to this call
+    agents = threading.local()
 
-    def _throttle(qps_limit: Optional[float], last_ts: List[float]) -> None:
-        """Throttle based on QPS limit."""
-        if not qps_limit or qps_limit <= 0:
-            return
-        now = time.time()
-        min_interval = 1.0 / qps_limit
-        elapsed = now - last_ts[0]
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        last_ts[0] = time.time()
+    def _get_agent() -> Any:
+        agent = getattr(agents, "agent", None)
+        if agent is None:
+            agent = agents.agent = agent_factory()
+        return agent
 
     def _worker(payload: Tuple[int, Any]) -> Tuple[int, Any]:
         """Worker function with retry logic."""
         idx, chunk = payload
-        agent = agent_factory()
-        method = getattr(agent, method_name)
-        last_ts = [0.0]
+        method = getattr(_get_agent(), method_name)
         attempt = 0
 
         while True:
             try:
-                _throttle(qps, last_ts)
+                if throttle is not None:
+                    throttle.wait()
                 return idx, method(chunk)
             except Exception as e:
                 attempt += 1
@@ -0,0 +1,283 @@
+"""
+Process-wide shared thread pools.
+
+Creating and tearing down a ThreadPoolExecutor per call (or per batch) costs
+thread startup for every worker. The registry below keeps named pools alive
+for the whole process so the concurrency helpers can reuse warm threads.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default size for pools that are not explicitly configured
+DEFAULT_POOL_SIZE = int(os.getenv("CONCURRENCY_POOL_SIZE", "32"))
+
+# Marks threads owned by a shared pool (used to detect nested use)
+_worker_state = threading.local()
+
+
+def _mark_worker(pool_name: str) -> None:
+    """Thread initializer: remember which shared pool owns this thread."""
+    _worker_state.pool_name = pool_name
+
+
+class _SharedPool(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose worker limit can be raised while in use."""
+
+    def grow(self, max_workers: int) -> None:
+        """Raise the worker limit (new threads start lazily on submit)."""
+        with self._shutdown_lock:
+            if max_workers > self._max_workers:
+                self._max_workers = max_workers
+
+
+class ExecutorRegistry:
+    """Registry of named, lazily created, shared ThreadPoolExecutors.
+
+    Callers running on a pool lease the workers they need (see lease()).
+    A pool without a configured size grows to cover all concurrent leases
+    (never below DEFAULT_POOL_SIZE), so concurrent runs each get their
+    max_workers threads; grown pools keep their threads until shut down.
+    A configured pool (see configure()) keeps its size: callers needing
+    more workers than it has use a private executor instead (see fits()),
+    and concurrent leases beyond its size share its threads.
+
+    Example:
+        registry = ExecutorRegistry.get_instance()
+        registry.configure("llm", max_workers=300)
+
+        pool = registry.lease("llm", 50)
+        try:
+            future = pool.submit(call_model, prompt)
+        finally:
+            registry.release("llm", 50)
+
+        # On shutdown (optional - pools are joined at interpreter exit)
+        registry.shutdown()
+    """
+
+    _instance: Optional["ExecutorRegistry"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        """Initialize registry (use get_instance() instead)."""
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._sizes: Dict[str, int] = {}
+        self._configured: Dict[str, int] = {}
+        self._leased: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "ExecutorRegistry":
+        """Get singleton registry instance.
+
+        Returns:
+            ExecutorRegistry instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = ExecutorRegistry()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Shut down all pools and reset the singleton (useful for testing)."""
+        with cls._instance_lock:
+            instance, cls._instance = cls._instance, None
+        if instance is not None:
+            instance.shutdown()
+
+    def configure(self, name: str, max_workers: int) -> None:
+        """Set the size of a named pool.
+
+        Takes effect when the pool is next created; an existing pool is
+        shut down gracefully (running tasks finish) and replaced lazily.
+        A pool cannot be reconfigured while callers hold leases on it,
+        since their next submit would hit the shut-down pool.
+
+        Args:
+            name: Pool name
+            max_workers: Number of worker threads
+
+        Raises:
+            RuntimeError: If workers of the pool are currently leased
+        """
+        size = max(1, int(max_workers))
+        with self._lock:
+            leased = self._leased.get(name, 0)
+            if leased:
+                raise RuntimeError(
+                    f"Cannot reconfigure shared pool '{name}' while "
+                    f"{leased} of its workers are leased"
+                )
+            self._configured[name] = size
+            old = self._pools.pop(name, None)
+            self._sizes.pop(name, None)
+
+        if old is not None:
+            old.shutdown(wait=False)
+            logger.debug(f"Shared pool '{name}' resized to {size} workers")
+
+    def get(
+        self, name: str = "default", max_workers: Optional[int] = None
+    ) -> ThreadPoolExecutor:
+        """Get (creating on first use) a shared pool.
+
+        Args:
+            name: Pool name
+            max_workers: Requested workers; a pool without a configured size
+                is created with (or grown to) at least this many
+
+        Returns:
+            Shared ThreadPoolExecutor (do not shut it down yourself)
+        """
+        with self._lock:
+            return self._get_locked(name, int(max_workers or 1))
+
+    def lease(self, name: str, max_workers: int) -> ThreadPoolExecutor:
+        """Get a shared pool and reserve max_workers of its threads.
+
+        Call release() with the same arguments when done. Leases of
+        concurrent callers add up: a pool without a configured size grows
+        to their total.
+
+        Args:
+            name: Pool name
+            max_workers: Workers the caller will keep busy
+
+        Returns:
+            Shared ThreadPoolExecutor (do not shut it down yourself)
+        """
+        workers = max(1, int(max_workers))
+        with self._lock:
+            leased = self._leased.get(name, 0) + workers
+            self._leased[name] = leased
+            pool = self._get_locked(name, leased)
+            size = self._sizes[name]
+
+        if leased > size:
+            logger.info(
+                f"Shared pool '{name}' is configured with {size} workers but "
+                f"{leased} are leased; concurrent callers share its threads"
+            )
+        return pool
+
+    def release(self, name: str, max_workers: int) -> None:
+        """Return workers reserved with lease().
+
+        Args:
+            name: Pool name
+            max_workers: Workers passed to lease()
+        """
+        with self._lock:
+            leased = self._leased.get(name, 0) - max(1, int(max_workers))
+            if leased > 0:
+                self._leased[name] = leased
+            else:
+                self._leased.pop(name, None)
+
+    def _get_locked(self, name: str, demand: int) -> ThreadPoolExecutor:
+        """Get or create a pool, growing an unconfigured one to demand.
+
+        Must be called with self._lock held.
+        """
+        configured = self._configured.get(name)
+        pool = self._pools.get(name)
+        if pool is None:
+            size = configured or max(DEFAULT_POOL_SIZE, demand)
+            pool = _SharedPool(
+                max_workers=size,
+                thread_name_prefix=f"shared-{name}",
+                initializer=_mark_worker,
+                initargs=(name,),
+            )
+            self._pools[name] = pool
+            self._sizes[name] = size
+            logger.debug(f"Created shared pool '{name}' with {size} workers")
+        elif configured is None and demand > self._sizes[name]:
+            pool.grow(demand)
+            self._sizes[name] = demand
+            logger.debug(f"Grew shared pool '{name}' to {demand} workers")
+        return pool
+
+    def fits(self, name: str, max_workers: int) -> bool:
+        """Check whether a call can run on the shared pool.
+
+        False when the pool has a configured size smaller than max_workers
+        (other pools grow on demand), or when called from one of the pool's
+        own threads (waiting on the same pool from inside it can deadlock).
+
+        Args:
+            name: Pool name
+            max_workers: Concurrency the caller needs
+
+        Returns:
+            True if the shared pool should be used
+        """
+        if getattr(_worker_state, "pool_name", None) == name:
+            return False
+        with self._lock:
+            size = self._configured.get(name)
+        return size is None or size >= max_workers
+
+    def shutdown(
+        self, name: Optional[str] = None, wait: bool = True, cancel_futures: bool = False
+    ) -> None:
+        """Shut down shared pools gracefully.
+
+        Pools are recreated lazily if used again afterwards.
+
+        Args:
+            name: Pool to shut down (None = all pools)
+            wait: Wait for running tasks to finish
+            cancel_futures: Cancel tasks that have not started yet
+        """
+        with self._lock:
+            names = [name] if name is not None else list(self._pools)
+            pools = [(n, self._pools.pop(n)) for n in names if n in self._pools]
+            for n, _ in pools:
+                self._sizes.pop(n, None)
+
+        for n, pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+            logger.debug(f"Shut down shared pool '{n}'")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool sizes.
+
+        Returns:
+            Dictionary mapping pool names to their number of workers
+        """
+        with self._lock:
+            return dict(self._sizes)
+
+
+def get_shared_executor(
+    name: str = "default", max_workers: Optional[int] = None
+) -> ThreadPoolExecutor:
+    """Get a shared pool from the process-wide registry.
+
+    Args:
+        name: Pool name
+        max_workers: Requested workers (an unconfigured pool grows to fit)
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    return ExecutorRegistry.get_instance().get(name, max_workers)
+
+
+def shutdown_shared_executors(wait: bool = True, cancel_futures: bool = False) -> None:
+    """Shut down all shared pools (e.g. at the end of a pipeline run).
+
+    Args:
+        wait: Wait for running tasks to finish
+        cancel_futures: Cancel tasks that have not started yet
+    """
+    ExecutorRegistry.get_instance().shutdown(wait=wait, cancel_futures=cancel_futures)
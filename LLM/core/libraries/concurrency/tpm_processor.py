@@ -7,24 +7,96 @@ Provides reusable concurrent processing with TPM/RPM tracking for any operation.
 import logging
 import os
 import time
-import threading
-from typing import List, Any, Callable, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from LLM.core.libraries.rate_limiting import RateLimiter
+from typing import List, Any, Callable, Iterator, Tuple, Optional
+from LLM.core.libraries.concurrency.checkpoint import CheckpointStore
+from LLM.core.libraries.concurrency.executor import (
+    iter_concurrent_map,
+    run_concurrent_map,
+)
+from LLM.core.libraries.metrics.tokens import capture_usage, estimate_item_tokens
+from LLM.core.libraries.retry import is_rate_limit_error, observe_rate_limits
+from LLM.core.libraries.rate_limiting import (
+    AdaptiveConcurrencyLimiter,
+    RateLimiter,
+    ScheduledJob,
+    TokenReservation,
+    TPMLimiter,
+    apply_rate_limit_headers,
+)
+from LLM.core.libraries.rate_limiting.headers import headers_of
 
 logger = logging.getLogger(__name__)
 
 
+class ItemFailure:
+    """Result of an item whose processing raised.
+
+    Takes the item's place in the (item, result) pairs so callers can tell
+    a failure (isinstance(result, ItemFailure), with the exception in
+    .error) from a processor that legitimately returned None or an empty
+    result. It is falsy, so `if result:` checks still skip failures.
+    """
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        """Initialize failure.
+
+        Args:
+            error: Exception raised while processing the item
+        """
+        self.error = error
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return f"ItemFailure({self.error!r})"
+
+
+def _succeeded(result: Any) -> bool:
+    """Check whether a result counts as a success (anything but ItemFailure)."""
+    return not isinstance(result, ItemFailure)
+
+
+def _usage_total_tokens(result: Any) -> Optional[int]:
+    """Extract usage.total_tokens from an OpenAI response (object or dict).
+
+    Returns:
+        Total tokens, or None if the result carries no usage information
+    """
+    if isinstance(result, dict):
+        usage = result.get("usage")
+    else:
+        usage = getattr(result, "usage", None)
+    if usage is None:
+        return None
+
+    if isinstance(usage, dict):
+        total = usage.get("total_tokens")
+    else:
+        total = getattr(usage, "total_tokens", None)
+    return total if isinstance(total, int) else None
+
+
 def run_concurrent_with_tpm(
     items: List[Any],
     processor_fn: Callable[[Any], Any],
-    estimate_tokens_fn: Callable[[Any], int],
+    estimate_tokens_fn: Optional[Callable[[Any], int]] = None,
     max_workers: int = 300,
     target_tpm: int = 950000,
     target_rpm: int = 20000,
     batch_size: Optional[int] = None,
     limiter_name: str = "default",
     progress_name: str = "items",
+    pool_name: Optional[str] = "tpm",
+    continuous: bool = True,
+    actual_tokens_fn: Optional[Callable[[Any], Optional[int]]] = None,
+    concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    checkpoint: Optional[CheckpointStore] = None,
+    item_id_fn: Optional[Callable[[Any], str]] = None,
+    resume: bool = True,
+    job: Optional[ScheduledJob] = None,
 ) -> List[Tuple[Any, Any]]:
     """
     Process items concurrently with TPM/RPM tracking.
@@ -32,128 +104,305 @@ def run_concurrent_with_tpm(
     This is a generic utility that handles all TPM tracking, rate limiting,
     batching, and progress logging. Can be used by stages, agents, or any
     component that needs concurrent LLM processing.
+
+    Each item reserves its estimated tokens before it runs (blocking exactly
+    until the last 60 seconds leave room under target_tpm); the reservation
+    is then reconciled with the actual usage: the result's own usage if it
+    carries one, else the usage of the call_llm calls processor_fn made
+    (captured with metrics.tokens.capture_usage).
+
+    By default work is scheduled continuously: all max_workers slots stay busy
+    and each slot is refilled as soon as its task finishes, so one slow call
+    never idles the other workers. Progress is still logged every batch_size
+    completed items. With continuous=False items run in fixed batches and
+    each batch waits for its slowest item.
+
+    With a concurrency_limiter, max_workers becomes a ceiling: only
+    concurrency_limiter.limit items run at once, and that limit adapts to
+    rate limit errors and latency reported by processor_fn - including 429s
+    that call_llm retries internally. Pass the same limiter to later calls
+    to keep what it learned. Rate limit headers on those 429s (retry-after,
+    x-ratelimit-reset-*) pause the run's RPM/TPM limiters (or the job's
+    scheduler) for every worker.
+
+    With a checkpoint, every outcome is journaled as soon as the item
+    finishes (results of successes, including None, and error messages of
+    failures). When resuming, items already recorded as
+    done are not processed again - their stored results are returned in
+    place - while failed and unseen items are queued as usual.
+
+    With a job (see BudgetScheduler.job()), tokens and requests are drawn
+    from the process-wide budget shared with every other job instead of
+    private limiters, and target_tpm/target_rpm are ignored. Items are
+    granted their budget before they are handed to the pool, so a job
+    waiting for budget never parks shared worker threads that a
+    higher-priority job could use.
     
     Args:
         items: List of items to process
         processor_fn: Function to process each item (can make LLM calls)
         estimate_tokens_fn: Function to estimate tokens for an item
+            (default: metrics.tokens.estimate_item_tokens - tiktoken counts,
+            or a ~4 characters per token heuristic if tiktoken is missing)
         max_workers: Maximum concurrent workers
         target_tpm: Target tokens per minute
         target_rpm: Target requests per minute
-        batch_size: Batch size (default: max_workers * 2, max 1000)
+        batch_size: Batch size, or progress-logging interval in continuous
+            mode (default: max_workers * 2, max 1000)
         limiter_name: Name for rate limiter (for logging)
         progress_name: Name for progress logging (e.g., "chunks", "communities")
+        pool_name: Shared thread pool reused across batches and calls
+            (None = private pool)
+        continuous: Keep all workers busy instead of waiting for each batch
+        actual_tokens_fn: Function returning the actual tokens used from a
+            result (default: its usage.total_tokens if present); when it
+            returns None, the usage captured from processor_fn's LLM calls
+            is used, and without any the estimate is kept
+        concurrency_limiter: Optional adaptive limit on in-flight items
+            (see AdaptiveConcurrencyLimiter)
+        checkpoint: Optional journal recording each item's outcome
+        item_id_fn: Function returning a stable id for an item (default:
+            its position in items - only safe if items keep their order)
+        resume: Reuse results already recorded as done in the checkpoint
+            (False = process every item, overwriting recorded outcomes)
+        job: Optional scheduler job owning this run's share of the
+            process-wide TPM/RPM budget
     
     Returns:
-        List of (item, result) tuples in original order
+        List of (item, result) tuples in original order; items whose
+        processing raised get an ItemFailure carrying the exception
     """
     if not items:
         return []
     
+    if estimate_tokens_fn is None:
+        estimate_tokens_fn = estimate_item_tokens
+    
     total = len(items)
     if batch_size is None:
         batch_size = min(max_workers * 2, 1000)
     
+    if job is not None:
+        budget = f"job={job.name}, priority={job.priority}, weight={job.weight}"
+    else:
+        budget = f"TPM={target_tpm:,}, RPM={target_rpm}"
     logger.info(
         f"[{limiter_name}] Processing {total} {progress_name} with {max_workers} workers "
-        f"(TPM={target_tpm:,}, RPM={target_rpm}, batch_size={batch_size})"
+        f"({budget}, batch_size={batch_size}, continuous={continuous})"
     )
     
-    # Setup rate limiters
-    rpm_limiter = RateLimiter(rpm=target_rpm, name=limiter_name)
+    if job is None:
+        # Setup rate limiters
+        rpm_limiter = RateLimiter(rpm=target_rpm, name=limiter_name)
+        
+        # TPM limiter (reserve estimate, reconcile actual usage)
+        tpm_limiter = TPMLimiter(tpm=target_tpm, name=limiter_name)
+        pause_targets = [rpm_limiter, tpm_limiter]
+    else:
+        pause_targets = [job.scheduler]
+    get_actual_tokens = actual_tokens_fn or _usage_total_tokens
     
-    # TPM tracker
-    token_window = []
-    token_lock = threading.Lock()
+    # Results are placed by input index; checkpointed results are restored
+    all_results: List[Tuple[Any, Any]] = [None] * total
+    pending = list(enumerate(items))
+    if checkpoint is not None:
+        item_ids = [
+            item_id_fn(item) if item_id_fn else str(idx) for idx, item in pending
+        ]
+        done = checkpoint.completed(item_ids) if resume else {}
+        pending = []
+        for idx, item in enumerate(items):
+            if item_ids[idx] in done:
+                all_results[idx] = (item, done[item_ids[idx]])
+            else:
+                pending.append((idx, item))
+        if resume:
+            logger.info(
+                f"[{limiter_name}] Resuming from checkpoint '{checkpoint.name}': "
+                f"{total - len(pending)}/{total} {progress_name} already done"
+            )
     
-    def wait_for_tpm_capacity(estimated_tokens: int) -> None:
-        """Wait until TPM capacity available (optimized for throughput)."""
-        with token_lock:
-            now = time.time()
-            cutoff = now - 60
-            token_window[:] = [(ts, tok) for ts, tok in token_window if ts > cutoff]
-            current_tpm = sum(tok for _, tok in token_window)
-            
-            # Reserve immediately (optimistic)
-            token_window.append((now, estimated_tokens))
-            
-            # Only wait if way over limit (> 120%)
-            if current_tpm > target_tpm * 1.2:
-                time.sleep(0.05)
+    def record_outcome(idx: int, result: Any) -> None:
+        """Journal an item's outcome (failures are re-queued on resume)."""
+        if checkpoint is None:
+            return
+        try:
+            if isinstance(result, ItemFailure):
+                error = f"{type(result.error).__name__}: {result.error}"
+                checkpoint.record_failure(item_ids[idx], error)
+            else:
+                checkpoint.record_success(item_ids[idx], result)
+        except Exception as e:
+            logger.warning(f"[{limiter_name}] Could not write checkpoint: {e}")
+    
+    def on_rate_limit(error: Exception) -> None:
+        """Back every worker off on 429s retried inside processor_fn.
+
+        Retry-after / x-ratelimit-reset headers pause this run's limiters
+        (or the job's scheduler), so other workers wait for the window
+        instead of each finding the 429 on its own.
+        """
+        apply_rate_limit_headers(pause_targets, headers_of(error))
+        if concurrency_limiter is not None:
+            concurrency_limiter.on_error(error)
+    
+    def reserve_capacity(item: Any) -> TokenReservation:
+        """Wait for TPM/RPM capacity (shared budget if running as a job)."""
+        if job is not None:
+            return job.acquire(estimate_tokens_fn(item))
+        
+        # Estimate and wait for capacity
+        reservation = tpm_limiter.reserve(estimate_tokens_fn(item))
+        
+        # Rate limit
+        rpm_limiter.wait()
+        return reservation
+    
+    def admit(
+        entries: List[Tuple[int, Any]],
+    ) -> Iterator[Tuple[int, Any, Optional[TokenReservation]]]:
+        """Yield (index, item, reservation) as items are handed to the pool.
+
+        Scheduled jobs are granted their budget here, on the submitting
+        thread, so waiting for the scheduler never holds a pool thread.
+        """
+        for idx, item in entries:
+            reservation = None
+            if job is not None:
+                try:
+                    reservation = reserve_capacity(item)
+                except Exception as e:
+                    # Retried (and reported) inside process_with_tracking
+                    logger.debug(f"[{limiter_name}] Could not reserve budget: {e}")
+            yield idx, item, reservation
     
-    def process_with_tracking(item: Any) -> Tuple[Any, Any]:
-        """Process item with TPM/RPM tracking."""
+    def process_with_tracking(
+        entry: Tuple[int, Any, Optional[TokenReservation]],
+    ) -> Tuple[Any, Any]:
+        """Process (index, item, reservation) with TPM/RPM tracking."""
+        idx, item, reservation = entry
+        if concurrency_limiter is not None:
+            concurrency_limiter.acquire()
         try:
-            # Estimate and wait for capacity
-            estimated = estimate_tokens_fn(item)
-            wait_for_tpm_capacity(estimated)
-            
-            # Rate limit
-            rpm_limiter.wait()
+            if reservation is None:
+                reservation = reserve_capacity(item)
             
-            # Process
-            result = processor_fn(item)
+            # Process (a failed call keeps its estimate - it may have used quota)
+            start = time.monotonic()
+            with capture_usage() as usage, observe_rate_limits(on_rate_limit):
+                result = processor_fn(item)
+            if concurrency_limiter is not None:
+                concurrency_limiter.on_success(time.monotonic() - start)
             
-            # Track actual tokens
-            with token_lock:
-                token_window.append((time.time(), estimated))
+            # Replace the estimate with actual usage (when reported)
+            try:
+                actual = get_actual_tokens(result)
+                if actual is None and usage.calls:
+                    actual = usage.total_tokens
+                (job or tpm_limiter).reconcile(reservation, actual)
+            except Exception as e:
+                logger.debug(f"[{limiter_name}] Could not read token usage: {e}")
             
+            record_outcome(idx, result)
             return item, result
         
         except Exception as e:
+            if is_rate_limit_error(e):
+                apply_rate_limit_headers(pause_targets, headers_of(e))
+            if concurrency_limiter is not None:
+                concurrency_limiter.on_error(e)
             logger.error(f"[{limiter_name}] Error processing item: {e}")
-            return item, None
+            failure = ItemFailure(e)
+            record_outcome(idx, failure)
+            return item, failure
+        
+        finally:
+            if concurrency_limiter is not None:
+                concurrency_limiter.release()
     
-    # Process in batches
-    all_results = []
-    overall_start = time.time()
+    def current_tpm() -> int:
+        """Tokens used in the last 60 seconds."""
+        if job is not None:
+            return job.scheduler.current_usage()
+        return tpm_limiter.current_usage()
     
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch_items = items[batch_start:batch_end]
-        batch_num = (batch_start // batch_size) + 1
-        total_batches = (total + batch_size - 1) // batch_size
-        
+    def log_batch_start(batch_num: int, first: int, last: int) -> None:
+        """Log the start of a batch (1-based, inclusive item range)."""
         logger.info(
             f"[{limiter_name}] Batch {batch_num}/{total_batches}: "
-            f"Processing {progress_name} {batch_start+1}-{batch_end}"
+            f"Processing {progress_name} {first}-{last}"
         )
+    
+    def log_batch_complete(
+        batch_num: int, elapsed: float, batch_results: List[Tuple[Any, Any]]
+    ) -> None:
+        """Log batch completion with current TPM and success count."""
+        successful = sum(1 for _, result in batch_results if _succeeded(result))
+        logger.info(
+            f"[{limiter_name}] Batch {batch_num} complete in {elapsed:.1f}s "
+            f"({current_tpm()/1000:.0f}k TPM, "
+            f"{successful}/{len(batch_results)} successful)"
+        )
+    
+    remaining = len(pending)
+    total_batches = (remaining + batch_size - 1) // batch_size
+    overall_start = time.time()
+    
+    if pending and continuous:
+        # Keep every worker slot busy
+        window_results = []
+        window_start = overall_start
+        batch_num = 1
+        log_batch_start(batch_num, 1, min(batch_size, remaining))
         
-        batch_start_time = time.time()
-        
-        # Process batch concurrently
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(process_with_tracking, item): idx
-                for idx, item in enumerate(batch_items)
-            }
+        for (idx, _, _), (item, result) in iter_concurrent_map(
+            admit(pending),
+            process_with_tracking,
+            max_workers=max_workers,
+            max_in_flight=max_workers,
+            pool_name=pool_name,
+        ):
+            all_results[idx] = (item, result)
+            window_results.append((item, result))
             
-            # Collect results in order
-            batch_results = [None] * len(batch_items)
-            for future in as_completed(futures):
-                idx = futures[future]
-                item, result = future.result()
-                batch_results[idx] = (item, result)
-        
-        all_results.extend(batch_results)
-        
-        batch_elapsed = time.time() - batch_start_time
+            # Per-batch-style progress: log every batch_size completions
+            if len(window_results) == batch_size:
+                now = time.time()
+                log_batch_complete(batch_num, now - window_start, window_results)
+                done_count = batch_num * batch_size
+                batch_num += 1
+                window_results = []
+                window_start = now
+                if done_count < remaining:
+                    last = min(done_count + batch_size, remaining)
+                    log_batch_start(batch_num, done_count + 1, last)
         
-        # Get current TPM
-        with token_lock:
-            now = time.time()
-            cutoff = now - 60
-            token_window[:] = [(ts, tok) for ts, tok in token_window if ts > cutoff]
-            current_tpm = sum(tok for _, tok in token_window)
-        
-        successful = sum(1 for _, result in batch_results if result is not None)
-        logger.info(
-            f"[{limiter_name}] Batch {batch_num} complete in {batch_elapsed:.1f}s "
-            f"({current_tpm/1000:.0f}k TPM, {successful}/{len(batch_items)} successful)"
-        )
+        if window_results:
+            log_batch_complete(batch_num, time.time() - window_start, window_results)
+    elif pending:
+        for batch_start in range(0, remaining, batch_size):
+            batch_end = min(batch_start + batch_size, remaining)
+            batch = pending[batch_start:batch_end]
+            batch_num = (batch_start // batch_size) + 1
+            log_batch_start(batch_num, batch_start + 1, batch_end)
+            
+            batch_start_time = time.time()
+            
+            # Process batch concurrently on the shared pool (results in order)
+            batch_results = run_concurrent_map(
+                admit(batch),
+                process_with_tracking,
+                max_workers=max_workers,
+                preserve_order=True,
+                pool_name=pool_name,
+            )
+            
+            for (idx, _), pair in zip(batch, batch_results):
+                all_results[idx] = pair
+            log_batch_complete(batch_num, time.time() - batch_start_time, batch_results)
     
     overall_elapsed = time.time() - overall_start
-    total_successful = sum(1 for _, result in all_results if result is not None)
+    total_successful = sum(1 for _, result in all_results if _succeeded(result))
     
     logger.info(
         f"[{limiter_name}] Complete: {total_successful}/{total} {progress_name} in {overall_elapsed:.1f}s "
@@ -7,7 +7,8 @@ Part of the CORE libraries - Tier 2 (foundational implementation).
 Usage:
     from core.libraries.llm import get_openai_client, call_llm_simple, call_llm_with_structured_output
 
-    # Initialize client
+    # Initialize client (cached per api_key/base_url/timeout; all cached
+    # clients share one keep-alive connection pool)
     client = get_openai_client()
 
     # Simple call
@@ -30,25 +31,108 @@ Usage:
         user_prompt="Text: Python is a language.",
         response_model=EntityModel
     )
+
+    # Async (many concurrent calls on one event loop)
+    aclient = get_async_openai_client()
+    answer = await acall_llm(aclient, messages=[{"role": "user", "content": "Hi"}])
+
+    # Streaming: text deltas, or partial models filling in as JSON arrives
+    for delta in call_llm(client, messages, stream=True):
+        print(delta, end="", flush=True)
+    for partial in stream_llm(client, messages, response_format=EntityModel):
+        render(partial)  # Last item is the final validated model
+
+    # Token counts (tiktoken if installed, else ~4 chars/token) and usage;
+    # every call's usage feeds llm_tokens_total / llm_cost_usd_total by model
+    tokens = estimate_message_tokens(messages, model="gpt-4o-mini", max_tokens=500)
+    answer = call_llm(client, messages, on_usage=lambda usage: print(usage["cost_usd"]))
+    with capture_usage() as usage:  # Totals of every call made in the block
+        answer = call_llm(client, messages)
+
+    # Replay deterministic calls from disk (opt-in)
+    cache = ResponseCache("~/.cache/llm/responses.sqlite")
+    answer = call_llm(client, messages, temperature=0, cache=cache)
+    cache = get_default_response_cache()  # None unless LLM_CACHE_DIR is set
+
+    # Offline workloads at batch prices (same output shape as
+    # run_concurrent_with_tpm)
+    job = BatchJob(OpenAIBatchTransport(client), model="gpt-4o-mini")
+    results = job.run(chunks, lambda chunk: [{"role": "user", "content": chunk}])
+
+    # Release cached clients and pooled connections at shutdown
+    close_openai_clients()
 """
 
 from LLM.core.libraries.llm.client import (
+    close_openai_clients,
+    get_async_openai_client,
     get_openai_client,
     is_openai_available,
 )
 
 from LLM.core.libraries.llm.calls import (
+    acall_llm,
     call_llm,
     call_llm_simple,
     call_llm_with_structured_output,
+    stream_llm,
+)
+
+from LLM.core.libraries.llm.partial_json import (
+    PartialJSONParser,
+    parse_partial_json,
+    partial_model,
+)
+
+from LLM.core.libraries.llm.batch import (
+    BatchJob,
+    BatchRequestError,
+    BatchTransport,
+    OpenAIBatchTransport,
+)
+
+from LLM.core.libraries.metrics.tokens import (
+    UsageCapture,
+    capture_usage,
+    count_tokens,
+    estimate_item_tokens,
+    estimate_message_tokens,
+    record_usage,
+)
+
+from LLM.core.libraries.llm.response_cache import (
+    ResponseCache,
+    get_default_response_cache,
 )
 
 __all__ = [
     # Client
     "get_openai_client",
+    "close_openai_clients",
+    "get_async_openai_client",
     "is_openai_available",
     # Calls
     "call_llm",
+    "acall_llm",
     "call_llm_simple",
     "call_llm_with_structured_output",
+    "stream_llm",
+    "parse_partial_json",
+    "PartialJSONParser",
+    "partial_model",
+    # Tokens and usage
+    "count_tokens",
+    "estimate_message_tokens",
+    "estimate_item_tokens",
+    "record_usage",
+    "capture_usage",
+    "UsageCapture",
+    # Response cache
+    "ResponseCache",
+    "get_default_response_cache",
+    # Batch API
+    "BatchJob",
+    "BatchRequestError",
+    "BatchTransport",
+    "OpenAIBatchTransport",
 ]
@@ -0,0 +1,431 @@
+"""
+Batch API submission for offline LLM workloads.
+
+Offline extraction that can wait hours costs about half as much through a
+provider's batch endpoint as through synchronous chat completions. A
+BatchJob writes the requests for a list of items to JSONL files, submits
+and polls them through a pluggable transport, and maps the results back to
+the items in order - the same (item, result) shape run_concurrent_with_tpm
+returns, with an ItemFailure for each request that did not succeed, so
+callers can switch between the two.
+"""
+
+import json
+import time
+import logging
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from LLM.core.libraries.concurrency.tpm_processor import ItemFailure, _succeeded
+from LLM.core.libraries.llm.calls import json_schema_response_format
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses after which nothing changes anymore
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Provider limit on requests per batch input file
+MAX_REQUESTS_PER_BATCH = 50_000
+
+
+class BatchRequestError(RuntimeError):
+    """A batch request that failed, was not completed or was unparsable."""
+
+
+class BatchTransport(ABC):
+    """Interface to a batch endpoint (file upload, batch create/poll/download).
+
+    Batch state is described by dictionaries with at least "id" and
+    "status", plus "output_file_id" / "error_file_id" once available.
+    """
+
+    @abstractmethod
+    def upload(self, path: Path) -> str:
+        """Upload a JSONL request file.
+
+        Args:
+            path: Path to the request file
+
+        Returns:
+            File id
+        """
+
+    @abstractmethod
+    def create(
+        self,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Create a batch for an uploaded request file.
+
+        Returns:
+            Batch state
+        """
+
+    @abstractmethod
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """Get the current batch state."""
+
+    @abstractmethod
+    def download(self, file_id: str) -> str:
+        """Get the content of an output or error file (JSONL text)."""
+
+    @abstractmethod
+    def cancel(self, batch_id: str) -> None:
+        """Cancel a batch."""
+
+
+class OpenAIBatchTransport(BatchTransport):
+    """Transport using the OpenAI Batch API through an OpenAI client.
+
+    Example:
+        transport = OpenAIBatchTransport(get_openai_client())
+    """
+
+    def __init__(self, client: Any):
+        """Initialize transport.
+
+        Args:
+            client: OpenAI client instance
+        """
+        self.client = client
+
+    def upload(self, path: Path) -> str:
+        """Upload a JSONL request file (purpose "batch")."""
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create(
+        self,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Create a batch for an uploaded request file."""
+        batch = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint=endpoint,
+            completion_window=completion_window,
+            metadata=metadata,
+        )
+        return batch.model_dump()
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """Get the current batch state."""
+        return self.client.batches.retrieve(batch_id).model_dump()
+
+    def download(self, file_id: str) -> str:
+        """Get the content of an output or error file."""
+        return self.client.files.content(file_id).text
+
+    def cancel(self, batch_id: str) -> None:
+        """Cancel a batch."""
+        self.client.batches.cancel(batch_id)
+
+
+class BatchJob:
+    """Builds, submits and collects batch chat completion jobs.
+
+    Each item becomes one request whose custom_id is its position, so
+    results are mapped back in order whatever order the provider returns
+    them in. Items are split over several batches when there are more than
+    max_requests_per_batch.
+
+    Example:
+        job = BatchJob(OpenAIBatchTransport(client), model="gpt-4o-mini")
+
+        results = job.run(
+            chunks,
+            lambda chunk: [
+                {"role": "system", "content": EXTRACTION_PROMPT},
+                {"role": "user", "content": chunk["text"]},
+            ],
+        )
+        # [(chunk, "response text" or an ItemFailure), ...]
+
+        # Or step by step (e.g. submit now, collect in another process)
+        batch_ids = job.submit(job.build(chunks, to_messages))
+        job.cleanup()
+        batches = [job.wait(batch_id) for batch_id in batch_ids]
+        results = job.collect(chunks, batches)
+    """
+
+    def __init__(
+        self,
+        transport: BatchTransport,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0.1,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Type[BaseModel]] = None,
+        endpoint: str = "/v1/chat/completions",
+        completion_window: str = "24h",
+        max_requests_per_batch: int = MAX_REQUESTS_PER_BATCH,
+        work_dir: Optional[Union[str, Path]] = None,
+        name: str = "batch",
+    ):
+        """Initialize batch job.
+
+        Args:
+            transport: Batch endpoint transport
+            model: Model name (default: "gpt-4o-mini")
+            temperature: Temperature for generation (default: 0.1)
+            max_tokens: Maximum tokens for each response
+            response_format: Optional Pydantic model; results are parsed
+                into it (an ItemFailure where the output does not validate)
+            endpoint: Endpoint the requests target
+            completion_window: Provider completion window (default: "24h")
+            max_requests_per_batch: Requests per input file
+            work_dir: Directory for request files (default: a temp dir
+                created by build() and removed by cleanup())
+            name: Name for this job (for logging; file names, batch metadata)
+        """
+        self.transport = transport
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.response_format = response_format
+        self.endpoint = endpoint
+        self.completion_window = completion_window
+        self.max_requests_per_batch = max(1, int(max_requests_per_batch))
+        self.work_dir = Path(work_dir) if work_dir is not None else None
+        self.name = name
+        self._owns_work_dir = False
+
+    def build(
+        self, items: List[Any], messages_fn: Callable[[Any], List[Dict[str, str]]]
+    ) -> List[Path]:
+        """Write the JSONL request files for items.
+
+        Args:
+            items: Items to process
+            messages_fn: Function building the chat messages for an item
+
+        Returns:
+            Paths of the request files (one per batch)
+        """
+        if self.work_dir is None:
+            self.work_dir = Path(tempfile.mkdtemp(prefix="llm-batch-"))
+            self._owns_work_dir = True
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        starts = range(0, len(items), self.max_requests_per_batch)
+        for part, start in enumerate(starts):
+            path = self.work_dir / f"{self.name}-{part:04d}.jsonl"
+            end = min(start + self.max_requests_per_batch, len(items))
+            with open(path, "w", encoding="utf-8") as f:
+                for idx in range(start, end):
+                    request = {
+                        "custom_id": str(idx),
+                        "method": "POST",
+                        "url": self.endpoint,
+                        "body": self._request_body(messages_fn(items[idx])),
+                    }
+                    f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            paths.append(path)
+
+        logger.info(
+            f"Batch '{self.name}': wrote {len(items)} requests to {len(paths)} file(s)"
+        )
+        return paths
+
+    def cleanup(self) -> None:
+        """Remove the temp dir build() created (a given work_dir is kept)."""
+        if self._owns_work_dir and self.work_dir is not None:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            self.work_dir = None
+            self._owns_work_dir = False
+
+    def submit(self, paths: List[Path]) -> List[str]:
+        """Upload request files and create one batch per file.
+
+        Args:
+            paths: Request files from build()
+
+        Returns:
+            Batch ids
+        """
+        batch_ids = []
+        for path in paths:
+            file_id = self.transport.upload(path)
+            batch = self.transport.create(
+                file_id,
+                self.endpoint,
+                self.completion_window,
+                metadata={"job": self.name, "file": path.name},
+            )
+            batch_ids.append(batch["id"])
+            logger.info(f"Batch '{self.name}': submitted {path.name} as {batch['id']}")
+        return batch_ids
+
+    def wait(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Poll a batch until it reaches a terminal status.
+
+        Args:
+            batch_id: Batch id from submit()
+            poll_interval: Seconds between polls (default: 30)
+            timeout: Maximum seconds to wait (None = until terminal)
+
+        Returns:
+            Final batch state
+
+        Raises:
+            TimeoutError: If the batch is still running after timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            batch = self.transport.retrieve(batch_id)
+            status = batch.get("status")
+            if status in TERMINAL_STATUSES:
+                logger.info(f"Batch '{self.name}': {batch_id} finished ({status})")
+                return batch
+
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise TimeoutError(
+                    f"Batch {batch_id} still {status} after {timeout}s"
+                )
+            logger.debug(f"Batch '{self.name}': {batch_id} is {status}")
+            time.sleep(poll_interval)
+
+    def collect(
+        self, items: List[Any], batches: List[Dict[str, Any]]
+    ) -> List[Tuple[Any, Any]]:
+        """Map batch outputs back to items.
+
+        Args:
+            items: Items passed to build()
+            batches: Final batch states from wait()
+
+        Returns:
+            List of (item, result) tuples in original order; requests that
+            failed or were not completed get an ItemFailure carrying a
+            BatchRequestError
+        """
+        results: List[Any] = [
+            ItemFailure(BatchRequestError("request was not completed"))
+        ] * len(items)
+        for batch in batches:
+            file_ids = [
+                batch[key]
+                for key in ("output_file_id", "error_file_id")
+                if batch.get(key)
+            ]
+            if not file_ids:
+                logger.warning(
+                    f"Batch '{self.name}': {batch.get('id')} has no output "
+                    f"(status={batch.get('status')})"
+                )
+                continue
+
+            for file_id in file_ids:
+                for line in self.transport.download(file_id).splitlines():
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    results[int(record["custom_id"])] = self._parse_result(record)
+
+        succeeded = sum(1 for result in results if _succeeded(result))
+        logger.info(
+            f"Batch '{self.name}': collected {succeeded}/{len(items)} results"
+        )
+        return list(zip(items, results))
+
+    def run(
+        self,
+        items: List[Any],
+        messages_fn: Callable[[Any], List[Dict[str, str]]],
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[Any, Any]]:
+        """Build, submit, wait for and collect a batch job.
+
+        Args:
+            items: Items to process
+            messages_fn: Function building the chat messages for an item
+            poll_interval: Seconds between polls (default: 30)
+            timeout: Maximum seconds to wait for each batch
+
+        Returns:
+            List of (item, result) tuples in original order
+        """
+        if not items:
+            return []
+        try:
+            batch_ids = self.submit(self.build(items, messages_fn))
+        finally:
+            self.cleanup()
+        batches = [self.wait(b, poll_interval, timeout) for b in batch_ids]
+        return self.collect(items, batches)
+
+    def _request_body(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Chat completion request body for one item."""
+        body: Dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+        }
+        if self.max_tokens is not None:
+            body["max_tokens"] = self.max_tokens
+        if self.response_format is not None:
+            body["response_format"] = json_schema_response_format(
+                self.response_format
+            )
+        return body
+
+    def _parse_result(self, record: Dict[str, Any]) -> Any:
+        """Result of one output record (ItemFailure if the request failed)."""
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            reason = _failure_reason(record)
+            logger.debug(
+                f"Batch '{self.name}': request {record.get('custom_id')} failed: "
+                f"{reason}"
+            )
+            return ItemFailure(BatchRequestError(f"request failed: {reason}"))
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError) as e:
+            return ItemFailure(
+                BatchRequestError(f"malformed response body: {e!r}")
+            )
+
+        if self.response_format is None:
+            return content.strip()
+        try:
+            return self.response_format.model_validate_json(content)
+        except ValidationError as e:
+            logger.debug(
+                f"Batch '{self.name}': request {record.get('custom_id')} "
+                f"returned invalid {self.response_format.__name__}: {e}"
+            )
+            return ItemFailure(e)
+
+
+def _failure_reason(record: Dict[str, Any]) -> str:
+    """Provider's reason for a failed output or error file record."""
+    response = record.get("response") or {}
+    error = record.get("error")
+    if not error:
+        body = response.get("body")
+        error = body.get("error") if isinstance(body, dict) else body
+    if isinstance(error, dict):
+        error = ": ".join(
+            str(error[key]) for key in ("code", "message") if error.get(key)
+        )
+    status = response.get("status_code")
+    if not error:
+        return f"status {status}"
+    return f"{error} (status {status})" if status else str(error)
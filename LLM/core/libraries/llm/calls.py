@@ -5,11 +5,36 @@ Provides standardized LLM call patterns with retry and error handling.
 Part of the CORE libraries - LLM library.
 """
 
+import time
 import logging
-from typing import Any, Dict, List, Optional, Type, TypeVar
-from openai import OpenAI
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 
+from LLM.core.libraries.llm.partial_json import PartialJSONParser, partial_model
+from LLM.core.libraries.llm.response_cache import ResponseCache
+from LLM.core.libraries.metrics.tokens import (
+    estimate_message_tokens,
+    record_estimate,
+    record_usage,
+)
+from LLM.core.libraries.metrics import MetricRegistry
+from LLM.core.libraries.rate_limiting import (
+    CompositeLimiter,
+    ScheduledJob,
+)
+from LLM.core.libraries.rate_limiting.headers import apply_rate_limit_headers
 from LLM.core.libraries.retry.decorators import retry_llm_call
 
 logger = logging.getLogger(__name__)
@@ -17,6 +42,76 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=BaseModel)
 
 
+def _estimate_request_tokens(
+    messages: List[Dict[str, str]], model: str, max_tokens: Optional[int]
+) -> int:
+    """Token estimate for rate limiting (recorded for estimate accuracy)."""
+    tokens = estimate_message_tokens(messages, model, max_tokens)
+    record_estimate(model, tokens)
+    return tokens
+
+
+def json_schema_response_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Chat completions response_format requesting JSON matching a model.
+
+    Used where the SDK's parse() helper is not available (streaming, batch
+    request files).
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema()},
+    }
+
+
+def _request(
+    resource: Any, method: str, with_headers: bool, **kwargs: Any
+) -> Tuple[Any, Optional[Mapping[str, str]]]:
+    """Call an SDK endpoint, returning the parsed response and HTTP headers.
+
+    Headers are only read (through the SDK's with_raw_response wrapper) when
+    with_headers is set; clients without that wrapper yield None.
+    """
+    raw_api = getattr(resource, "with_raw_response", None) if with_headers else None
+    if raw_api is None:
+        return getattr(resource, method)(**kwargs), None
+    raw_response = getattr(raw_api, method)(**kwargs)
+    return raw_response.parse(), raw_response.headers
+
+
+def _pause_targets(
+    job: Optional[ScheduledJob], limiter: Optional[CompositeLimiter]
+) -> Optional[List[Any]]:
+    """Limiters that rate limit headers should pause (None if there are none)."""
+    scheduler = job.scheduler if job is not None else None
+    targets = [t for t in (limiter, scheduler) if t is not None]
+    return targets or None
+
+
+def _acquire_budget(
+    job: Optional[ScheduledJob],
+    limiter: Optional[CompositeLimiter],
+    messages: List[Dict[str, str]],
+    model: str,
+    max_tokens: Optional[int],
+) -> Tuple[Any, Any]:
+    """Wait for the scheduler job's turn, then for a limiter permit.
+
+    Returns:
+        (job reservation or None, limiter permit or None)
+    """
+    if job is None and limiter is None:
+        return None, None
+    tokens = _estimate_request_tokens(messages, model, max_tokens)
+    reservation = job.acquire(tokens) if job is not None else None
+    try:
+        permit = limiter.acquire(tokens) if limiter is not None else None
+    except BaseException:
+        if reservation is not None:
+            job.release(reservation)
+        raise
+    return reservation, permit
+
+
 def call_llm(
     client: OpenAI,
     messages: List[Dict[str, str]],
@@ -25,6 +120,11 @@ def call_llm(
     max_tokens: Optional[int] = None,
     response_format: Optional[Type[BaseModel]] = None,
     max_attempts: int = 3,
+    limiter: Optional[CompositeLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    stream: bool = False,
+    on_usage: Optional[Callable[[Dict[str, Any]], None]] = None,
+    job: Optional[ScheduledJob] = None,
 ) -> Any:
     """Make an LLM call with automatic retry and error handling.
 
@@ -36,9 +136,28 @@ def call_llm(
         max_tokens: Maximum tokens for response
         response_format: Optional Pydantic model for structured output
         max_attempts: Maximum retry attempts (default: 3)
+        limiter: Optional CompositeLimiter; every attempt waits for an RPM
+            slot, its estimated tokens and a concurrency permit, and is
+            reconciled with the reported usage. Rate limit headers
+            (retry-after, exhausted x-ratelimit-remaining-*) pause the
+            limiter for every caller sharing it
+        cache: Optional ResponseCache; deterministic requests (temperature
+            up to cache.max_temperature) are answered from disk when an
+            identical request was made before
+        stream: Return an iterator over the response as it is generated
+            instead (see stream_llm; cache is not used)
+        on_usage: Optional callback receiving each attempt's reported usage
+            (prompt_tokens, completion_tokens, total_tokens, cost_usd); usage
+            is always recorded in the llm_tokens_* / llm_cost_usd_total metrics
+        job: Optional scheduler job (see BudgetScheduler.job()); every
+            attempt waits for its turn in the process-wide budget and is
+            reconciled with the reported usage; rate limit headers pause
+            its scheduler. Use interactive_job() for user-facing requests so
+            they are admitted ahead of batch jobs
 
     Returns:
-        Response content (string or parsed Pydantic model)
+        Response content (string or parsed Pydantic model), or an iterator
+        of text deltas / partial models when stream is set
 
     Example:
         client = get_openai_client()
@@ -52,30 +171,258 @@ def call_llm(
             temperature=0.1
         )
     """
-    @retry_llm_call(max_attempts=max_attempts)
+    if stream:
+        return stream_llm(
+            client,
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            max_attempts=max_attempts,
+            limiter=limiter,
+            on_usage=on_usage,
+            job=job,
+        )
+
+    cache_key = None
+    if cache is not None and cache.cacheable(temperature):
+        cache_key = cache.key(model, messages, temperature, max_tokens, response_format)
+        cached = cache.get(cache_key, response_format)
+        if cached is not None:
+            logger.debug(f"LLM response cache hit ({model})")
+            return cached
+
+    pause_targets = _pause_targets(job, limiter)
+
+    @retry_llm_call(max_attempts=max_attempts, limiter=pause_targets)
     def _call():
+        reservation, permit = _acquire_budget(
+            job, limiter, messages, model, max_tokens
+        )
+        actual = None
+        try:
+            if response_format:
+                # Use structured output (beta API)
+                response, headers = _request(
+                    client.beta.chat.completions,
+                    "parse",
+                    pause_targets is not None,
+                    model=model,
+                    messages=messages,
+                    response_format=response_format,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            else:
+                # Standard chat completion
+                response, headers = _request(
+                    client.chat.completions,
+                    "create",
+                    pause_targets is not None,
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            usage = record_usage(model, getattr(response, "usage", None))
+            if usage is not None and on_usage is not None:
+                on_usage(usage)
+            actual = usage["total_tokens"] if usage else None
+            if permit is not None:
+                permit.actual_tokens = actual
+            # Window exhausted: hold everyone back until it resets
+            apply_rate_limit_headers(pause_targets, headers)
+        finally:
+            if permit is not None:
+                limiter.release(permit)
+            if reservation is not None:
+                job.reconcile(reservation, actual)
+
+        if response_format:
+            return response.choices[0].message.parsed
+        content = response.choices[0].message.content
+        return content.strip() if content else ""
+
+    result = _call()
+    if cache_key is not None and result is not None:
+        cache.set(cache_key, result)
+    return result
+
+
+def stream_llm(
+    client: OpenAI,
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.1,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Type[T]] = None,
+    max_attempts: int = 3,
+    limiter: Optional[CompositeLimiter] = None,
+    on_usage: Optional[Callable[[Dict[str, Any]], None]] = None,
+    job: Optional[ScheduledJob] = None,
+) -> Iterator[Any]:
+    """Stream an LLM response as it is generated.
+
+    Opening the stream is retried like call_llm(); errors after the first
+    chunk propagate to the consumer. The request is sent on the first
+    next(). Time to first token is recorded in the
+    llm_time_to_first_token_seconds histogram (labelled by model).
+
+    Args:
+        client: OpenAI client instance
+        messages: List of message dicts with 'role' and 'content'
+        model: Model name (default: "gpt-4o-mini")
+        temperature: Temperature for generation (default: 0.1)
+        max_tokens: Maximum tokens for response
+        response_format: Optional Pydantic model for structured output
+        max_attempts: Maximum attempts to open the stream (default: 3)
+        limiter: Optional CompositeLimiter; the permit is held until the
+            stream ends and reconciled with the reported usage
+        on_usage: Optional callback receiving the usage reported at the end
+            of the stream (see call_llm)
+        job: Optional scheduler job (see call_llm); the reservation is held
+            until the stream ends. Pass interactive_job() so someone watching
+            tokens arrive is admitted ahead of queued batch work
+
+    Yields:
+        Text deltas; with response_format, partial model instances (see
+        partial_model) as more fields arrive - re-parsed each time the
+        buffer grows by an eighth, see PartialJSONParser - then the final
+        validated instance
+
+    Example:
+        for delta in stream_llm(client, messages):
+            print(delta, end="", flush=True)
+
+        for summary in stream_llm(client, messages, response_format=Summary):
+            render(summary)  # Fields fill in as they arrive; last one is final
+    """
+    request: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    if response_format:
+        request["response_format"] = json_schema_response_format(response_format)
+
+    @retry_llm_call(max_attempts=max_attempts, limiter=_pause_targets(job, limiter))
+    def _open():
+        reservation, permit = _acquire_budget(
+            job, limiter, messages, model, max_tokens
+        )
+        try:
+            sent_at = time.monotonic()
+            chunks = client.chat.completions.create(**request)
+            return chunks, reservation, permit, sent_at
+        except BaseException:
+            if permit is not None:
+                limiter.release(permit)
+            if reservation is not None:
+                job.reconcile(reservation, None)
+            raise
+
+    chunks, reservation, permit, sent_at = _open()
+    actual = None
+    ttft = MetricRegistry.get_instance().get("llm_time_to_first_token_seconds")
+    first = True
+    parser = PartialJSONParser()
+    last_fields = None
+    try:
+        for chunk in chunks:
+            usage = record_usage(model, getattr(chunk, "usage", None))
+            if usage is not None:
+                if on_usage is not None:
+                    on_usage(usage)
+                actual = usage["total_tokens"]
+                if permit is not None:
+                    permit.actual_tokens = actual
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+
+            if first:
+                first = False
+                if ttft is not None:
+                    ttft.observe(time.monotonic() - sent_at, labels={"model": model})
+
+            if response_format is None:
+                yield delta
+                continue
+
+            # Re-parse only once the buffer has grown enough (linear overall)
+            parser.feed(delta)
+            if not parser.should_parse():
+                continue
+            fields = parser.parse()
+            if isinstance(fields, dict) and fields != last_fields:
+                last_fields = fields
+                yield partial_model(response_format, fields)
+
+        if response_format is not None:
+            yield response_format.model_validate_json(parser.text)
+    finally:
+        if permit is not None:
+            limiter.release(permit)
+        if reservation is not None:
+            job.reconcile(reservation, actual)
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+async def acall_llm(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.1,
+    max_tokens: Optional[int] = None,
+    response_format: Optional[Type[BaseModel]] = None,
+    max_attempts: int = 3,
+) -> Any:
+    """Async counterpart of call_llm() for AsyncOpenAI clients.
+
+    Same arguments, retry behaviour and return value as call_llm(); retry
+    backoff awaits instead of blocking the event loop.
+
+    Example:
+        client = get_async_openai_client()
+        response = await acall_llm(
+            client,
+            messages=[{"role": "user", "content": "What is Python?"}],
+        )
+    """
+    @retry_llm_call(max_attempts=max_attempts)
+    async def _call():
         if response_format:
             # Use structured output (beta API)
-            response = client.beta.chat.completions.parse(
+            response = await client.beta.chat.completions.parse(
                 model=model,
                 messages=messages,
                 response_format=response_format,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
+            record_usage(model, getattr(response, "usage", None))
             return response.choices[0].message.parsed
         else:
             # Standard chat completion
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
+            record_usage(model, getattr(response, "usage", None))
             content = response.choices[0].message.content
             return content.strip() if content else ""
 
-    return _call()
+    return await _call()
 
 
 def call_llm_with_structured_output(
@@ -87,6 +434,9 @@ def call_llm_with_structured_output(
     temperature: float = 0.1,
     max_tokens: Optional[int] = None,
     max_attempts: int = 3,
+    limiter: Optional[CompositeLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    job: Optional[ScheduledJob] = None,
 ) -> T:
     """Make an LLM call with structured output (Pydantic model).
 
@@ -99,6 +449,9 @@ def call_llm_with_structured_output(
         temperature: Temperature for generation (default: 0.1)
         max_tokens: Maximum tokens for response
         max_attempts: Maximum retry attempts (default: 3)
+        limiter: Optional CompositeLimiter (see call_llm)
+        cache: Optional ResponseCache (see call_llm)
+        job: Optional scheduler job (see call_llm)
 
     Returns:
         Parsed Pydantic model instance
@@ -131,6 +484,9 @@ def call_llm_with_structured_output(
         max_tokens=max_tokens,
         response_format=response_model,
         max_attempts=max_attempts,
+        limiter=limiter,
+        cache=cache,
+        job=job,
     )
 
 
@@ -142,6 +498,9 @@ def call_llm_simple(
     temperature: float = 0.1,
     max_tokens: Optional[int] = None,
     max_attempts: int = 3,
+    limiter: Optional[CompositeLimiter] = None,
+    cache: Optional[ResponseCache] = None,
+    job: Optional[ScheduledJob] = None,
 ) -> str:
     """Make a simple LLM call with system and user prompts.
 
@@ -153,6 +512,9 @@ def call_llm_simple(
         temperature: Temperature for generation (default: 0.1)
         max_tokens: Maximum tokens for response
         max_attempts: Maximum retry attempts (default: 3)
+        limiter: Optional CompositeLimiter (see call_llm)
+        cache: Optional ResponseCache (see call_llm)
+        job: Optional scheduler job (see call_llm)
 
     Returns:
         Response text
@@ -178,5 +540,8 @@ def call_llm_simple(
         temperature=temperature,
         max_tokens=max_tokens,
         max_attempts=max_attempts,
+        limiter=limiter,
+        cache=cache,
+        job=job,
     )
 
@@ -7,23 +7,109 @@ Part of the CORE libraries - LLM library.
 
 import os
 import logging
-from typing import Optional
-from openai import OpenAI
+import threading
+import importlib.util
+from typing import Any, Dict, Optional, Tuple
+from openai import (
+    DEFAULT_CONNECTION_LIMITS,
+    AsyncOpenAI,
+    DefaultHttpxClient,
+    OpenAI,
+)
 
 logger = logging.getLogger(__name__)
 
+# Environment variables tuning the shared connection pool
+MAX_CONNECTIONS_ENV = "LLM_HTTP_MAX_CONNECTIONS"
+MAX_KEEPALIVE_ENV = "LLM_HTTP_MAX_KEEPALIVE"
+KEEPALIVE_EXPIRY_ENV = "LLM_HTTP_KEEPALIVE_EXPIRY"
+
+# Cached clients by (api_key, base_url, timeout, max_retries), all sharing
+# one keep-alive connection pool
+_clients: Dict[Tuple[str, Optional[str], float, int], OpenAI] = {}
+_http_client: Optional["_SharedHttpClient"] = None
+_clients_lock = threading.Lock()
+
+
+class _SharedHttpClient(DefaultHttpxClient):
+    """The SDK's default HTTP client, shared by all cached OpenAI clients.
+
+    OpenAI.close() and ``with client:`` close the client's HTTP client; for
+    the shared pool that would break every other cached client, so close()
+    is a no-op here and only close_openai_clients() releases the pool.
+    """
+
+    def close(self) -> None:
+        """Ignore closes from individual clients (see close_openai_clients)."""
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Ignore context-manager exits from individual clients."""
+
+    def release(self) -> None:
+        """Close the pool and its connections."""
+        super().close()
+
+
+def _shared_http_client() -> "_SharedHttpClient":
+    """Get the HTTP client pooling connections for all cached clients.
+
+    Built on openai.DefaultHttpxClient, so the SDK's defaults (timeouts,
+    redirects, transport settings) still apply. HTTP/2 is used when the h2
+    package is installed, as it is with requirements.txt (httpx[http2]);
+    many requests then share one connection. Without h2, HTTP/1.1
+    keep-alive connections are reused. Connection limits
+    default to the SDK's own (1000 connections), since every cached client
+    and all their concurrent workers share this one pool; only the
+    keep-alive expiry is raised so idle connections survive between
+    batches. Caller must hold _clients_lock.
+
+    Returns:
+        Shared HTTP client
+    """
+    global _http_client
+    if _http_client is None:
+        defaults = DEFAULT_CONNECTION_LIMITS
+        # Limits class of the HTTP library this SDK version is built on
+        limits = type(defaults)(
+            max_connections=int(os.getenv(MAX_CONNECTIONS_ENV, defaults.max_connections)),
+            max_keepalive_connections=int(
+                os.getenv(MAX_KEEPALIVE_ENV, defaults.max_keepalive_connections)
+            ),
+            keepalive_expiry=float(os.getenv(KEEPALIVE_EXPIRY_ENV, "60")),
+        )
+        kwargs: Dict[str, Any] = {
+            "http2": importlib.util.find_spec("h2") is not None,
+            "limits": limits,
+        }
+        _http_client = _SharedHttpClient(**kwargs)
+        logger.debug(f"Initialized shared HTTP pool ({kwargs})")
+    return _http_client
+
 
 def get_openai_client(
     api_key: Optional[str] = None,
     timeout: int = 60,
     max_retries: int = 3,
+    base_url: Optional[str] = None,
+    shared: bool = True,
 ) -> OpenAI:
     """Get an initialized OpenAI client with standard configuration.
 
+    Clients are cached per (api_key, base_url, timeout, max_retries) and
+    share one keep-alive connection pool, so calling this for every chunk
+    (e.g. from an agent_factory) reuses warm connections instead of paying
+    connection setup on each call. Closing one of them (client.close() or
+    ``with client:``) leaves the shared pool open for the others; release
+    everything with close_openai_clients().
+
     Args:
         api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
         timeout: Request timeout in seconds (default: 60)
         max_retries: Maximum number of retries (default: 3)
+        base_url: API base URL (defaults to OPENAI_BASE_URL env var or the
+            OpenAI API)
+        shared: Return the cached, pooled client (default: True); False
+            builds a private client with its own pool
 
     Returns:
         Initialized OpenAI client instance
@@ -34,6 +120,8 @@ def get_openai_client(
     Example:
         client = get_openai_client()
         response = client.chat.completions.create(...)
+
+        close_openai_clients()  # At shutdown
     """
     if api_key is None:
         api_key = os.getenv("OPENAI_API_KEY")
@@ -43,13 +131,102 @@ def get_openai_client(
             "OPENAI_API_KEY is required. Set it in environment or pass as argument."
         )
 
-    client = OpenAI(
+    if base_url is None:
+        base_url = os.getenv("OPENAI_BASE_URL") or None
+
+    if not shared:
+        return OpenAI(
+            api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries
+        )
+
+    key = (api_key, base_url, float(timeout), max_retries)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=timeout,
+                max_retries=max_retries,
+                http_client=_shared_http_client(),
+            )
+            _clients[key] = client
+            logger.debug(
+                f"Initialized OpenAI client (timeout={timeout}, "
+                f"max_retries={max_retries}, base_url={base_url})"
+            )
+
+    return client
+
+
+def close_openai_clients() -> None:
+    """Close all cached OpenAI clients and the shared connection pool.
+
+    Clients obtained earlier must not be used afterwards; the next
+    get_openai_client() call builds fresh ones.
+    """
+    global _http_client
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        http_client, _http_client = _http_client, None
+
+    if http_client is not None:
+        http_client.release()
+    logger.debug(f"Closed {len(clients)} cached OpenAI client(s)")
+
+
+def get_async_openai_client(
+    api_key: Optional[str] = None,
+    timeout: int = 60,
+    max_retries: int = 3,
+    base_url: Optional[str] = None,
+) -> AsyncOpenAI:
+    """Get an initialized AsyncOpenAI client with standard configuration.
+
+    Use with acall_llm() and the asyncio concurrency helpers: many in-flight
+    calls share one event loop instead of one thread each. Async clients are
+    not cached or pooled across calls - keep one per event loop.
+
+    Args:
+        api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
+        timeout: Request timeout in seconds (default: 60)
+        max_retries: Maximum number of retries (default: 3)
+        base_url: API base URL (defaults to OPENAI_BASE_URL env var or the
+            OpenAI API)
+
+    Returns:
+        Initialized AsyncOpenAI client instance
+
+    Raises:
+        RuntimeError: If API key is not provided and not found in environment
+
+    Example:
+        client = get_async_openai_client()
+        response = await client.chat.completions.create(...)
+    """
+    if api_key is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+
+    if not api_key:
+        raise RuntimeError(
+            "OPENAI_API_KEY is required. Set it in environment or pass as argument."
+        )
+
+    if base_url is None:
+        base_url = os.getenv("OPENAI_BASE_URL") or None
+
+    client = AsyncOpenAI(
         api_key=api_key,
+        base_url=base_url,
         timeout=timeout,
         max_retries=max_retries,
     )
 
-    logger.debug(f"Initialized OpenAI client (timeout={timeout}, max_retries={max_retries})")
+    logger.debug(
+        f"Initialized AsyncOpenAI client (timeout={timeout}, "
+        f"max_retries={max_retries}, base_url={base_url})"
+    )
 
     return client
 
@@ -0,0 +1,165 @@
+"""
+Incremental JSON parsing for streamed structured outputs.
+
+A streamed JSON response is invalid until its last token arrives. The
+helpers here close whatever is still open in a prefix (strings, arrays,
+objects) so consumers can render a partial object while it is generated.
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+
+# Characters after which a prefix can be cut back to a valid value
+_CUT_POINTS = ",:{["
+
+
+class PartialJSONParser:
+    """Incremental reader of a JSON document that arrives in pieces.
+
+    feed() scans only the new text, keeping the open strings/containers and
+    the positions (outside string literals) where the document can be cut
+    back to a valid value, so parse() never rescans the buffer to close it.
+    parse() itself still decodes the whole buffer; stream consumers should
+    call it only when should_parse() says enough has arrived.
+
+    Example:
+        parser = PartialJSONParser()
+        for delta in deltas:
+            parser.feed(delta)
+            if parser.should_parse():
+                render(parser.parse())
+    """
+
+    # Re-parse once the buffer has grown by this fraction since the last
+    # parse: parses get rarer as the document grows, keeping total work linear
+    REPARSE_GROWTH = 0.125
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._parsed_length = 0
+        self._in_string = False
+        self._escape = False
+        self._closers: List[str] = []
+        # (position, closers before, closers after) of each cut point
+        self._cuts: List[Tuple[int, Tuple[str, ...], Tuple[str, ...]]] = []
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def feed(self, delta: str) -> None:
+        """Append the next piece of the document."""
+        closers = self._closers
+        for offset, ch in enumerate(delta):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+                continue
+
+            before = tuple(closers)
+            if ch == "{":
+                closers.append("}")
+            elif ch == "[":
+                closers.append("]")
+            elif ch in "}]" and closers:
+                closers.pop()
+            if ch in _CUT_POINTS:
+                self._cuts.append((self._length + offset, before, tuple(closers)))
+
+        self._parts.append(delta)
+        self._length += len(delta)
+
+    def should_parse(self) -> bool:
+        """Check whether enough text arrived since the last parse()."""
+        grown = self._length - self._parsed_length
+        return grown > 0 and grown >= self._parsed_length * self.REPARSE_GROWTH
+
+    def parse(self) -> Optional[Any]:
+        """Parse the longest valid reading of the text fed so far.
+
+        Returns:
+            Parsed value, or None if nothing parseable has arrived yet
+        """
+        self._parsed_length = self._length
+        text = self.text
+        if not text.strip():
+            return None
+
+        for prefix, closers in self._candidates(text):
+            if not prefix.strip():
+                continue
+            try:
+                return json.loads(prefix + "".join(reversed(closers)))
+            except ValueError:
+                continue
+        return None
+
+    def _candidates(self, text: str) -> Iterator[Tuple[str, Sequence[str]]]:
+        """Prefixes to try, longest first, with the closers each needs."""
+        tail = text
+        if self._in_string:
+            # A dangling backslash would escape the closing quote
+            tail = (text[:-1] if self._escape else text) + '"'
+        yield tail, self._closers
+
+        # Cut back to the previous separator (keeping it, then without it)
+        for position, before, after in reversed(self._cuts):
+            yield text[: position + 1], after
+            yield text[:position], before
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """Parse the longest valid reading of a (possibly truncated) JSON prefix.
+
+    Open strings are closed where they stop; a key without its value yet,
+    or an unfinished literal, is dropped. For a document arriving in pieces
+    use PartialJSONParser, which does not rescan earlier pieces.
+
+    Args:
+        text: JSON text received so far
+
+    Returns:
+        Parsed value, or None if nothing parseable has arrived yet
+
+    Example:
+        parse_partial_json('{"name": "Pyth')         # {'name': 'Pyth'}
+        parse_partial_json('{"tags": ["a", "b"], "n')  # {'tags': ['a', 'b']}
+    """
+    parser = PartialJSONParser()
+    parser.feed(text)
+    return parser.parse()
+
+
+def partial_model(model: Type[T], data: Dict[str, Any]) -> T:
+    """Build an unvalidated model instance from partially streamed fields.
+
+    Required fields that have not arrived yet are None; nested models stay
+    plain dicts until the final, validated object is parsed.
+
+    Args:
+        model: Pydantic model class
+        data: Fields parsed so far
+
+    Returns:
+        Model instance built with model_construct() (no validation)
+    """
+    fields: Dict[str, Any] = {
+        name: None for name, field in model.model_fields.items() if field.is_required()
+    }
+    fields.update(data)
+    return model.model_construct(**fields)
@@ -0,0 +1,199 @@
+"""
+Content-addressed LLM response cache.
+
+Re-runs of extraction and prompt-generation pipelines repeat most of their
+calls with identical model, messages and settings. Deterministic requests
+(low temperature) are keyed by a stable hash of the full request and their
+responses kept on local disk, so a replay returns without an API call.
+"""
+
+import json
+import zlib
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from LLM.core.libraries.caching import DiskCache, get_default_disk_cache
+
+logger = logging.getLogger(__name__)
+
+# Key namespaces: plain completions and parsed structured outputs
+NAMESPACE_TEXT = "text"
+NAMESPACE_STRUCTURED = "structured"
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """Disk cache of LLM responses keyed by a hash of the request.
+
+    Plain completions are stored as compressed UTF-8 text; structured
+    outputs as compressed JSON in a separate namespace, re-validated into
+    the Pydantic model on read. The response model's JSON schema is part of
+    the key, so changing the model invalidates its entries.
+
+    Only requests with temperature <= max_temperature are cached: sampling
+    at higher temperatures is expected to vary between calls.
+
+    Example:
+        cache = ResponseCache("~/.cache/llm/responses.sqlite")
+        answer = call_llm(client, messages, temperature=0, cache=cache)
+        answer = call_llm(client, messages, temperature=0, cache=cache)  # Disk hit
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        max_temperature: float = 0.1,
+        name: str = "llm_responses",
+        disk_cache: Optional[DiskCache] = None,
+    ):
+        """Initialize response cache.
+
+        Args:
+            path: Path to the sqlite database file (ignored with disk_cache)
+            max_bytes: Byte budget for stored responses (default: 256 MiB)
+            ttl: Time-to-live in seconds (None = no expiration)
+            max_temperature: Highest temperature whose responses are cached
+            name: Name for this cache (for logging)
+            disk_cache: Existing DiskCache to store entries in
+
+        Raises:
+            ValueError: If neither path nor disk_cache is given
+        """
+        if disk_cache is None:
+            if path is None:
+                raise ValueError("ResponseCache needs a path or a disk_cache")
+            disk_cache = DiskCache(
+                Path(path).expanduser(), max_bytes=max_bytes, ttl=ttl, name=name
+            )
+        self.disk = disk_cache
+        self.name = name
+        self.max_temperature = max_temperature
+
+    def cacheable(self, temperature: Optional[float]) -> bool:
+        """Check whether a request at this temperature may be cached."""
+        return (temperature or 0.0) <= self.max_temperature
+
+    @staticmethod
+    def key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Type[BaseModel]] = None,
+    ) -> str:
+        """Build the cache key of a request.
+
+        Args:
+            model: Model name
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Maximum completion tokens
+            response_format: Pydantic model for structured output
+
+        Returns:
+            "<namespace>:<sha256 of the canonical request>"
+        """
+        request: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        namespace = NAMESPACE_TEXT
+        if response_format is not None:
+            namespace = NAMESPACE_STRUCTURED
+            request["response_format"] = {
+                "name": f"{response_format.__module__}.{response_format.__qualname__}",
+                "schema": response_format.model_json_schema(),
+            }
+
+        canonical = json.dumps(
+            request,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def get(
+        self, key: str, response_format: Optional[Type[BaseModel]] = None
+    ) -> Any:
+        """Look up a response.
+
+        Args:
+            key: Key from key()
+            response_format: Pydantic model to validate structured entries into
+
+        Returns:
+            Cached response (str or model instance), or None on a miss
+        """
+        blob = self.disk.get(key, _MISSING)
+        if blob is _MISSING:
+            return None
+
+        try:
+            payload = zlib.decompress(blob).decode("utf-8")
+            if response_format is None:
+                return payload
+            return response_format.model_validate_json(payload)
+        except (zlib.error, UnicodeDecodeError, ValidationError) as e:
+            logger.debug(f"Response cache '{self.name}' dropped unreadable {key}: {e}")
+            self.disk.delete(key)
+            return None
+
+    def set(self, key: str, response: Union[str, BaseModel]) -> bool:
+        """Store a response.
+
+        Args:
+            key: Key from key()
+            response: Completion text or parsed model instance
+
+        Returns:
+            True if stored
+        """
+        if isinstance(response, BaseModel):
+            payload = response.model_dump_json()
+        elif isinstance(response, str):
+            payload = response
+        else:
+            return False
+        return self.disk.set(key, zlib.compress(payload.encode("utf-8")))
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics (see DiskCache.stats)."""
+        return self.disk.stats()
+
+    def close(self) -> None:
+        """Close the underlying disk cache."""
+        self.disk.close()
+
+
+def get_default_response_cache(
+    max_bytes: int = 256 * 1024 * 1024,
+) -> Optional[ResponseCache]:
+    """Get a ResponseCache under the directory named by LLM_CACHE_DIR.
+
+    Opt-in like get_default_disk_cache(): returns None when LLM_CACHE_DIR is
+    unset or the database cannot be opened.
+
+    Args:
+        max_bytes: Byte budget for stored responses
+
+    Returns:
+        ResponseCache instance or None
+    """
+    disk = get_default_disk_cache("llm_responses", max_bytes=max_bytes)
+    return ResponseCache(disk_cache=disk) if disk is not None else None
@@ -33,6 +33,14 @@ from LLM.core.libraries.metrics.cost_models import (
     add_model_pricing,
     LLM_PRICING,
 )
+from LLM.core.libraries.metrics.tokens import (
+    UsageCapture,
+    capture_usage,
+    count_tokens,
+    estimate_item_tokens,
+    estimate_message_tokens,
+    record_usage,
+)
 
 
 __all__ = [
@@ -49,4 +57,11 @@ __all__ = [
     "estimate_llm_cost",
     "add_model_pricing",
     "LLM_PRICING",
+    # Tokens and usage
+    "count_tokens",
+    "estimate_message_tokens",
+    "estimate_item_tokens",
+    "record_usage",
+    "capture_usage",
+    "UsageCapture",
 ]
@@ -23,6 +23,64 @@ _retries_attempted = Counter(
     labels=["function", "error_type"],
 )
 
+# Global cache metrics (auto-populated by caching.LRUCache, labelled by cache name)
+_cache_operations = Counter(
+    "cache_operations_total",
+    "Total cache operations (hits and misses)",
+    labels=["cache_name", "operation", "result"],
+)
+_cache_evictions = Counter(
+    "cache_evictions_total",
+    "Total cache evictions (size or byte budget) by cache",
+    labels=["cache_name"],
+)
+_cache_expirations = Counter(
+    "cache_expirations_total",
+    "Total TTL expirations by cache",
+    labels=["cache_name"],
+)
+_cache_entries = Gauge(
+    "cache_entries",
+    "Current number of in-memory entries by cache",
+    labels=["cache_name"],
+)
+_cache_bytes = Gauge(
+    "cache_bytes",
+    "Current weight of in-memory entries in bytes by cache",
+    labels=["cache_name"],
+)
+
+# Global concurrency limit gauge (auto-populated by AdaptiveConcurrencyLimiter)
+_concurrency_limit = Gauge(
+    "concurrency_limit",
+    "Current adaptive concurrency limit by limiter",
+    labels=["limiter"],
+)
+
+# Global LLM streaming latency (auto-populated by llm.stream_llm, by model)
+_llm_time_to_first_token = Histogram(
+    "llm_time_to_first_token_seconds",
+    "Seconds from sending a streamed LLM request to its first token by model",
+    labels=["model"],
+)
+
+# Global LLM usage (auto-populated by llm.call_llm via metrics.tokens.record_usage)
+_llm_tokens_total = Counter(
+    "llm_tokens_total",
+    "Total LLM tokens reported by the provider by model and type",
+    labels=["model", "type"],
+)
+_llm_tokens_per_request = Histogram(
+    "llm_tokens_per_request",
+    "Tokens per LLM request by model and type (prompt, completion, estimated)",
+    labels=["model", "type"],
+)
+_llm_cost_usd_total = Counter(
+    "llm_cost_usd_total",
+    "Total estimated LLM cost in USD by model (see cost_models)",
+    labels=["model"],
+)
+
 
 class MetricRegistry:
     """Singleton registry for all application metrics.
@@ -53,6 +111,16 @@ class MetricRegistry:
         # Auto-register global counters
         self.metrics["errors_total"] = _errors_total
         self.metrics["retries_attempted"] = _retries_attempted
+        self.metrics["cache_operations_total"] = _cache_operations
+        self.metrics["cache_evictions_total"] = _cache_evictions
+        self.metrics["cache_expirations_total"] = _cache_expirations
+        self.metrics["cache_entries"] = _cache_entries
+        self.metrics["cache_bytes"] = _cache_bytes
+        self.metrics["concurrency_limit"] = _concurrency_limit
+        self.metrics["llm_time_to_first_token_seconds"] = _llm_time_to_first_token
+        self.metrics["llm_tokens_total"] = _llm_tokens_total
+        self.metrics["llm_tokens_per_request"] = _llm_tokens_per_request
+        self.metrics["llm_cost_usd_total"] = _llm_cost_usd_total
 
     @classmethod
     def get_instance(cls) -> "MetricRegistry":
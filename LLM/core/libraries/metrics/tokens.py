@@ -0,0 +1,246 @@
+"""
+Token counting and usage capture for LLM calls.
+
+Estimates use the model's tokenizer when tiktoken is installed and a fast
+~4 characters per token heuristic otherwise. Actual prompt/completion
+usage reported by the provider is recorded per model in MetricRegistry,
+together with its cost from cost_models, so TPM limiting and cost tracking
+work from real numbers instead of guesses.
+"""
+
+import logging
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from LLM.core.libraries.metrics.cost_models import estimate_llm_cost
+from LLM.core.libraries.metrics.registry import MetricRegistry
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Fallback encoding for models tiktoken does not know
+DEFAULT_ENCODING = "o200k_base"
+
+# Chat format overhead (OpenAI cookbook): per message, and for the reply
+_TOKENS_PER_MESSAGE = 3
+_TOKENS_PER_REPLY = 3
+
+
+class UsageCapture:
+    """Usage totals of the LLM calls made inside capture_usage()."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.total_tokens = 0
+        self.cost_usd = 0.0
+
+    def add(self, usage: Dict[str, Any]) -> None:
+        """Add one call's usage (as returned by record_usage)."""
+        self.calls += 1
+        self.prompt_tokens += usage["prompt_tokens"]
+        self.completion_tokens += usage["completion_tokens"]
+        self.total_tokens += usage["total_tokens"]
+        self.cost_usd += usage["cost_usd"]
+
+
+# Captures open in the current context (innermost last)
+_captures: ContextVar[tuple] = ContextVar("llm_usage_captures", default=())
+
+
+# Whether an unavailable tokenizer has already been logged
+_unavailable_logged = False
+
+
+def _tokenizer_unavailable(model: str, error: Exception) -> None:
+    """Log (once per process) that counting falls back to the heuristic."""
+    global _unavailable_logged
+    if not _unavailable_logged:
+        _unavailable_logged = True
+        logger.warning(
+            f"Tokenizer for {model} unavailable ({error}); "
+            "estimating ~4 characters per token"
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def _encoding(model: str) -> Optional[Any]:
+    """Get (and cache) the tiktoken encoding for a model, if available.
+
+    Encodings are downloaded on first use, so loading can fail offline;
+    None then makes callers use the character heuristic.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        _tokenizer_unavailable(model, e)
+        return None
+    # Model unknown to tiktoken: use the default encoding
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        _tokenizer_unavailable(model, e)
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Count tokens in text.
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use
+
+    Returns:
+        Exact token count with tiktoken, else ceil(len(text) / 4)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def estimate_message_tokens(
+    messages: List[Dict[str, Any]],
+    model: str = "gpt-4o-mini",
+    max_tokens: Optional[int] = None,
+) -> int:
+    """Estimate tokens a chat request counts against TPM limits.
+
+    Providers count max_tokens against TPM limits when a request is
+    admitted, so it is included in full.
+
+    Args:
+        messages: Chat messages
+        model: Model whose tokenizer to use
+        max_tokens: Maximum completion tokens of the request
+
+    Returns:
+        Estimated prompt tokens (with chat overhead) plus max_tokens
+    """
+    total = _TOKENS_PER_REPLY
+    for message in messages:
+        total += _TOKENS_PER_MESSAGE
+        for value in message.values():
+            if value is not None:
+                total += count_tokens(str(value), model)
+    return total + (max_tokens or 0)
+
+
+def estimate_item_tokens(item: Any, model: str = "gpt-4o-mini") -> int:
+    """Default estimate_tokens_fn for run_concurrent_with_tpm.
+
+    Counts with the model's tiktoken tokenizer (a requirement of this
+    package); falls back to ~4 characters per token only if tiktoken is
+    not installed or its encoding cannot be loaded.
+
+    Args:
+        item: Chat messages, a dict with "text"/"content", or anything else
+            (counted through str())
+
+    Returns:
+        Estimated tokens
+    """
+    if isinstance(item, list) and all(isinstance(m, dict) for m in item):
+        return estimate_message_tokens(item, model)
+    if isinstance(item, dict):
+        for field in ("text", "content"):
+            if isinstance(item.get(field), str):
+                return count_tokens(item[field], model)
+    return count_tokens(str(item), model)
+
+
+def _usage_value(usage: Any, name: str) -> Optional[int]:
+    """Read a field from an SDK usage object or a usage dict."""
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value if isinstance(value, int) else None
+
+
+def record_usage(model: str, usage: Any) -> Optional[Dict[str, Any]]:
+    """Record the usage reported for one LLM call.
+
+    Feeds llm_tokens_total (counter), llm_tokens_per_request (histogram)
+    and llm_cost_usd_total (counter), all labelled by model.
+
+    Args:
+        model: Model name
+        usage: response.usage (SDK object or dict); None is ignored
+
+    Returns:
+        Dictionary with prompt_tokens, completion_tokens, total_tokens and
+        cost_usd, or None if no usage was reported
+    """
+    if usage is None:
+        return None
+    prompt = _usage_value(usage, "prompt_tokens") or 0
+    completion = _usage_value(usage, "completion_tokens") or 0
+    total = _usage_value(usage, "total_tokens") or prompt + completion
+    cost = estimate_llm_cost(model, prompt, completion)
+
+    registry = MetricRegistry.get_instance()
+    tokens = registry.get("llm_tokens_total")
+    per_request = registry.get("llm_tokens_per_request")
+    for kind, count in (("prompt", prompt), ("completion", completion)):
+        labels = {"model": model, "type": kind}
+        if tokens is not None:
+            tokens.inc(count, labels=labels)
+        if per_request is not None:
+            per_request.observe(count, labels=labels)
+    cost_total = registry.get("llm_cost_usd_total")
+    if cost_total is not None:
+        cost_total.inc(cost, labels={"model": model})
+
+    recorded = {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": total,
+        "cost_usd": cost,
+    }
+    for capture in _captures.get():
+        capture.add(recorded)
+    return recorded
+
+
+@contextmanager
+def capture_usage() -> Iterator[UsageCapture]:
+    """Collect the usage recorded by LLM calls made in this context.
+
+    Every call_llm / stream_llm / acall_llm inside the block (on the same
+    thread or task) adds its reported usage, so code that only sees parsed
+    results - such as run_concurrent_with_tpm around a processor_fn - can
+    still account for the tokens actually used.
+
+    Example:
+        with capture_usage() as usage:
+            result = call_llm(client, messages)
+        print(usage.total_tokens, usage.cost_usd)
+    """
+    capture = UsageCapture()
+    token = _captures.set(_captures.get() + (capture,))
+    try:
+        yield capture
+    finally:
+        _captures.reset(token)
+
+
+def record_estimate(model: str, tokens: int) -> None:
+    """Record a pre-call token estimate in llm_tokens_per_request.
+
+    Observed with type "estimated"; compare with the "prompt" and
+    "completion" observations to see how close estimates run to usage.
+    """
+    per_request = MetricRegistry.get_instance().get("llm_tokens_per_request")
+    if per_request is not None:
+        per_request.observe(tokens, labels={"model": model, "type": "estimated"})
@@ -25,11 +25,97 @@ Usage:
 
     # Add explicit delay (e.g., from Retry-After header)
     limiter.delay(seconds=30)
+
+    # Token bucket with burst capacity, weighted and non-blocking acquires
+    limiter = RateLimiter(rpm=600, capacity=20, name="openai")
+    limiter.acquire(5)              # Takes 5 tokens (sleeps only if needed)
+    if limiter.try_acquire():       # Never sleeps
+        ...
+    await limiter.aacquire()        # From coroutines
+
+    # One budget shared by all worker processes on this host (or across hosts)
+    limiter = RateLimiter(rpm=500, name="openai", backend=FileLockBackend(path))
+    limiter = RateLimiter(rpm=500, name="openai", backend=RedisBackend(redis_client))
+    # ...or for every limiter: export RATE_LIMIT_STATE_DIR=/tmp/llm-ratelimit
+
+    # Tokens-per-minute: reserve the estimate, then reconcile actual usage
+    tpm_limiter = TPMLimiter(tpm=950_000, name="extraction")
+    reservation = tpm_limiter.reserve(estimated_tokens)
+    response = client.chat.completions.create(...)
+    tpm_limiter.reconcile(reservation, response.usage.total_tokens)
+
+    # Adaptive concurrency: grows while healthy, halves on 429s / slow p95
+    concurrency = AdaptiveConcurrencyLimiter(initial_limit=32, max_limit=300)
+    with concurrency.slot():
+        response = client.chat.completions.create(...)
+
+    # RPM + TPM + in-flight cap granted together (also: call_llm(limiter=...))
+    limiter = CompositeLimiter(rpm=5_000, tpm=950_000, max_concurrency=64)
+    with limiter.limit(estimated_tokens) as permit:
+        response = client.chat.completions.create(...)
+        permit.actual_tokens = response.usage.total_tokens
+
+    # Provider rate limit headers: pause a shared limiter for every caller
+    raw = client.chat.completions.with_raw_response.create(...)
+    apply_rate_limit_headers(limiter, raw.headers)  # retry-after / remaining 0
+    # (call_llm(limiter=...) and retry_llm_call(limiter=...) do this already)
+
+    # One process-wide budget shared by all jobs (priority, then fair share)
+    scheduler = BudgetScheduler.get_instance()
+    batch = scheduler.job("extraction", weight=2.0)
+    prompts = scheduler.job("dashboard", priority=PRIORITY_INTERACTIVE)
+    reservation = prompts.acquire(estimated_tokens)   # Admitted before batch
+    prompts.reconcile(reservation, response.usage.total_tokens)
+    call_llm(client, messages, job=batch)             # Or let the helpers do it
+    stream_llm(client, messages, job=interactive_job())  # Ahead of batch jobs
 """
 
+from LLM.core.libraries.rate_limiting.backends import (
+    FileLockBackend,
+    LocalBackend,
+    RateLimitBackend,
+    RedisBackend,
+)
+from LLM.core.libraries.rate_limiting.headers import (
+    RateLimitInfo,
+    apply_rate_limit_headers,
+    parse_rate_limit_headers,
+)
 from LLM.core.libraries.rate_limiting.limiter import RateLimiter, rate_limit
+from LLM.core.libraries.rate_limiting.adaptive import AdaptiveConcurrencyLimiter
+from LLM.core.libraries.rate_limiting.composite import (
+    CompositeLimiter,
+    CompositePermit,
+)
+from LLM.core.libraries.rate_limiting.scheduler import (
+    INTERACTIVE_JOB,
+    PRIORITY_BATCH,
+    PRIORITY_INTERACTIVE,
+    BudgetScheduler,
+    ScheduledJob,
+    interactive_job,
+)
+from LLM.core.libraries.rate_limiting.tpm import TokenReservation, TPMLimiter
 
 __all__ = [
     "RateLimiter",
     "rate_limit",
+    "RateLimitBackend",
+    "LocalBackend",
+    "FileLockBackend",
+    "RedisBackend",
+    "TPMLimiter",
+    "TokenReservation",
+    "AdaptiveConcurrencyLimiter",
+    "CompositeLimiter",
+    "CompositePermit",
+    "BudgetScheduler",
+    "ScheduledJob",
+    "interactive_job",
+    "PRIORITY_BATCH",
+    "PRIORITY_INTERACTIVE",
+    "INTERACTIVE_JOB",
+    "RateLimitInfo",
+    "parse_rate_limit_headers",
+    "apply_rate_limit_headers",
 ]
@@ -0,0 +1,263 @@
+"""
+Adaptive (AIMD) concurrency limiter.
+
+Instead of a hand-tuned max_workers, the limit probes upward while calls
+succeed at stable latency and is cut multiplicatively when the provider
+rate limits us (429 / quota errors) or when p95 latency rises above its
+recent baseline - the same additive-increase/multiplicative-decrease
+scheme TCP uses for congestion control.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from LLM.core.libraries.metrics import MetricRegistry
+from LLM.core.libraries.retry.decorators import (
+    is_rate_limit_error,
+    observe_rate_limits,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Thread-safe concurrency limit that adapts to provider capacity.
+
+    - Additive increase: after `limit` consecutive successes without a
+      latency regression, the limit grows by one - but only successes seen
+      while at least min_utilization x limit calls are in flight count, so
+      an idle limiter does not grow a limit it never tested.
+    - Multiplicative decrease: a rate limit error, or a window p95 latency
+      above latency_tolerance x the baseline p95, multiplies the limit by
+      backoff_factor and moves the baseline to that p95. Latencies are
+      sampled in consecutive windows of latency_window calls, so p95 is
+      computed once per window rather than on every success. Decreases
+      are at most one per cooldown_s, so a burst of 429s from calls
+      already in flight counts as a single signal.
+
+    Inside slot(), 429s that retry decorators (e.g. in call_llm) retry
+    internally are reported too (see retry.observe_rate_limits), so the
+    limit backs off on the first 429 instead of after retries run out.
+
+    The current limit is published as the `concurrency_limit` gauge
+    (labelled by limiter name) in MetricRegistry.
+
+    Example:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=32, max_limit=300)
+
+        with limiter.slot():      # Blocks while `limit` calls are in flight
+            response = client.chat.completions.create(...)
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 300,
+        name: str = "default",
+        backoff_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_window: int = 50,
+        cooldown_s: float = 1.0,
+        min_utilization: float = 0.5,
+    ):
+        """Initialize adaptive limiter.
+
+        Args:
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest limit backoff can reach
+            max_limit: Highest limit probing can reach
+            name: Name for this limiter (for logging and metrics)
+            backoff_factor: Multiplier applied to the limit on overload
+            latency_tolerance: Back off when window p95 exceeds this multiple
+                of the baseline p95
+            latency_window: Number of latencies per p95 sample
+            cooldown_s: Minimum seconds between two decreases
+            min_utilization: Fraction of the limit that must be in flight
+                for a success to count toward an increase
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.name = name
+        self.backoff_factor = backoff_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown_s = cooldown_s
+        self.min_utilization = min_utilization
+
+        self._limit = min(max(int(initial_limit), self.min_limit), self.max_limit)
+        self._in_flight = 0
+        self._successes = 0
+        self.latency_window = max(1, int(latency_window))
+        self._latencies: List[float] = []
+        self._baseline_p95: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._decreases = 0
+        self._cond = threading.Condition()
+
+        self._gauge = MetricRegistry.get_instance().get("concurrency_limit")
+        self._publish()
+
+        logger.debug(
+            f"Initialized adaptive limiter '{name}': limit={self._limit} "
+            f"(min={self.min_limit}, max={self.max_limit})"
+        )
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """Number of acquired, unreleased slots."""
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, blocking while the limit is reached.
+
+        Args:
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+
+        Returns:
+            True if a slot was acquired, False on timeout
+        """
+        with self._cond:
+            acquired = self._cond.wait_for(
+                lambda: self._in_flight < self._limit, timeout
+            )
+            if acquired:
+                self._in_flight += 1
+            return acquired
+
+    def release(self) -> None:
+        """Return a slot taken with acquire()."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot around one call and feed its outcome to the limiter.
+
+        Successful calls report their latency; exceptions are reported
+        with on_error() and re-raised. Rate limit errors retried inside the
+        block are reported as they happen.
+        """
+        self.acquire()
+        start = time.monotonic()
+        try:
+            with observe_rate_limits(self.on_error):
+                yield
+        except Exception as e:
+            self.on_error(e)
+            raise
+        else:
+            self.on_success(time.monotonic() - start)
+        finally:
+            self.release()
+
+    def on_success(self, latency_s: float) -> None:
+        """Record a successful call (before releasing its slot).
+
+        Args:
+            latency_s: Call latency in seconds
+        """
+        with self._cond:
+            self._latencies.append(latency_s)
+            if self._latency_regressed():
+                self._decrease("p95 latency rose above baseline")
+                return
+
+            # Demand well below the limit says nothing about a higher one
+            if self._in_flight < self._limit * self.min_utilization:
+                return
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self.max_limit:
+                self._limit += 1
+                self._successes = 0
+                self._publish()
+                self._cond.notify()
+
+    def on_error(self, error: Exception) -> bool:
+        """Record a failed call; rate limit errors shrink the limit.
+
+        Args:
+            error: Exception raised by the call
+
+        Returns:
+            True if the error was treated as an overload signal
+        """
+        if not is_rate_limit_error(error):
+            return False
+        with self._cond:
+            self._decrease(f"rate limited ({type(error).__name__})")
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter statistics.
+
+        Returns:
+            Dictionary with name, limit, in-flight calls, baseline p95 and
+            number of decreases
+        """
+        with self._cond:
+            return {
+                "name": self.name,
+                "limit": self._limit,
+                "in_flight": self._in_flight,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "baseline_p95": self._baseline_p95,
+                "decreases": self._decreases,
+            }
+
+    def _latency_regressed(self) -> bool:
+        """Check the p95 of each full window (caller holds the lock).
+
+        Only every latency_window-th success sorts a window; the window is
+        then started afresh, so each sample is counted once.
+        """
+        latencies = self._latencies
+        if len(latencies) < self.latency_window:
+            return False
+
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        latencies.clear()
+        if self._baseline_p95 is None:
+            self._baseline_p95 = p95
+            return False
+
+        if p95 > self._baseline_p95 * self.latency_tolerance:
+            # Re-baseline at the new level: a lasting shift (longer prompts,
+            # a slower model) costs one decrease, not a slide to min_limit
+            self._baseline_p95 = p95
+            return True
+
+        # Follow improvements at once, slow drifts upward gradually
+        self._baseline_p95 = min(p95, self._baseline_p95 * 0.75 + p95 * 0.25)
+        return False
+
+    def _decrease(self, reason: str) -> None:
+        """Cut the limit multiplicatively (caller holds the lock)."""
+        now = time.monotonic()
+        self._successes = 0
+        if now - self._last_decrease < self.cooldown_s:
+            return
+
+        old = self._limit
+        self._limit = max(self.min_limit, int(self._limit * self.backoff_factor))
+        self._last_decrease = now
+        self._decreases += 1
+        self._publish()
+        logger.info(
+            f"Adaptive limiter '{self.name}': {reason}, limit {old} -> {self._limit}"
+        )
+
+    def _publish(self) -> None:
+        """Export the current limit to the concurrency_limit gauge."""
+        if self._gauge is not None:
+            self._gauge.set(self._limit, labels={"limiter": self.name})
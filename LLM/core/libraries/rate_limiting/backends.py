@@ -0,0 +1,314 @@
+"""
+Storage backends for RateLimiter state.
+
+A limiter's state is one number per key: the theoretical arrival time
+(TAT) of the generic cell rate algorithm, i.e. the time at which the
+budget would be fully replenished. Keeping it in a shared store makes every
+process (or host) using the same key draw on one budget:
+
+- LocalBackend: in-process (default)
+- FileLockBackend: a state file guarded by flock, for processes on one host
+- RedisBackend: a Redis server, for workers on several hosts
+
+Custom stores plug in by subclassing RateLimitBackend.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling the shared file backend for all limiters
+STATE_DIR_ENV = "RATE_LIMIT_STATE_DIR"
+
+
+def _gcra(
+    tat: Optional[float],
+    now: float,
+    cost: float,
+    burst: float,
+    max_wait: Optional[float],
+) -> Optional[Tuple[float, float]]:
+    """Schedule one request under the generic cell rate algorithm.
+
+    Args:
+        tat: Stored theoretical arrival time (None = no state yet)
+        now: Current time on the backend's clock
+        cost: Seconds of budget the request consumes
+        burst: Seconds of budget that may be consumed ahead of time
+        max_wait: Refuse (return None) if the request would wait longer
+
+    Returns:
+        (new_tat, seconds to wait), or None if refused
+    """
+    tat = now if tat is None else max(tat, now)
+    start = max(now, tat - burst)
+    wait_s = start - now
+    if max_wait is not None and wait_s > max_wait:
+        return None
+    return tat + cost, wait_s
+
+
+class RateLimitBackend(ABC):
+    """Interface for RateLimiter state stores.
+
+    Implementations must make reserve() and delay() atomic per key across
+    every client sharing the store, and use one clock for all of them.
+    """
+
+    @abstractmethod
+    def reserve(
+        self,
+        key: str,
+        cost: float,
+        burst: float = 0.0,
+        max_wait: Optional[float] = None,
+    ) -> Optional[float]:
+        """Claim the next slot for a request.
+
+        Args:
+            key: Limiter key (requests with the same key share a budget)
+            cost: Seconds of budget the request consumes (1 / rate per token)
+            burst: Seconds of budget that may be used ahead of time
+            max_wait: Do not claim a slot further away than this (None = any)
+
+        Returns:
+            Seconds the caller must wait before sending, or None if the slot
+            would be further away than max_wait (nothing is claimed)
+        """
+
+    @abstractmethod
+    def delay(self, key: str, seconds: float, burst: float = 0.0) -> None:
+        """Block the key for at least `seconds` from now (e.g. Retry-After).
+
+        Args:
+            key: Limiter key
+            seconds: Seconds before the next request may be sent
+            burst: The limiter's burst allowance (consumed as well)
+        """
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+
+
+class LocalBackend(RateLimitBackend):
+    """Process-local state (the default; one budget per process)."""
+
+    def __init__(self):
+        """Initialize local backend."""
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(
+        self,
+        key: str,
+        cost: float,
+        burst: float = 0.0,
+        max_wait: Optional[float] = None,
+    ) -> Optional[float]:
+        """Claim the next slot for a request (see RateLimitBackend)."""
+        with self._lock:
+            now = time.monotonic()
+            scheduled = _gcra(self._tats.get(key), now, cost, burst, max_wait)
+            if scheduled is None:
+                return None
+            self._tats[key], wait_s = scheduled
+            return wait_s
+
+    def delay(self, key: str, seconds: float, burst: float = 0.0) -> None:
+        """Block the key for at least `seconds` from now."""
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds) + burst
+            self._tats[key] = max(self._tats.get(key, until), until)
+
+
+class FileLockBackend(RateLimitBackend):
+    """State shared by all processes on one host through a locked file.
+
+    Every operation opens the file, takes an exclusive flock, updates the
+    JSON state and closes it again, so the backend stays correct in forked
+    workers (a descriptor inherited across fork would share its lock).
+    Uses wall-clock time, which all local processes agree on.
+
+    Example:
+        backend = FileLockBackend("/tmp/llm-ratelimit.json")
+        limiter = RateLimiter(rpm=500, name="openai", backend=backend)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Initialize file backend.
+
+        Args:
+            path: Path to the state file (created if missing)
+
+        Raises:
+            RuntimeError: If file locking is not supported on this platform
+        """
+        if fcntl is None:
+            raise RuntimeError("FileLockBackend requires fcntl (POSIX systems)")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # flock only excludes other open files - serialize this process's threads
+        self._lock = threading.Lock()
+
+        logger.debug(f"Initialized file rate limit backend: {self.path}")
+
+    def reserve(
+        self,
+        key: str,
+        cost: float,
+        burst: float = 0.0,
+        max_wait: Optional[float] = None,
+    ) -> Optional[float]:
+        """Claim the next slot for a request (see RateLimitBackend)."""
+        with self._locked_state() as state:
+            now = time.time()
+            scheduled = _gcra(state.get(key), now, cost, burst, max_wait)
+            if scheduled is None:
+                return None
+            state[key], wait_s = scheduled
+            # Keys whose budget is fully replenished carry no information
+            for stale in [k for k, tat in state.items() if tat < now]:
+                del state[stale]
+            return wait_s
+
+    def delay(self, key: str, seconds: float, burst: float = 0.0) -> None:
+        """Block the key for at least `seconds` from now."""
+        with self._locked_state() as state:
+            until = time.time() + max(0.0, seconds) + burst
+            state[key] = max(state.get(key, until), until)
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[Dict[str, float]]:
+        """Yield the state dict under the file lock; write it back on success."""
+        with self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            raw = f.read()
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                logger.warning(f"Resetting unreadable rate limit state: {self.path}")
+                state = {}
+
+            yield state
+
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(state))
+            f.flush()
+
+
+# Atomic GCRA step on the Redis server (uses server time, so clients on
+# different hosts agree). Numbers are returned as strings to keep fractions.
+_REDIS_RESERVE = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cost, burst, max_wait = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local start = math.max(now, tat - burst)
+local wait = start - now
+if max_wait >= 0 and wait > max_wait then return '-1' end
+tat = tat + cost
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000) + 1000)
+return tostring(wait)
+"""
+
+_REDIS_DELAY = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local untl = now + tonumber(ARGV[1])
+local tat = tonumber(redis.call('GET', KEYS[1]) or 0)
+if untl > tat then
+    local ttl = math.ceil((untl - now) * 1000) + 1000
+    redis.call('SET', KEYS[1], tostring(untl), 'PX', ttl)
+end
+return 1
+"""
+
+
+class RedisBackend(RateLimitBackend):
+    """State kept on a Redis server, shared by workers on any host.
+
+    Each operation is a single Lua script evaluated atomically on the
+    server. The client is any redis-py compatible object providing eval();
+    redis itself is not a dependency of this library.
+
+    Example:
+        import redis
+        backend = RedisBackend(redis.Redis(host="localhost"), prefix="llm:")
+        limiter = RateLimiter(rpm=500, name="openai", backend=backend)
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:"):
+        """Initialize Redis backend.
+
+        Args:
+            client: redis-py compatible client
+            prefix: Prefix for the keys stored on the server
+        """
+        self.client = client
+        self.prefix = prefix
+
+    def reserve(
+        self,
+        key: str,
+        cost: float,
+        burst: float = 0.0,
+        max_wait: Optional[float] = None,
+    ) -> Optional[float]:
+        """Claim the next slot for a request (see RateLimitBackend)."""
+        result = self.client.eval(
+            _REDIS_RESERVE,
+            1,
+            self.prefix + key,
+            repr(float(cost)),
+            repr(float(burst)),
+            repr(-1.0 if max_wait is None else float(max_wait)),
+        )
+        if isinstance(result, bytes):
+            result = result.decode()
+        wait_s = float(result)
+        return None if wait_s < 0 else wait_s
+
+    def delay(self, key: str, seconds: float, burst: float = 0.0) -> None:
+        """Block the key for at least `seconds` from now."""
+        self.client.eval(
+            _REDIS_DELAY, 1, self.prefix + key, repr(max(0.0, seconds) + burst)
+        )
+
+
+def get_default_backend() -> RateLimitBackend:
+    """Get the backend for limiters created without one.
+
+    When RATE_LIMIT_STATE_DIR is set, limiters in every process on the host
+    share <RATE_LIMIT_STATE_DIR>/ratelimit.json (so processes using the same
+    limiter name, rate and capacity split one budget); otherwise each
+    limiter is process-local.
+
+    Returns:
+        RateLimitBackend instance
+    """
+    state_dir = os.getenv(STATE_DIR_ENV)
+    if not state_dir:
+        return LocalBackend()
+
+    try:
+        return FileLockBackend(Path(state_dir).expanduser() / "ratelimit.json")
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Shared rate limit state unavailable ({e}); using local state")
+        return LocalBackend()
@@ -0,0 +1,234 @@
+"""
+Composite limiter: requests per minute, tokens per minute and in-flight
+requests in one primitive.
+
+Provider limits apply to all three at once. Acquiring them one after the
+other lets a caller sit on a concurrency permit while its tokens are not
+available yet (or burn an RPM slot while it waits for tokens), so the
+composite limiter grants a request only when every dimension has room.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from LLM.core.libraries.rate_limiting.backends import RateLimitBackend
+from LLM.core.libraries.rate_limiting.limiter import RateLimiter
+from LLM.core.libraries.rate_limiting.tpm import TokenReservation, TPMLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class CompositePermit:
+    """Grant returned by CompositeLimiter.acquire()."""
+
+    __slots__ = ("reservation", "actual_tokens", "released")
+
+    def __init__(self, reservation: Optional[TokenReservation]):
+        self.reservation = reservation
+        # Set by the caller once usage is known (None keeps the estimate)
+        self.actual_tokens: Optional[int] = None
+        self.released = False
+
+
+class CompositeLimiter:
+    """Thread-safe limiter enforcing RPM, TPM and max concurrency together.
+
+    A request is granted in one step under a single lock: it needs a free
+    concurrency permit and room for its estimated tokens in the TPM window;
+    only then is its RPM slot claimed (slots are scheduled, so the caller
+    sleeps until its slot outside the lock). Any dimension can be disabled
+    by passing None.
+
+    Example:
+        limiter = CompositeLimiter(rpm=5_000, tpm=950_000, max_concurrency=64)
+
+        with limiter.limit(estimated_tokens) as permit:
+            response = client.chat.completions.create(...)
+            permit.actual_tokens = response.usage.total_tokens
+
+        # Or let call_llm() do it
+        answer = call_llm(client, messages, limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        name: str = "default",
+        rpm_capacity: int = 1,
+        jitter_ms: int = 0,
+        backend: Optional[RateLimitBackend] = None,
+    ):
+        """Initialize composite limiter.
+
+        Args:
+            rpm: Requests per minute (None = unlimited)
+            tpm: Tokens per minute (None = unlimited)
+            max_concurrency: Maximum in-flight requests (None = unlimited)
+            name: Name for this limiter (for logging; RPM backend key)
+            rpm_capacity: Burst capacity of the RPM bucket
+            jitter_ms: Jitter added to RPM spacing in milliseconds
+            backend: RPM state store (see RateLimiter)
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._rpm = (
+            RateLimiter(
+                rpm=rpm,
+                jitter_ms=jitter_ms,
+                name=name,
+                backend=backend,
+                capacity=rpm_capacity,
+            )
+            if rpm
+            else None
+        )
+        self._tpm = TPMLimiter(tpm=tpm, name=name) if tpm else None
+        self._in_flight = 0
+        # Monotonic time before which nothing is granted (see delay())
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+        logger.debug(
+            f"Initialized composite limiter '{name}': RPM={rpm}, TPM={tpm}, "
+            f"max_concurrency={max_concurrency}"
+        )
+
+    def acquire(
+        self, estimated_tokens: int = 0, timeout: Optional[float] = None
+    ) -> Optional[CompositePermit]:
+        """Wait until the request fits every limit, then take all of them.
+
+        Args:
+            estimated_tokens: Estimated tokens for the request (prompt plus
+                expected completion)
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+
+        Returns:
+            CompositePermit to pass to release(), or None on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                permit, wait_s = self._try_grant(estimated_tokens)
+                if permit is not None:
+                    break
+
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait_s = remaining if wait_s is None else min(wait_s, remaining)
+                # Woken early by release()/reconcile refunds
+                self._cond.wait(wait_s)
+
+        if self._rpm is not None:
+            try:
+                self._rpm.acquire()
+            except BaseException:
+                self.release(permit)
+                raise
+        return permit
+
+    def release(
+        self, permit: CompositePermit, actual_tokens: Optional[int] = None
+    ) -> None:
+        """Free the concurrency permit and reconcile token usage.
+
+        Args:
+            permit: Permit returned by acquire()
+            actual_tokens: Actual tokens used (default: permit.actual_tokens;
+                None keeps the estimate)
+        """
+        if permit.released:
+            return
+        permit.released = True
+        if actual_tokens is None:
+            actual_tokens = permit.actual_tokens
+        if permit.reservation is not None:
+            self._tpm.reconcile(permit.reservation, actual_tokens)
+
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def delay(self, seconds: float) -> None:
+        """Hold back every new request for `seconds` (e.g. Retry-After).
+
+        Requests already granted are not affected. With an RPM backend shared
+        across processes, the pause reaches the other processes as well.
+
+        Args:
+            seconds: Seconds before the next request may be granted
+        """
+        with self._cond:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + max(0.0, seconds)
+            )
+        if self._rpm is not None:
+            self._rpm.delay(seconds)
+
+    @contextmanager
+    def limit(self, estimated_tokens: int = 0) -> Iterator[CompositePermit]:
+        """Hold a permit around one request.
+
+        Set permit.actual_tokens inside the block to reconcile usage.
+
+        Args:
+            estimated_tokens: Estimated tokens for the request
+        """
+        permit = self.acquire(estimated_tokens)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    def _try_grant(
+        self, estimated_tokens: int
+    ) -> Tuple[Optional[CompositePermit], Optional[float]]:
+        """Take a concurrency permit and tokens if both are free.
+
+        Caller must hold the lock.
+
+        Returns:
+            (permit, 0.0) on success, else (None, seconds until tokens may
+            fit, or None to wait for a release)
+        """
+        paused_s = self._paused_until - time.monotonic()
+        if paused_s > 0:
+            return None, paused_s
+
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None, None
+
+        reservation = None
+        if self._tpm is not None:
+            reservation, wait_s = self._tpm.try_reserve(estimated_tokens)
+            if reservation is None:
+                return None, wait_s
+
+        self._in_flight += 1
+        return CompositePermit(reservation), 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter statistics.
+
+        Returns:
+            Dictionary with name, configured limits, in-flight requests and
+            tokens used in the current window
+        """
+        with self._cond:
+            in_flight = self._in_flight
+        return {
+            "name": self.name,
+            "rpm": self._rpm.rpm if self._rpm is not None else None,
+            "tpm": self._tpm.tpm if self._tpm is not None else None,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": in_flight,
+            "tokens_used": self._tpm.current_usage() if self._tpm is not None else 0,
+        }
@@ -0,0 +1,174 @@
+"""
+Rate limit response headers.
+
+Providers report how long to back off (`retry-after`, `retry-after-ms`)
+and how much of the current window is left (`x-ratelimit-remaining-*`,
+`x-ratelimit-reset-*`). Feeding these into a shared limiter makes every
+thread pause once, together, instead of each discovering the 429 itself.
+"""
+
+import re
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Longest pause taken from headers by default (matches retry_llm_call's max_delay)
+DEFAULT_MAX_PAUSE = 60.0
+
+# Durations like "1s", "6m0s", "20ms", "1h2m3.5s" (x-ratelimit-reset-*)
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+class RateLimitInfo(NamedTuple):
+    """Parsed rate limit headers (None where a header is absent)."""
+
+    retry_after: Optional[float] = None
+    remaining_requests: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    reset_requests: Optional[float] = None
+    reset_tokens: Optional[float] = None
+
+    def pause_seconds(self) -> Optional[float]:
+        """Seconds all callers should pause, or None if nothing is exhausted.
+
+        retry-after wins; otherwise an exhausted request or token budget
+        pauses until that budget resets.
+        """
+        if self.retry_after is not None:
+            return self.retry_after
+        pauses = []
+        if self.remaining_requests == 0 and self.reset_requests is not None:
+            pauses.append(self.reset_requests)
+        if self.remaining_tokens == 0 and self.reset_tokens is not None:
+            pauses.append(self.reset_tokens)
+        return max(pauses) if pauses else None
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a duration header value into seconds.
+
+    Args:
+        value: Plain seconds ("1.5") or Go-style duration ("6m0s", "20ms")
+
+    Returns:
+        Seconds, or None if the value is missing or malformed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(n + u for n, u in parts) != value:
+        return None
+    return sum(float(number) * _UNIT_SECONDS[unit] for number, unit in parts)
+
+
+def _parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from retry-after-ms / retry-after (seconds or HTTP date)."""
+    millis = headers.get("retry-after-ms")
+    if millis is not None:
+        try:
+            return max(0.0, float(millis) / 1000.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer header value (None if missing or malformed)."""
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def parse_rate_limit_headers(
+    headers: Optional[Mapping[str, str]],
+) -> RateLimitInfo:
+    """Parse retry-after and x-ratelimit-* headers.
+
+    Args:
+        headers: Response headers (case-insensitive mapping such as
+            httpx.Headers, or a dict with lower-case keys)
+
+    Returns:
+        RateLimitInfo (all fields None when headers is None)
+    """
+    if not headers:
+        return RateLimitInfo()
+    return RateLimitInfo(
+        retry_after=_parse_retry_after(headers),
+        remaining_requests=_parse_int(
+            headers.get("x-ratelimit-remaining-requests")
+        ),
+        remaining_tokens=_parse_int(headers.get("x-ratelimit-remaining-tokens")),
+        reset_requests=parse_duration(headers.get("x-ratelimit-reset-requests")),
+        reset_tokens=parse_duration(headers.get("x-ratelimit-reset-tokens")),
+    )
+
+
+def headers_of(obj: Any) -> Optional[Mapping[str, str]]:
+    """Get HTTP headers from an SDK error or raw response.
+
+    Args:
+        obj: Exception with a .response (e.g. openai.RateLimitError) or a
+            raw response with .headers
+
+    Returns:
+        Headers mapping, or None if obj carries none
+    """
+    headers = getattr(obj, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(obj, "response", None), "headers", None)
+    return headers
+
+
+def apply_rate_limit_headers(
+    limiter: Any,
+    headers: Optional[Mapping[str, str]],
+    max_pause: Optional[float] = DEFAULT_MAX_PAUSE,
+) -> Optional[float]:
+    """Pause shared limiters according to rate limit headers.
+
+    Args:
+        limiter: Limiter with a delay(seconds) method (RateLimiter,
+            TPMLimiter, CompositeLimiter, BudgetScheduler), a list of them,
+            or None
+        headers: Response headers
+        max_pause: Cap on the pause (None = take the headers as they are),
+            so a reset hint of minutes cannot stall every caller that long
+
+    Returns:
+        Seconds of pause requested by the headers (capped), or None
+    """
+    pause = parse_rate_limit_headers(headers).pause_seconds()
+    if pause is not None and max_pause is not None:
+        pause = min(pause, max_pause)
+    if pause is None or pause <= 0 or limiter is None:
+        return pause
+
+    for target in limiter if isinstance(limiter, (list, tuple)) else [limiter]:
+        target.delay(pause)
+        logger.info(
+            f"Rate limit headers: pausing limiter "
+            f"'{getattr(target, 'name', target)}' for {pause:.2f}s"
+        )
+    return pause
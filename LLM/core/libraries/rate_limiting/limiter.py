@@ -4,22 +4,34 @@ Rate limiting implementation using token bucket algorithm.
 
 import os
 import random
-import threading
 import time
+import asyncio
 import logging
 from typing import Optional
 from functools import wraps
 
+from LLM.core.libraries.rate_limiting.backends import (
+    RateLimitBackend,
+    get_default_backend,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Simple process-local rate limiter using token bucket algorithm.
+    """Rate limiter using token bucket algorithm.
 
-    Enforces maximum requests per minute with optional jitter and supports
+    The bucket holds up to `capacity` tokens and refills at rpm / 60 tokens
+    per second; each request takes one token (or n with acquire(n)). With
+    the default capacity of 1 requests are spaced evenly; a larger capacity
+    lets an idle limiter absorb a burst. Supports optional jitter and
     explicit delays (e.g., Retry-After headers).
 
-    Thread-safe for concurrent usage.
+    Thread-safe for concurrent usage. State lives in a pluggable backend:
+    process-local by default, or shared by every process using the same
+    limiter name, rate and capacity (FileLockBackend on one host, RedisBackend across hosts,
+    or all limiters when RATE_LIMIT_STATE_DIR is set). Callers claim their
+    slot atomically and sleep without holding any lock.
     """
 
     def __init__(
@@ -27,13 +39,19 @@ class RateLimiter:
         rpm: Optional[int] = None,
         jitter_ms: Optional[int] = None,
         name: str = "default",
+        backend: Optional[RateLimitBackend] = None,
+        capacity: int = 1,
     ) -> None:
         """Initialize rate limiter.
 
         Args:
             rpm: Requests per minute limit (default: 20, configurable via env)
             jitter_ms: Jitter in milliseconds (default: 250, configurable via env)
-            name: Name for this rate limiter (for logging)
+            name: Name for this rate limiter (for logging; with rpm and
+                capacity also the key of its budget in a shared backend)
+            backend: State store (default: see get_default_backend())
+            capacity: Bucket size, i.e. requests that may be sent back to
+                back after an idle period (default: 1)
         """
         rpm_val = int(os.getenv("RATE_LIMIT_RPM", str(rpm if rpm is not None else 20)))
         jitter_val = int(
@@ -45,32 +63,69 @@ class RateLimiter:
 
         self.rpm = rpm_val
         self.min_interval_seconds = 60.0 / max(1, rpm_val)
+        self.refill_rate = 1.0 / self.min_interval_seconds
+        self.capacity = max(1, int(capacity))
         self.jitter_seconds = max(0.0, jitter_val / 1000.0)
         self.name = name
-        self._next_allowed_ts = 0.0
-        self._lock = threading.Lock()
+        # Same-named limiters with different rates must not share one state
+        self.key = f"{name}:{rpm_val}rpm:{self.capacity}"
+        self.backend = backend or get_default_backend()
 
         logger.debug(
             f"Initialized rate limiter '{name}': {rpm_val} RPM, "
-            f"{jitter_val}ms jitter"
+            f"capacity {self.capacity}, {jitter_val}ms jitter, "
+            f"{type(self.backend).__name__}"
         )
 
     def wait(self) -> None:
         """Wait until rate limit allows next request."""
-        with self._lock:
-            now = time.monotonic()
-            sleep_for = max(0.0, self._next_allowed_ts - now)
-
-            if sleep_for > 0:
-                logger.debug(f"Rate limiter '{self.name}' waiting {sleep_for:.3f}s")
-                time.sleep(sleep_for)
-
-            # Schedule next slot
-            self._next_allowed_ts = (
-                time.monotonic()
-                + self.min_interval_seconds
-                + random.uniform(0.0, self.jitter_seconds)
-            )
+        self.acquire()
+
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """Take tokens from the bucket, sleeping until they are available.
+
+        Requests for more tokens than the capacity wait up front for the
+        whole deficit (tokens - capacity refill intervals beyond a full
+        bucket), so they never overdraw it.
+
+        Args:
+            tokens: Tokens to take (e.g. weight of the request)
+            timeout: Maximum seconds to wait (None = wait as long as needed);
+                nothing is taken if the wait would be longer
+
+        Returns:
+            True once the tokens are taken, False if the wait exceeds timeout
+        """
+        sleep_for = self._reserve(tokens, timeout)
+        if sleep_for is None:
+            return False
+
+        if sleep_for > 0:
+            logger.debug(f"Rate limiter '{self.name}' waiting {sleep_for:.3f}s")
+            time.sleep(sleep_for)
+        return True
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take tokens only if they are available right now (never sleeps).
+
+        Args:
+            tokens: Tokens to take
+
+        Returns:
+            True if the tokens were taken
+        """
+        return self._reserve(tokens, 0.0) is not None
+
+    async def aacquire(self, tokens: int = 1) -> None:
+        """Take tokens from a coroutine, awaiting instead of sleeping.
+
+        Args:
+            tokens: Tokens to take
+        """
+        sleep_for = self._reserve(tokens, None)
+        if sleep_for:
+            logger.debug(f"Rate limiter '{self.name}' waiting {sleep_for:.3f}s")
+            await asyncio.sleep(sleep_for)
 
     def delay(self, seconds: float) -> None:
         """Add explicit delay to rate limiter (e.g., from Retry-After header).
@@ -78,14 +133,29 @@ class RateLimiter:
         Args:
             seconds: Seconds to delay
         """
-        with self._lock:
-            self._next_allowed_ts = max(
-                self._next_allowed_ts,
-                time.monotonic()
-                + max(0.0, seconds)
-                + random.uniform(0.0, self.jitter_seconds),
-            )
-            logger.debug(f"Rate limiter '{self.name}' delayed by {seconds}s")
+        self.backend.delay(
+            self.key,
+            max(0.0, seconds) + random.uniform(0.0, self.jitter_seconds),
+            burst=(self.capacity - 1) * self.min_interval_seconds,
+        )
+        logger.debug(f"Rate limiter '{self.name}' delayed by {seconds}s")
+
+    def _reserve(self, tokens: int, max_wait: Optional[float]) -> Optional[float]:
+        """Claim tokens in the backend.
+
+        Returns:
+            Seconds to sleep before sending, or None if longer than max_wait
+        """
+        tokens = max(1, int(tokens))
+        # Each token costs one interval of refill; the bucket may run
+        # capacity - tokens intervals ahead of the refill schedule
+        return self.backend.reserve(
+            self.key,
+            tokens * self.min_interval_seconds
+            + random.uniform(0.0, self.jitter_seconds),
+            burst=(self.capacity - tokens) * self.min_interval_seconds,
+            max_wait=max_wait,
+        )
 
     def __enter__(self):
         """Context manager entry - wait for rate limit."""
@@ -96,12 +166,22 @@ class RateLimiter:
         """Context manager exit."""
         return False
 
+    async def __aenter__(self):
+        """Async context manager entry - await rate limit."""
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        return False
+
 
 def rate_limit(
     max_calls: int = 60,
     period: float = 60.0,
     jitter_ms: int = 250,
     name: Optional[str] = None,
+    burst: int = 1,
 ):
     """Decorator to rate limit function calls.
 
@@ -110,6 +190,7 @@ def rate_limit(
         period: Time period in seconds (default: 60s)
         jitter_ms: Jitter in milliseconds
         name: Optional name for the rate limiter
+        burst: Calls allowed back to back after an idle period
 
     Usage:
         @rate_limit(max_calls=10, period=60)
@@ -119,7 +200,9 @@ def rate_limit(
     """
     rpm = int((max_calls / period) * 60)
     limiter_name = name or "decorator"
-    limiter = RateLimiter(rpm=rpm, jitter_ms=jitter_ms, name=limiter_name)
+    limiter = RateLimiter(
+        rpm=rpm, jitter_ms=jitter_ms, name=limiter_name, capacity=burst
+    )
 
     def decorator(func):
         @wraps(func)
@@ -0,0 +1,413 @@
+"""
+Process-wide priority and fair-share scheduler for the shared LLM budget.
+
+Separate RateLimiter/TPMLimiter instances per component each believe they
+own the whole account quota, so concurrent pipelines (extraction, community
+summarization, entity resolution) together exceed it. BudgetScheduler owns
+one TPM/RPM budget for the process and hands it out to named jobs:
+
+- Priority: waiting requests of a higher-priority job are always admitted
+  first, so interactive work jumps ahead of queued background batches
+  (requests already in flight are never interrupted).
+- Fair share: jobs with equal priority split capacity in proportion to
+  their weights (start-time fair queuing over tokens granted).
+"""
+
+import os
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from LLM.core.libraries.rate_limiting.tpm import TokenReservation, TPMLimiter
+
+logger = logging.getLogger(__name__)
+
+# Environment variables overriding the default process-wide budget
+SCHEDULER_TPM_ENV = "SCHEDULER_TPM"
+SCHEDULER_RPM_ENV = "SCHEDULER_RPM"
+
+# Common priorities (higher is admitted first)
+PRIORITY_BATCH = 0
+PRIORITY_INTERACTIVE = 10
+
+# Job returned by interactive_job() unless another name is given
+INTERACTIVE_JOB = "interactive"
+
+# Safety net: waiters re-check the queue at least this often (seconds)
+_POLL_INTERVAL = 1.0
+
+
+class _Request:
+    """A pending acquire() call."""
+
+    __slots__ = ("job", "tokens", "seq", "wake", "granted", "reservation")
+
+    def __init__(self, job: "ScheduledJob", tokens: int, seq: int):
+        self.job = job
+        self.tokens = tokens
+        self.seq = seq
+        self.wake = threading.Event()
+        self.granted = False
+        self.reservation: Optional[TokenReservation] = None
+
+
+class ScheduledJob:
+    """A named stream of requests drawing on the BudgetScheduler budget.
+
+    Obtain jobs from BudgetScheduler.job(); a job can be shared by any
+    number of threads.
+    """
+
+    def __init__(
+        self, scheduler: "BudgetScheduler", name: str, priority: int, weight: float
+    ):
+        """Initialize job (use BudgetScheduler.job() instead).
+
+        Args:
+            scheduler: Scheduler owning the budget
+            name: Job name (for logging and stats)
+            priority: Admission priority (higher first)
+            weight: Share of capacity relative to jobs with equal priority
+        """
+        self.scheduler = scheduler
+        self.name = name
+        self.priority = priority
+        self.weight = weight
+        # Guarded by the scheduler lock
+        self._queue: Deque[_Request] = deque()
+        self._vtime = 0.0
+        self._granted = 0
+        self._tokens = 0
+
+    def acquire(
+        self, tokens: int, timeout: Optional[float] = None
+    ) -> Optional[TokenReservation]:
+        """Wait for this job's turn and reserve tokens plus one request.
+
+        Args:
+            tokens: Estimated tokens for the request
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+
+        Returns:
+            TokenReservation to pass to reconcile(), or None on timeout
+        """
+        return self.scheduler._acquire(self, tokens, timeout)
+
+    def reconcile(
+        self, reservation: TokenReservation, actual_tokens: Optional[int]
+    ) -> None:
+        """Replace a reservation's estimate with the actual usage.
+
+        Args:
+            reservation: Reservation returned by acquire()
+            actual_tokens: Actual tokens used; None keeps the estimate
+        """
+        self.scheduler._reconcile(reservation, actual_tokens)
+
+    def release(self, reservation: TokenReservation) -> None:
+        """Refund a reservation entirely (e.g. the request was never sent).
+
+        Args:
+            reservation: Reservation returned by acquire()
+        """
+        self.reconcile(reservation, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get job statistics.
+
+        Returns:
+            Dictionary with priority, weight, waiting requests and granted
+            requests/tokens
+        """
+        with self.scheduler._lock:
+            return self._stats()
+
+    def _stats(self) -> Dict[str, Any]:
+        """Job statistics (caller holds the scheduler lock)."""
+        return {
+            "priority": self.priority,
+            "weight": self.weight,
+            "waiting": len(self._queue),
+            "granted": self._granted,
+            "tokens": self._tokens,
+        }
+
+
+class BudgetScheduler:
+    """Singleton owner of the process-wide TPM/RPM budget.
+
+    Example:
+        scheduler = BudgetScheduler.get_instance()
+        scheduler.configure(tpm=950_000, rpm=20_000)
+
+        extraction = scheduler.job("extraction", weight=2.0)
+        summaries = scheduler.job("communities")
+        prompts = scheduler.job("dashboard", priority=PRIORITY_INTERACTIVE)
+
+        reservation = prompts.acquire(estimated_tokens)   # Jumps the queue
+        response = client.chat.completions.create(...)
+        prompts.reconcile(reservation, response.usage.total_tokens)
+    """
+
+    _instance: Optional["BudgetScheduler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self, tpm: Optional[int] = None, rpm: Optional[int] = None, name: str = "global"
+    ):
+        """Initialize scheduler (use get_instance() for the shared one).
+
+        Args:
+            tpm: Tokens per minute for the whole process
+                (default: SCHEDULER_TPM env var or 950,000)
+            rpm: Requests per minute for the whole process
+                (default: SCHEDULER_RPM env var or 20,000)
+            name: Name for this scheduler (for logging)
+        """
+        self.name = name
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._seq = itertools.count()
+        self._vclock = 0.0
+        self._next_slot = 0.0
+        # Waiter currently sleeping until the budget can admit it
+        self._timed_head: Optional[_Request] = None
+        self._lock = threading.Lock()
+        self._tpm_limiter = TPMLimiter(tpm=1, name=name)
+        self._set_budget(
+            tpm or int(os.getenv(SCHEDULER_TPM_ENV, "950000")),
+            rpm or int(os.getenv(SCHEDULER_RPM_ENV, "20000")),
+        )
+
+    @classmethod
+    def get_instance(cls) -> "BudgetScheduler":
+        """Get singleton scheduler instance.
+
+        Returns:
+            BudgetScheduler instance
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = BudgetScheduler()
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Reset singleton (useful for testing)."""
+        with cls._instance_lock:
+            cls._instance = None
+
+    def configure(self, tpm: Optional[int] = None, rpm: Optional[int] = None) -> None:
+        """Change the budget; usage in the current window still counts.
+
+        Args:
+            tpm: Tokens per minute (None = keep current)
+            rpm: Requests per minute (None = keep current)
+        """
+        with self._lock:
+            self._set_budget(tpm or self.tpm, rpm or self.rpm)
+            self._dispatch()
+
+    def job(
+        self,
+        name: str,
+        priority: Optional[int] = None,
+        weight: Optional[float] = None,
+        update: bool = True,
+    ) -> ScheduledJob:
+        """Get (registering on first use) a named job.
+
+        Args:
+            name: Job name
+            priority: Admission priority, higher first (default: PRIORITY_BATCH)
+            weight: Relative share among equal-priority jobs (default: 1.0)
+            update: Apply priority/weight to an already registered job
+                (False = only use them when registering it)
+
+        Returns:
+            ScheduledJob
+        """
+        if weight is not None and weight <= 0:
+            raise ValueError(f"Job weight must be positive, got {weight}")
+
+        with self._lock:
+            job = self._jobs.get(name)
+            if job is None:
+                job = ScheduledJob(
+                    self,
+                    name,
+                    PRIORITY_BATCH if priority is None else priority,
+                    1.0 if weight is None else weight,
+                )
+                self._jobs[name] = job
+                logger.debug(
+                    f"Scheduler '{self.name}' registered job '{name}' "
+                    f"(priority={job.priority}, weight={job.weight})"
+                )
+            elif update:
+                if priority is not None:
+                    job.priority = priority
+                if weight is not None:
+                    job.weight = weight
+            return job
+
+    def delay(self, seconds: float) -> None:
+        """Hold back all admissions for `seconds` (e.g. from Retry-After).
+
+        Args:
+            seconds: Seconds before the next request may be admitted
+        """
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+            # Wake the head so it sleeps until the new slot
+            self._timed_head = None
+            self._dispatch()
+        logger.debug(f"Scheduler '{self.name}' delayed by {seconds}s")
+
+    def current_usage(self) -> int:
+        """Get tokens used in the current window across all jobs."""
+        return self._tpm_limiter.current_usage()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics.
+
+        Returns:
+            Dictionary with the budget, tokens used and per-job stats
+        """
+        used = self._tpm_limiter.current_usage()
+        with self._lock:
+            return {
+                "name": self.name,
+                "tpm": self.tpm,
+                "rpm": self.rpm,
+                "used": used,
+                "jobs": {name: job._stats() for name, job in self._jobs.items()},
+            }
+
+    def _set_budget(self, tpm: int, rpm: int) -> None:
+        """Install a new budget (caller holds the lock or is __init__)."""
+        self.tpm = max(1, int(tpm))
+        self.rpm = max(1, int(rpm))
+        self._tpm_limiter.set_tpm(self.tpm)
+        self._rpm_interval = 60.0 / self.rpm
+        logger.info(
+            f"Scheduler '{self.name}' budget: TPM={self.tpm:,}, RPM={self.rpm}"
+        )
+
+    def _acquire(
+        self, job: ScheduledJob, tokens: int, timeout: Optional[float]
+    ) -> Optional[TokenReservation]:
+        """Queue a request for job and block until it is granted."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            request = _Request(job, max(0, int(tokens)), next(self._seq))
+            if not job._queue:
+                # A job returning from idle does not get credit for the idle time
+                job._vtime = max(job._vtime, self._vclock)
+            job._queue.append(request)
+            head, wait_s = self._dispatch()
+
+        while True:
+            if request.granted:
+                return request.reservation
+
+            sleep_s = wait_s if head is request else _POLL_INTERVAL
+            if deadline is not None:
+                sleep_s = min(sleep_s, max(0.0, deadline - time.monotonic()))
+            request.wake.wait(sleep_s)
+
+            with self._lock:
+                request.wake.clear()
+                if request.granted:
+                    return request.reservation
+                if deadline is not None and time.monotonic() >= deadline:
+                    job._queue.remove(request)
+                    if self._timed_head is request:
+                        self._timed_head = None
+                    self._dispatch()
+                    return None
+                head, wait_s = self._dispatch()
+
+    def _reconcile(
+        self, reservation: TokenReservation, actual_tokens: Optional[int]
+    ) -> None:
+        """Reconcile usage and admit waiters that now fit."""
+        self._tpm_limiter.reconcile(reservation, actual_tokens)
+        with self._lock:
+            self._dispatch()
+
+    def _head(self) -> Optional[_Request]:
+        """Next request to admit (caller holds the lock)."""
+        best_job = None
+        best_key: Optional[Tuple[int, float, int]] = None
+        for job in self._jobs.values():
+            if not job._queue:
+                continue
+            key = (-job.priority, job._vtime, job._queue[0].seq)
+            if best_key is None or key < best_key:
+                best_job, best_key = job, key
+        return best_job._queue[0] if best_job is not None else None
+
+    def _dispatch(self) -> Tuple[Optional[_Request], float]:
+        """Admit queued requests in order while the budget allows.
+
+        Caller must hold the lock.
+
+        Returns:
+            (head, seconds until it can be admitted), or (None, 0.0) when
+            nothing is waiting
+        """
+        while True:
+            head = self._head()
+            if head is None:
+                return None, 0.0
+
+            now = time.monotonic()
+            wait_s = self._next_slot - now
+            reservation = None
+            if wait_s <= 0:
+                reservation, wait_s = self._tpm_limiter.try_reserve(head.tokens)
+
+            if reservation is None:
+                if self._timed_head is not head:
+                    # New head: wake it so it sleeps exactly until its turn
+                    self._timed_head = head
+                    head.wake.set()
+                return head, wait_s
+
+            self._next_slot = now + self._rpm_interval
+            job = head.job
+            job._queue.popleft()
+            self._vclock = job._vtime
+            job._vtime += max(1, reservation.tokens) / job.weight
+            job._granted += 1
+            job._tokens += reservation.tokens
+            if self._timed_head is head:
+                self._timed_head = None
+
+            head.reservation = reservation
+            head.granted = True
+            head.wake.set()
+
+
+def interactive_job(name: str = INTERACTIVE_JOB) -> ScheduledJob:
+    """Get an interactive job of the shared scheduler.
+
+    The job is registered with PRIORITY_INTERACTIVE, so its requests are
+    admitted ahead of every waiting batch request; a priority set on it
+    explicitly afterwards is kept. Pass it as job= to call_llm/stream_llm
+    for user-facing requests.
+
+    Args:
+        name: Job name (default: "interactive")
+
+    Returns:
+        ScheduledJob
+    """
+    return BudgetScheduler.get_instance().job(
+        name, priority=PRIORITY_INTERACTIVE, update=False
+    )
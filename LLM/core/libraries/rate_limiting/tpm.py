@@ -0,0 +1,258 @@
+"""
+Tokens-per-minute limiter with reserve-then-reconcile accounting.
+
+Estimates are reserved before a request is sent (so concurrent callers
+cannot over-admit) and corrected with the actual token usage once the
+response arrives.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenReservation:
+    """Tokens reserved in a TPMLimiter window (returned by reserve())."""
+
+    __slots__ = ("timestamp", "tokens", "active")
+
+    def __init__(self, timestamp: float, tokens: int):
+        self.timestamp = timestamp
+        self.tokens = tokens
+        # False once the reservation has left the window
+        self.active = True
+
+
+class TPMLimiter:
+    """Thread-safe sliding-window tokens-per-minute limiter.
+
+    Reservations are kept in a deque in time order with a running total, so
+    expiring old usage is O(1) amortized per request. reserve() blocks
+    exactly until enough earlier usage leaves the window; waiting happens
+    on a condition variable, never while holding the lock.
+
+    Example:
+        limiter = TPMLimiter(tpm=950_000, name="extraction")
+
+        reservation = limiter.reserve(estimated_tokens)   # Blocks if needed
+        response = client.chat.completions.create(...)
+        limiter.reconcile(reservation, response.usage.total_tokens)
+    """
+
+    def __init__(
+        self, tpm: int, name: str = "default", window_seconds: float = 60.0
+    ):
+        """Initialize TPM limiter.
+
+        Args:
+            tpm: Tokens allowed per window
+            name: Name for this limiter (for logging)
+            window_seconds: Window length in seconds (default: 60)
+        """
+        self.tpm = max(1, int(tpm))
+        self.name = name
+        self.window_seconds = float(window_seconds)
+        self._records: Deque[TokenReservation] = deque()
+        self._used = 0
+        # Nothing is admitted before this time (see delay())
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+        logger.debug(
+            f"Initialized TPM limiter '{name}': {self.tpm} tokens/{window_seconds}s"
+        )
+
+    def reserve(
+        self, tokens: int, timeout: Optional[float] = None
+    ) -> Optional[TokenReservation]:
+        """Reserve tokens, blocking until the window has capacity.
+
+        Requests larger than the whole budget are clamped to it (they are
+        admitted once the window is empty).
+
+        Args:
+            tokens: Estimated tokens for the request
+            timeout: Maximum seconds to wait (None = wait indefinitely)
+
+        Returns:
+            TokenReservation to pass to reconcile(), or None on timeout
+        """
+        tokens = min(max(0, int(tokens)), self.tpm)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                reservation, wait_s = self._try_reserve(tokens, now)
+                if reservation is not None:
+                    return reservation
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return None
+                    wait_s = min(wait_s, remaining)
+
+                logger.debug(
+                    f"TPM limiter '{self.name}' waiting {wait_s:.3f}s ({tokens} tokens)"
+                )
+                self._cond.wait(wait_s)
+
+    def try_reserve(self, tokens: int) -> Tuple[Optional[TokenReservation], float]:
+        """Reserve tokens only if the window has room right now.
+
+        Args:
+            tokens: Estimated tokens for the request
+
+        Returns:
+            (reservation, 0.0) on success, else (None, seconds until the
+            window can fit the request)
+        """
+        tokens = min(max(0, int(tokens)), self.tpm)
+        with self._cond:
+            return self._try_reserve(tokens, time.monotonic())
+
+    async def areserve(self, tokens: int) -> TokenReservation:
+        """Reserve tokens from a coroutine, awaiting instead of blocking.
+
+        Args:
+            tokens: Estimated tokens for the request
+
+        Returns:
+            TokenReservation to pass to reconcile()
+        """
+        tokens = min(max(0, int(tokens)), self.tpm)
+        while True:
+            with self._cond:
+                reservation, wait_s = self._try_reserve(tokens, time.monotonic())
+            if reservation is not None:
+                return reservation
+            # Re-check at least every second so refunds are picked up early
+            await asyncio.sleep(min(wait_s, 1.0))
+
+    def reconcile(
+        self, reservation: TokenReservation, actual_tokens: Optional[int]
+    ) -> None:
+        """Replace a reservation's estimate with the actual usage.
+
+        Args:
+            reservation: Reservation returned by reserve()
+            actual_tokens: Actual tokens used (e.g. usage.total_tokens);
+                None keeps the estimate
+        """
+        if actual_tokens is None:
+            return
+
+        actual = max(0, int(actual_tokens))
+        with self._cond:
+            if not reservation.active:
+                # Already left the window - nothing left to correct
+                return
+            delta = actual - reservation.tokens
+            reservation.tokens = actual
+            self._used += delta
+            if delta < 0:
+                # Over-estimate refunded: waiters may now fit
+                self._cond.notify_all()
+
+    def release(self, reservation: TokenReservation) -> None:
+        """Refund a reservation entirely (e.g. the request was never sent).
+
+        Args:
+            reservation: Reservation returned by reserve()
+        """
+        self.reconcile(reservation, 0)
+
+    def delay(self, seconds: float) -> None:
+        """Admit nothing for `seconds` (e.g. from x-ratelimit-reset-tokens).
+
+        Args:
+            seconds: Seconds before the next reservation may be granted
+        """
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        logger.debug(f"TPM limiter '{self.name}' delayed by {seconds}s")
+
+    def set_tpm(self, tpm: int) -> None:
+        """Change the budget of a limiter that may be in use.
+
+        Args:
+            tpm: New tokens allowed per window
+        """
+        with self._cond:
+            self.tpm = max(1, int(tpm))
+            # A larger budget may admit requests already waiting
+            self._cond.notify_all()
+
+    def current_usage(self) -> int:
+        """Get tokens used in the current window."""
+        with self._cond:
+            self._expire(time.monotonic())
+            return self._used
+
+    def stats(self) -> Dict[str, Any]:
+        """Get limiter statistics.
+
+        Returns:
+            Dictionary with name, tpm, used tokens and active reservations
+        """
+        with self._cond:
+            self._expire(time.monotonic())
+            return {
+                "name": self.name,
+                "tpm": self.tpm,
+                "used": self._used,
+                "reservations": len(self._records),
+                "window_seconds": self.window_seconds,
+            }
+
+    def _expire(self, now: float) -> None:
+        """Drop reservations that left the window (caller must hold the lock)."""
+        cutoff = now - self.window_seconds
+        records = self._records
+        expired = False
+        while records and records[0].timestamp <= cutoff:
+            reservation = records.popleft()
+            reservation.active = False
+            self._used -= reservation.tokens
+            expired = True
+        if expired:
+            self._cond.notify_all()
+
+    def _try_reserve(
+        self, tokens: int, now: float
+    ) -> Tuple[Optional[TokenReservation], float]:
+        """Reserve if the window has room (caller holds the lock).
+
+        Returns:
+            (reservation, 0.0) on success, else (None, seconds to wait)
+        """
+        self._expire(now)
+        wait_s = max(
+            self._paused_until - now, self._time_until_capacity(tokens, now)
+        )
+        if wait_s > 0:
+            return None, wait_s
+
+        reservation = TokenReservation(now, tokens)
+        self._records.append(reservation)
+        self._used += tokens
+        return reservation, 0.0
+
+    def _time_until_capacity(self, tokens: int, now: float) -> float:
+        """Seconds until `tokens` more fit in the window (caller holds the lock)."""
+        excess = self._used + tokens - self.tpm
+        if excess <= 0:
+            return 0.0
+
+        freed = 0
+        for reservation in self._records:
+            freed += reservation.tokens
+            if freed >= excess:
+                return reservation.timestamp + self.window_seconds - now
+        return self.window_seconds
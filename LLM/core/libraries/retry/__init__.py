@@ -26,6 +26,12 @@ Usage:
     @retry_llm_call(max_attempts=5)
     def call_openai():
         ...
+
+    # See every 429 the decorators retry (not just the one that gets through)
+    from core.libraries.retry import observe_rate_limits
+
+    with observe_rate_limits(lambda error: print("rate limited:", error)):
+        call_openai()
 """
 
 from LLM.core.libraries.retry.policies import (
@@ -39,6 +45,8 @@ from LLM.core.libraries.retry.policies import (
 from LLM.core.libraries.retry.decorators import (
     with_retry,
     retry_llm_call,
+    is_rate_limit_error,
+    observe_rate_limits,
 )
 
 
@@ -52,4 +60,7 @@ __all__ = [
     # Decorators
     "with_retry",
     "retry_llm_call",
+    # Rate limit signals
+    "is_rate_limit_error",
+    "observe_rate_limits",
 ]
@@ -6,9 +6,13 @@ Part of the CORE libraries - retry library.
 """
 
 import time
+import asyncio
+import inspect
 import logging
 import functools
-from typing import Callable, Optional, Tuple, Type
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, Tuple, Type
 
 from LLM.core.libraries.retry.policies import (
     RetryPolicy,
@@ -19,6 +23,11 @@ from LLM.core.libraries.retry.policies import (
 
 logger = logging.getLogger(__name__)
 
+# Callbacks told about every retried rate limit error in the current context
+_rate_limit_observers: ContextVar[tuple] = ContextVar(
+    "rate_limit_observers", default=()
+)
+
 
 def _is_quota_error(error: Exception) -> bool:
     """
@@ -74,6 +83,59 @@ def _is_quota_error(error: Exception) -> bool:
     return False
 
 
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check if error signals that the provider is rate limiting us (HTTP 429).
+
+    Covers both transient rate limits and terminal quota errors (see
+    _is_quota_error); either way the caller is sending more than the
+    provider currently accepts.
+
+    Args:
+        error: Exception to check
+
+    Returns:
+        True if this is a rate limit or quota error
+    """
+    if type(error).__name__ == "RateLimitError":
+        return True
+    if getattr(error, "status_code", None) == 429:
+        return True
+    if getattr(getattr(error, "response", None), "status_code", None) == 429:
+        return True
+    return _is_quota_error(error)
+
+
+@contextmanager
+def observe_rate_limits(callback: Callable[[Exception], Any]) -> Iterator[None]:
+    """Report rate limit errors that retry decorators absorb to callback.
+
+    A retried 429 never reaches the caller, so code watching for overload
+    (e.g. AdaptiveConcurrencyLimiter.on_error) would only see the error that
+    exhausts the retries. Inside this block, every rate limit error that
+    with_retry / retry_llm_call retries on the same thread or task is passed
+    to callback; the final, re-raised error is left to the caller as usual.
+
+    Example:
+        with observe_rate_limits(limiter.on_error):
+            call_llm(client, messages)
+    """
+    token = _rate_limit_observers.set(_rate_limit_observers.get() + (callback,))
+    try:
+        yield
+    finally:
+        _rate_limit_observers.reset(token)
+
+
+def _notify_rate_limit(error: Exception) -> None:
+    """Pass a retried rate limit error to the observers in this context."""
+    for callback in _rate_limit_observers.get():
+        try:
+            callback(error)
+        except Exception as e:
+            logger.debug(f"Rate limit observer {callback!r} failed: {e}")
+
+
 def _is_empty_entity_validation_error(error: Exception) -> bool:
     """
     Check if error is a ValidationError for empty entities (expected case, don't retry).
@@ -118,10 +180,13 @@ def with_retry(
     max_delay: float = 60.0,
     retry_on: Tuple[Type[Exception], ...] = (Exception,),
     policy: Optional[RetryPolicy] = None,
+    limiter: Optional[Any] = None,
 ) -> Callable:
     """Decorator for automatic retry with configurable policy.
 
-    Integrates with logging and metrics libraries.
+    Integrates with logging and metrics libraries. On rate limit errors the
+    provider's retry-after / x-ratelimit-reset-* headers replace the backoff
+    delay and, when a shared limiter is given, pause it for every caller.
 
     Args:
         max_attempts: Maximum retry attempts (default: 3)
@@ -130,6 +195,9 @@ def with_retry(
         max_delay: Maximum delay for exponential backoff (default: 60.0)
         retry_on: Tuple of exception types to retry (default: all exceptions)
         policy: Custom RetryPolicy instance (overrides other params)
+        limiter: Optional shared limiter with a delay(seconds) method
+            (RateLimiter, CompositeLimiter, BudgetScheduler), or a list of
+            them, to pause on rate limit headers
 
     Returns:
         Decorated function with retry logic
@@ -144,6 +212,11 @@ def with_retry(
         def flaky_operation():
             # Only retries on specific errors
             ...
+
+        @with_retry(max_attempts=3)
+        async def fetch():
+            # Coroutines are retried with asyncio.sleep (event loop not blocked)
+            ...
     """
     # Determine policy
     if policy is None:
@@ -161,14 +234,40 @@ def with_retry(
             policy = ExponentialBackoff(max_attempts=max_attempts)
 
     def decorator(func: Callable) -> Callable:
+        # Get logger for this function
+        func_logger = logging.getLogger(func.__module__)
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
+                        result = await func(*args, **kwargs)
+                    except retry_on as e:
+                        delay = _retry_delay(
+                            func, func_logger, policy, attempt, e, limiter
+                        )
+                        if delay is None:
+                            raise
+                        # Yield to the event loop instead of blocking it
+                        await asyncio.sleep(delay)
+                    else:
+                        if attempt > 1:
+                            func_logger.info(
+                                f"[RETRY] {func.__name__} succeeded on attempt {attempt}"
+                            )
+                        return result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             attempt = 0
             last_exception = None
 
-            # Get logger for this function
-            func_logger = logging.getLogger(func.__module__)
-
             while attempt < policy.max_attempts:
                 attempt += 1
 
@@ -187,64 +286,11 @@ def with_retry(
                 except retry_on as e:
                     last_exception = e
 
-                    # Don't retry quota errors - they won't succeed
-                    if _is_quota_error(e):
-                        func_logger.error(
-                            f"[RETRY] {func.__name__} failed with quota error. "
-                            "Quota errors won't succeed on retry. Stopping immediately.",
-                            exc_info=True,
-                        )
-                        raise
-
-                    # Don't retry ValidationError for empty entities - LLM correctly returned empty list
-                    # This is a known case where retrying won't help (chunk has no extractable entities)
-                    if _is_empty_entity_validation_error(e):
-                        func_logger.debug(
-                            f"[RETRY] {func.__name__} failed with empty entity validation error. "
-                            "This is expected for chunks with no extractable entities. Not retrying.",
-                        )
-                        raise
-
-                    # Check if should retry
-                    if not policy.should_retry(attempt, e):
-                        # No more retries
-                        func_logger.error(
-                            f"[RETRY] {func.__name__} failed after {attempt} attempts",
-                            exc_info=True,
-                        )
-                        raise
-
-                    # Calculate delay
-                    delay = policy.get_delay(attempt)
-
-                    # Log retry with context
-                    from LLM.core.libraries.error_handling.exceptions import (
-                        format_exception_message,
-                    )
-
-                    error_msg = format_exception_message(e)
-
-                    func_logger.warning(
-                        f"[RETRY] {func.__name__} attempt {attempt} failed: {error_msg}. "
-                        f"Retrying in {delay:.1f}s... "
-                        f"({policy.max_attempts - attempt} attempts remaining)"
+                    delay = _retry_delay(
+                        func, func_logger, policy, attempt, e, limiter
                     )
-
-                    # Track retry metric
-                    try:
-                        from LLM.core.libraries.metrics import MetricRegistry
-
-                        registry = MetricRegistry.get_instance()
-                        retry_counter = registry.get("retries_attempted")
-                        if retry_counter:
-                            retry_counter.inc(
-                                labels={
-                                    "function": func.__name__,
-                                    "error_type": type(e).__name__,
-                                }
-                            )
-                    except Exception:
-                        pass
+                    if delay is None:
+                        raise
 
                     # Wait before retry
                     time.sleep(delay)
@@ -258,13 +304,122 @@ def with_retry(
     return decorator
 
 
-def retry_llm_call(max_attempts: int = 3) -> Callable:
+def _retry_delay(
+    func: Callable,
+    func_logger: logging.Logger,
+    policy: RetryPolicy,
+    attempt: int,
+    error: Exception,
+    limiter: Optional[Any] = None,
+) -> Optional[float]:
+    """Decide whether a failed attempt is retried (shared by sync/async wrappers).
+
+    Logs the outcome and tracks the retry metric.
+
+    Args:
+        func: Decorated function
+        func_logger: Logger of the decorated function's module
+        policy: Retry policy
+        attempt: Attempt number that failed (1-based)
+        error: Exception raised by the attempt
+        limiter: Optional shared limiter (or list) paused by rate limit headers
+
+    Returns:
+        Delay in seconds before the next attempt, or None to re-raise
+    """
+    # Don't retry quota errors - they won't succeed
+    if _is_quota_error(error):
+        func_logger.error(
+            f"[RETRY] {func.__name__} failed with quota error. "
+            "Quota errors won't succeed on retry. Stopping immediately.",
+            exc_info=True,
+        )
+        return None
+
+    # Don't retry ValidationError for empty entities - LLM correctly returned empty list
+    # This is a known case where retrying won't help (chunk has no extractable entities)
+    if _is_empty_entity_validation_error(error):
+        func_logger.debug(
+            f"[RETRY] {func.__name__} failed with empty entity validation error. "
+            "This is expected for chunks with no extractable entities. Not retrying.",
+        )
+        return None
+
+    # Provider back-off hints pause every caller sharing the limiter (even
+    # when this call has no attempts left)
+    header_delay = None
+    rate_limited = is_rate_limit_error(error)
+    if rate_limited:
+        from LLM.core.libraries.rate_limiting.headers import (
+            apply_rate_limit_headers,
+            headers_of,
+        )
+
+        header_delay = apply_rate_limit_headers(
+            limiter,
+            headers_of(error),
+            max_pause=getattr(policy, "max_delay", None),
+        )
+
+    # Check if should retry
+    if not policy.should_retry(attempt, error):
+        # No more retries
+        func_logger.error(
+            f"[RETRY] {func.__name__} failed after {attempt} attempts",
+            exc_info=True,
+        )
+        return None
+
+    # Retried 429s never reach the caller; tell whoever watches for overload
+    if rate_limited:
+        _notify_rate_limit(error)
+
+    # Calculate delay (the provider's hint, capped at the policy's max_delay,
+    # wins over the backoff policy)
+    delay = header_delay if header_delay is not None else policy.get_delay(attempt)
+
+    # Log retry with context
+    from LLM.core.libraries.error_handling.exceptions import (
+        format_exception_message,
+    )
+
+    error_msg = format_exception_message(error)
+
+    func_logger.warning(
+        f"[RETRY] {func.__name__} attempt {attempt} failed: {error_msg}. "
+        f"Retrying in {delay:.1f}s... "
+        f"({policy.max_attempts - attempt} attempts remaining)"
+    )
+
+    # Track retry metric
+    try:
+        from LLM.core.libraries.metrics import MetricRegistry
+
+        registry = MetricRegistry.get_instance()
+        retry_counter = registry.get("retries_attempted")
+        if retry_counter:
+            retry_counter.inc(
+                labels={
+                    "function": func.__name__,
+                    "error_type": type(error).__name__,
+                }
+            )
+    except Exception:
+        pass
+
+    return delay
+
+
+def retry_llm_call(max_attempts: int = 3, limiter: Optional[Any] = None) -> Callable:
     """Specialized retry decorator for LLM calls.
 
-    Uses exponential backoff optimized for LLM rate limits.
+    Uses exponential backoff optimized for LLM rate limits, honouring the
+    provider's retry-after headers.
 
     Args:
         max_attempts: Maximum retry attempts (default: 3)
+        limiter: Optional shared limiter (or list of them) to pause on 429
+            responses, so all threads back off together (see with_retry)
 
     Returns:
         Decorated function
@@ -281,4 +436,5 @@ def retry_llm_call(max_attempts: int = 3) -> Callable:
         base_delay=1.0,
         max_delay=60.0,
         retry_on=(Exception,),  # Retry on all LLM errors
+        limiter=limiter,
     )
@@ -25,12 +25,8 @@ dashboard_load_duration_seconds = Histogram(
     labels=["dashboard_type"],
 )
 
-# Cache operation metrics
-cache_operations_total = Counter(
-    "cache_operations_total",
-    "Total cache operations (hits and misses)",
-    labels=["cache_name", "operation", "result"],
-)
+# Cache operation metrics (shared with LRUCache, which records every get())
+cache_operations_total = MetricRegistry.get_instance().get("cache_operations_total")
 
 # Plan state metrics
 plan_state_info = Gauge(
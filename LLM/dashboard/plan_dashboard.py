@@ -26,6 +26,7 @@ from LLM.dashboard.state_detector import StateDetector
 from LLM.dashboard.action_executor import ActionExecutor
 from LLM.dashboard.workflow_executor import WorkflowExecutor
 from LLM.dashboard.parallel_detector import ParallelDetector, ParallelGroup
+from LLM.core.libraries.caching import read_lines, read_text
 from LLM.core.libraries.logging import get_logger
 
 logger = get_logger(__name__)
@@ -448,7 +449,7 @@ class PlanDashboard(BaseDashboard):
             return []
 
         try:
-            content = plan_file.read_text(encoding="utf-8")
+            content = read_text(plan_file)
         except (OSError, UnicodeDecodeError) as e:
             logger.error(
                 "Failed to read PLAN file for achievements",
@@ -1177,21 +1178,16 @@ class PlanDashboard(BaseDashboard):
         except FileNotFoundError:
             # Fallback: print first 50 lines
             try:
-                with doc_file.open("r") as f:
-                    lines = f.readlines()[:50]
-                    self.console.print("".join(lines))
+                lines = read_lines(doc_file)
+                self.console.print("".join(lines[:50]))
 
-                    # Count total lines
-                    f.seek(0)
-                    total_lines = sum(1 for _ in f)
+                self.console.print(f"\n[cyan]Showing first 50 of {len(lines)} lines[/cyan]")
+                self.console.print(f"[cyan]Full doc: {doc_path}[/cyan]")
 
-                    self.console.print(f"\n[cyan]Showing first 50 of {total_lines} lines[/cyan]")
-                    self.console.print(f"[cyan]Full doc: {doc_path}[/cyan]")
-
-                    logger.info(
-                        "Document preview shown",
-                        extra={"doc_path": doc_path, "lines_shown": 50, "total_lines": total_lines},
-                    )
+                logger.info(
+                    "Document preview shown",
+                    extra={"doc_path": doc_path, "lines_shown": 50, "total_lines": len(lines)},
+                )
 
             except OSError as e:
                 self.console.print(f"\n[red]Failed to read document: {e}[/red]")
@@ -33,6 +33,9 @@ from typing import Optional, List, Dict
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+# Stat-validated file reads (SUBPLAN/EXECUTION files are re-read per command)
+from LLM.core.libraries.caching import read_text
+
 # Import shared path resolution (Bug #9 fix)
 try:
     from LLM.scripts.generation.path_resolution import resolve_plan_path, copy_to_clipboard_safe
@@ -245,8 +248,7 @@ def find_previous_executions(subplan_path: Path) -> List[Path]:
     Returns:
         List of EXECUTION_TASK file paths, sorted by execution number
     """
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = read_text(subplan_path)
 
     # Find EXECUTION_TASK references
     execution_pattern = r"EXECUTION_TASK_([A-Z_-]+)_(\d+)_(\d+)"
@@ -312,8 +314,7 @@ def find_previous_executions(subplan_path: Path) -> List[Path]:
 def extract_execution_learnings(execution_path: Path) -> Optional[str]:
     """Extract learnings from EXECUTION_TASK file."""
     try:
-        with open(execution_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_text(execution_path)
 
         # Extract Learning Summary section
         learning_match = re.search(
@@ -356,8 +357,7 @@ def get_last_iteration(execution_content: str) -> Optional[Dict[str, any]]:
 
 def generate_create_prompt(subplan_path: Path, execution_num: str, parallel: bool = False) -> str:
     """Generate prompt for creating EXECUTION from SUBPLAN."""
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        subplan_content = f.read()
+    subplan_content = read_text(subplan_path)
 
     objective = extract_subplan_objective(subplan_content)
     approach = extract_subplan_approach(subplan_content)
@@ -480,8 +480,7 @@ Now beginning EXECUTION work..."""
 
 def generate_continue_prompt(execution_path: Path) -> str:
     """Generate prompt for continuing EXECUTION work."""
-    with open(execution_path, "r", encoding="utf-8") as f:
-        execution_content = f.read()
+    execution_content = read_text(execution_path)
 
     last_iteration = get_last_iteration(execution_content)
 
@@ -565,8 +564,7 @@ Now continuing EXECUTION work..."""
 
 def generate_next_prompt(subplan_path: Path) -> str:
     """Generate prompt for starting next EXECUTION in sequence."""
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        subplan_content = f.read()
+    subplan_content = read_text(subplan_path)
 
     objective = extract_subplan_objective(subplan_content)
     approach = extract_subplan_approach(subplan_content)
@@ -286,6 +286,9 @@ logger = get_logger(__name__)
 # Achievement 3.2: Add metrics for performance monitoring
 from LLM.core.libraries.metrics import Counter, Histogram, Timer, MetricRegistry
 
+# Shared stat-validated file reads (PLAN/SUBPLAN/EXECUTION files are re-read per command)
+from LLM.core.libraries.caching import read_text
+
 # Define metrics
 prompt_generation_counter = Counter(
     "prompt_generation_total", description="Total prompts generated", labels=["workflow", "status"]
@@ -541,8 +544,7 @@ def inject_project_context(include_context: bool = True) -> str:
         return ""
 
     try:
-        with open(project_context_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_text(project_context_path)
 
         # Extract key sections (Overview, Structure, Conventions)
         # Keep it concise but comprehensive
@@ -703,8 +705,7 @@ def check_subplan_status(subplan_path: Path) -> Dict[str, any]:
         True
     """
     try:
-        with open(subplan_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_text(subplan_path)
 
         # Check for active EXECUTIONs
         active_match = re.search(
@@ -923,8 +924,7 @@ def generate_prompt(
 
     # Check if PLAN is complete (before finding next achievement)
     try:
-        with open(plan_path, "r", encoding="utf-8") as f:
-            plan_content = f.read()
+        plan_content = read_text(plan_path)
 
         if is_plan_complete(plan_content, plan_data["achievements"], plan_path):
             # PLAN is complete - return completion message (Achievement 2.3: use PromptBuilder)
@@ -1332,8 +1332,7 @@ Exit Codes:
         )
 
         # Read PLAN content once
-        with open(plan_path, "r", encoding="utf-8") as f:
-            plan_content = f.read()
+        plan_content = read_text(plan_path)
 
         # Detect and validate parallel.json (Achievement 2.1)
         from LLM.scripts.generation.parallel_workflow import (
@@ -1636,8 +1635,7 @@ Or use EXECUTION prompt generator directly:
                 active_exec_file = None
                 for exec_file in sorted(execution_files):
                     try:
-                        with open(exec_file, "r", encoding="utf-8") as f:
-                            content = f.read()
+                        content = read_text(exec_file)
                         # Check if NOT complete
                         if not re.search(
                             r"\*\*Status\*\*:\s*✅\s*Complete", content, re.IGNORECASE
@@ -1652,8 +1650,7 @@ Or use EXECUTION prompt generator directly:
                 if not active_exec_file and workflow_state.get("execution_count", 0) > 1:
                     try:
                         # Read SUBPLAN to find next execution
-                        with open(workflow_state["subplan_path"], "r", encoding="utf-8") as f:
-                            subplan_content = f.read()
+                        subplan_content = read_text(workflow_state["subplan_path"])
 
                         # Look for "⏳ Next" status in Active EXECUTION_TASKs table
                         next_match = re.search(r"\|\s*(\d+_\d+)\s*\|\s*⏳\s*Next", subplan_content)
@@ -1706,8 +1703,7 @@ SUBPLAN has {exec_count} active EXECUTION(s). Continue EXECUTION work.
                         if match:
                             exec_num = int(match.group(1))
                             # Verify it's complete
-                            with open(exec_file, "r", encoding="utf-8") as f:
-                                content = f.read()
+                            content = read_text(exec_file)
                             if re.search(
                                 r"\*\*Status\*\*:\s*✅\s*Complete", content, re.IGNORECASE
                             ):
@@ -33,6 +33,9 @@ from typing import Optional, List, Dict
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
+# Stat-validated file reads (SUBPLAN/EXECUTION files are re-read per command)
+from LLM.core.libraries.caching import read_text
+
 # Import shared path resolution (Bug #9 fix)
 try:
     from LLM.scripts.generation.path_resolution import resolve_plan_path, copy_to_clipboard_safe
@@ -226,8 +229,7 @@ def find_execution_files(subplan_path: Path) -> List[Path]:
     Returns:
         List of EXECUTION_TASK file paths
     """
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = read_text(subplan_path)
 
     # Find EXECUTION_TASK references
     execution_pattern = r"EXECUTION_TASK_([A-Z_-]+)_(\d+)_(\d+)"
@@ -284,8 +286,7 @@ def find_execution_files(subplan_path: Path) -> List[Path]:
 def extract_execution_summary(execution_path: Path) -> Optional[str]:
     """Extract summary from EXECUTION_TASK file."""
     try:
-        with open(execution_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_text(execution_path)
 
         # Extract Learning Summary section
         learning_match = re.search(
@@ -430,8 +431,7 @@ def generate_create_prompt(
     Returns:
         Prompt string
     """
-    with open(plan_path, "r", encoding="utf-8") as f:
-        plan_content = f.read()
+    plan_content = read_text(plan_path)
 
     achievement_section = extract_achievement_section(plan_content, achievement_num)
     current_status = extract_current_status(plan_content)
@@ -543,8 +543,7 @@ Creating SUBPLAN + EXECUTION_TASK(s)..."""
 
 def generate_continue_prompt(subplan_path: Path) -> str:
     """Generate prompt for continuing SUBPLAN work."""
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        subplan_content = f.read()
+    subplan_content = read_text(subplan_path)
 
     status = get_subplan_status(subplan_content)
 
@@ -630,8 +629,7 @@ Now continuing SUBPLAN work..."""
 
 def generate_synthesize_prompt(subplan_path: Path) -> str:
     """Generate prompt for synthesizing SUBPLAN results."""
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        subplan_content = f.read()
+    subplan_content = read_text(subplan_path)
 
     execution_files = find_execution_files(subplan_path)
 
@@ -714,8 +712,7 @@ Now synthesizing SUBPLAN results..."""
 
 def auto_detect_mode(subplan_path: Path) -> str:
     """Auto-detect which mode to use based on SUBPLAN status."""
-    with open(subplan_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = read_text(subplan_path)
 
     status = get_subplan_status(content)
 
@@ -30,7 +30,7 @@ from pathlib import Path
 from typing import Dict, Optional, List
 
 # Achievement 3.2: Add caching for performance optimization
-from LLM.core.libraries.caching import cached
+from LLM.core.libraries.caching import cached, get_default_disk_cache, read_text
 
 # Achievement 3.2: Compile regex patterns once at module level for performance
 ACHIEVEMENT_PATTERN = re.compile(r"\*\*Achievement (\d+\.\d+)\*\*:(.+)")
@@ -71,8 +71,10 @@ class PlanParser:
     @cached(
         max_size=50,  # Cache up to 50 PLANs
         ttl=300,  # 5 minutes TTL
-        key_func=lambda self, plan_path: f"{plan_path}:{os.path.getmtime(plan_path) if plan_path.exists() else 0}",
+        key_func=lambda self, plan_path: f"{plan_path.resolve()}:{os.path.getmtime(plan_path) if plan_path.exists() else 0}",
         name="plan_cache",
+        # Persist parsed PLANs across CLI invocations when LLM_CACHE_DIR is set
+        disk_cache=get_default_disk_cache("plan_cache"),
     )
     def parse_plan_file(self, plan_path: Path) -> Dict[str, any]:
         """
@@ -112,9 +114,8 @@ class PlanParser:
         # Import Achievement locally to avoid circular imports
         from LLM.scripts.generation.utils import Achievement
 
-        with open(plan_path, "r", encoding="utf-8") as f:
-            content = f.read()
-            lines = content.split("\n")
+        content = read_text(plan_path)
+        lines = content.split("\n")
 
         # Extract feature name
         feature_name = plan_path.stem.replace("PLAN_", "")
@@ -273,11 +274,10 @@ class PlanParser:
 
         try:
             # 1. Count achievements from PLAN
-            with open(plan_path, "r", encoding="utf-8") as f:
-                content = f.read()
-                # Count "**Achievement X.Y**:" patterns
-                # Achievement 3.2: Use pre-compiled pattern for performance
-                stats["total_achievements"] = len(ACHIEVEMENT_COUNT_PATTERN.findall(content))
+            content = read_text(plan_path)
+            # Count "**Achievement X.Y**:" patterns
+            # Achievement 3.2: Use pre-compiled pattern for performance
+            stats["total_achievements"] = len(ACHIEVEMENT_COUNT_PATTERN.findall(content))
 
             # 2. Count SUBPLANs from filesystem
             plan_folder = Path("work-space/plans") / feature_name
@@ -296,13 +296,12 @@ class PlanParser:
                 total_hours = 0.0
                 for exec_file in execution_files:
                     try:
-                        with open(exec_file, "r", encoding="utf-8") as f:
-                            exec_content = f.read()
-                            # Look for "**Time**: X hours" or "**Actual**: X hours" or "**Time**: X.X hours"
-                            # Achievement 3.2: Use pre-compiled pattern for performance
-                            time_match = TIME_PATTERN.search(exec_content)
-                            if time_match:
-                                total_hours += float(time_match.group(1))
+                        exec_content = read_text(exec_file)
+                        # Look for "**Time**: X hours" or "**Actual**: X hours" or "**Time**: X.X hours"
+                        # Achievement 3.2: Use pre-compiled pattern for performance
+                        time_match = TIME_PATTERN.search(exec_content)
+                        if time_match:
+                            total_hours += float(time_match.group(1))
                     except Exception:
                         # Skip files that can't be read or parsed
                         continue
@@ -34,6 +34,8 @@ from typing import Optional, Dict, List, TYPE_CHECKING
 import re
 import warnings
 
+from LLM.core.libraries.caching import read_text
+
 # Use TYPE_CHECKING to avoid circular imports
 if TYPE_CHECKING:
     from LLM.scripts.generation.utils import Achievement
@@ -160,8 +162,7 @@ class WorkflowDetector:
 
         # Check if SUBPLAN is marked complete in header
         try:
-            with open(subplan_path, "r", encoding="utf-8") as f:
-                header = f.read(500)  # Read first 500 chars for status
+            header = read_text(subplan_path)[:500]  # First 500 chars for status
 
             # Check for explicit completion in header
             if re.search(r"\*\*Status\*\*:\s*✅\s*Complete", header, re.IGNORECASE):
@@ -209,8 +210,7 @@ class WorkflowDetector:
         completed_count = 0
         for exec_file in execution_files:
             try:
-                with open(exec_file, "r", encoding="utf-8") as f:
-                    content = f.read()
+                content = read_text(exec_file)
                 # Check for completion marker anywhere in file (not just header)
                 if re.search(r"\*\*Status\*\*:\s*✅\s*Complete", content, re.IGNORECASE):
                     completed_count += 1
@@ -222,8 +222,7 @@ class WorkflowDetector:
         # Check SUBPLAN for planned execution count (for multi-execution workflows)
         planned_count = None
         try:
-            with open(subplan_path, "r", encoding="utf-8") as f:
-                subplan_content = f.read()
+            subplan_content = read_text(subplan_path)
 
             # Look for "## 🔄 Active EXECUTION_TASKs" section
             active_section_match = re.search(
@@ -464,8 +463,7 @@ class WorkflowDetector:
 
         # Read PLAN content once
         try:
-            with open(plan_path, "r", encoding="utf-8") as f:
-                plan_content = f.read()
+            plan_content = read_text(plan_path)
         except Exception:
             return None
 
@@ -0,0 +1,182 @@
+"""
+Tests for the persistent disk cache tier.
+
+Tests DiskCache directly and as the second tier of LRUCache.
+"""
+
+import time
+
+import pytest
+
+from LLM.core.libraries.caching import (
+    DiskCache,
+    LRUCache,
+    cached,
+    get_default_disk_cache,
+)
+
+
+@pytest.fixture
+def disk(tmp_path):
+    """Provide a DiskCache in a temporary directory."""
+    cache = DiskCache(tmp_path / "cache.sqlite", name="test")
+    yield cache
+    cache.close()
+
+
+class TestDiskCache:
+    """Tests for DiskCache."""
+
+    def test_set_and_get(self, disk):
+        """Test stored values round-trip through pickle."""
+        disk.set("key", {"plans": [1, 2, 3]})
+
+        assert disk.get("key") == {"plans": [1, 2, 3]}
+        assert disk.get("missing", "default") == "default"
+
+    def test_survives_reopen(self, tmp_path):
+        """Test values persist across DiskCache instances (process restarts)."""
+        path = tmp_path / "cache.sqlite"
+        first = DiskCache(path)
+        first.set("key", "value")
+        first.close()
+
+        second = DiskCache(path)
+        assert second.get("key") == "value"
+        second.close()
+
+    def test_byte_budget_evicts_least_recently_accessed(self, tmp_path):
+        """Test entries are evicted once total size exceeds max_bytes."""
+        cache = DiskCache(tmp_path / "cache.sqlite", max_bytes=2500)
+        cache.set("a", "x" * 1000)
+        cache.set("b", "x" * 1000)
+        cache.get("a")  # "b" is now least recently accessed
+        cache.set("c", "x" * 1000)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.total_bytes() <= 2500
+        assert cache.stats()["evictions"] == 1
+        cache.close()
+
+    def test_oversized_and_unpicklable_values_skipped(self, tmp_path):
+        """Test values that cannot be stored are rejected without raising."""
+        cache = DiskCache(tmp_path / "cache.sqlite", max_bytes=100)
+
+        assert cache.set("big", "x" * 1000) is False
+        assert cache.set("lambda", lambda: None) is False
+        assert cache.size() == 0
+        cache.close()
+
+    def test_ttl_expiration(self, disk):
+        """Test expired entries are dropped on read."""
+        disk.ttl = -1  # Everything is already expired
+        disk.set("key", "value")
+
+        assert disk.get("key") is None
+        assert disk.size() == 0
+
+    def test_per_entry_ttl(self, disk):
+        """Test entries written with their own ttl expire independently."""
+        disk.set("short", "value", ttl=0.01)
+        disk.set("long", "value", ttl=60)
+        time.sleep(0.02)
+
+        assert disk.get("short") is None
+        assert disk.get("long") == "value"
+
+
+class TestLRUCacheDiskTier:
+    """Tests for LRUCache with a disk tier attached."""
+
+    def test_memory_miss_served_from_disk(self, disk):
+        """Test a fresh LRUCache reads values written by a previous one."""
+        LRUCache(name="first", disk_cache=disk).set("key", "value")
+
+        cache = LRUCache(name="second", disk_cache=disk)
+        assert cache.get("key") == "value"
+        assert cache.size() == 1  # Promoted into memory
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["disk"]["hits"] == 1
+
+    def test_set_during_disk_read_not_overwritten(self, disk, monkeypatch):
+        """Test a set() racing a disk read keeps the newer value in memory."""
+        disk.set("key", "old")
+        cache = LRUCache(disk_cache=disk)
+        disk_get = disk.get
+
+        def racing_get(key, default=None):
+            value = disk_get(key, default)
+            cache.set("key", "new")
+            return value
+
+        monkeypatch.setattr(disk, "get", racing_get)
+
+        assert cache.get("key") == "new"
+        monkeypatch.undo()
+        assert cache.get("key") == "new"
+
+    def test_expired_entry_not_promoted_from_disk(self, disk):
+        """Test disk entries expire after the LRUCache disk_ttl."""
+        cache = LRUCache(disk_ttl=0.01, disk_cache=disk)
+        cache.set("key", "value")
+        time.sleep(0.02)
+
+        assert LRUCache(disk_cache=disk).get("key") is None
+        assert disk.size() == 0
+
+    def test_memory_ttl_does_not_expire_disk_entries(self, disk):
+        """Test a later run still finds entries past the in-memory ttl."""
+        LRUCache(ttl=0.01, disk_cache=disk).set("key", "value")
+        time.sleep(0.02)
+
+        assert LRUCache(ttl=0.01, disk_cache=disk).get("key") == "value"
+
+    def test_delete_and_clear_cover_both_tiers(self, disk):
+        """Test delete/clear remove entries from disk too."""
+        cache = LRUCache(disk_cache=disk)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        assert cache.delete("a") is True
+        assert disk.get("a") is None
+
+        cache.clear()
+        assert disk.size() == 0
+
+    def test_cached_decorator_with_disk_tier(self, disk):
+        """Test @cached reuses results persisted by another decorated function."""
+        calls = []
+
+        def compute(x):
+            calls.append(x)
+            return x * 2
+
+        first = cached(disk_cache=disk)(compute)
+        second = cached(disk_cache=disk)(compute)
+
+        assert first(21) == 42
+        assert second(21) == 42
+        assert calls == [21]
+
+
+class TestGetDefaultDiskCache:
+    """Tests for get_default_disk_cache."""
+
+    def test_disabled_without_env(self, monkeypatch):
+        """Test persistence is opt-in."""
+        monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+
+        assert get_default_disk_cache("plan_cache") is None
+
+    def test_uses_env_directory(self, monkeypatch, tmp_path):
+        """Test cache file is created under LLM_CACHE_DIR."""
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+
+        cache = get_default_disk_cache("plan_cache")
+        assert cache is not None
+        assert cache.path == tmp_path / "plan_cache.sqlite"
+        cache.close()
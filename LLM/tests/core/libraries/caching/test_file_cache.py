@@ -0,0 +1,126 @@
+"""
+Tests for the stat-validated file content cache.
+"""
+
+import os
+import threading
+
+import pytest
+
+from LLM.core.libraries.caching import FileContentCache, read_text
+
+
+@pytest.fixture
+def files():
+    """Provide a fresh FileContentCache."""
+    return FileContentCache(max_size=10)
+
+
+@pytest.fixture
+def plan_file(tmp_path):
+    """Create a small PLAN-like markdown file."""
+    path = tmp_path / "PLAN_TEST.md"
+    path.write_text("# PLAN\n**Status**: Active\nline 3\n", encoding="utf-8")
+    return path
+
+
+class TestReadText:
+    """Tests for FileContentCache.read_text."""
+
+    def test_second_read_is_a_hit(self, files, plan_file):
+        """Test unchanged files are served from cache."""
+        first = files.read_text(plan_file)
+        second = files.read_text(str(plan_file))
+
+        assert first == second == "# PLAN\n**Status**: Active\nline 3\n"
+        stats = files.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_modified_file_is_reread(self, files, plan_file):
+        """Test a change in mtime/size invalidates the entry."""
+        files.read_text(plan_file)
+        plan_file.write_text("# PLAN\n**Status**: ✅ Complete\n", encoding="utf-8")
+
+        assert "Complete" in files.read_text(plan_file)
+
+    def test_same_size_edit_detected_by_mtime(self, files, plan_file):
+        """Test an edit that keeps the size is detected via st_mtime_ns."""
+        files.read_text(plan_file)
+        st = os.stat(plan_file)
+        plan_file.write_text("# PLAN\n**Status**: Paused\nline 3\n", encoding="utf-8")
+        os.utime(plan_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert "Paused" in files.read_text(plan_file)
+
+    def test_missing_file_raises(self, files, tmp_path):
+        """Test missing files raise like open() does."""
+        with pytest.raises(FileNotFoundError):
+            files.read_text(tmp_path / "missing.md")
+
+    def test_invalidate_path(self, files, plan_file):
+        """Test explicit invalidation drops the entry."""
+        files.read_text(plan_file)
+        files.invalidate(plan_file)
+
+        assert files.stats()["size"] == 0
+
+
+class TestReadLines:
+    """Tests for read_lines and read_head."""
+
+    def test_read_lines_matches_readlines(self, files, plan_file):
+        """Test read_lines keeps line endings like f.readlines()."""
+        with open(plan_file, "r", encoding="utf-8") as f:
+            expected = f.readlines()
+
+        assert files.read_lines(plan_file) == expected
+
+    def test_read_lines_without_trailing_newline(self, files, tmp_path):
+        """Test the last line is kept when the file lacks a final newline."""
+        path = tmp_path / "doc.md"
+        path.write_text("a\nb", encoding="utf-8")
+
+        assert files.read_lines(path) == ["a\n", "b"]
+
+    def test_read_head(self, files, plan_file):
+        """Test read_head returns the first n lines."""
+        assert files.read_head(plan_file, 2) == ["# PLAN\n", "**Status**: Active\n"]
+        assert len(files.read_head(plan_file, 100)) == 3
+        assert files.read_head(plan_file, 0) == []
+
+
+class TestSharedInstance:
+    """Tests for the process-wide instance helpers."""
+
+    def test_module_helpers_use_shared_instance(self, plan_file):
+        """Test read_text() goes through FileContentCache.get_instance()."""
+        FileContentCache.reset_instance()
+        try:
+            read_text(plan_file)
+            read_text(plan_file)
+
+            assert FileContentCache.get_instance().stats()["hits"] == 1
+        finally:
+            FileContentCache.reset_instance()
+
+    def test_concurrent_get_instance_creates_one(self):
+        """Test threads racing on get_instance() share one instance."""
+        FileContentCache.reset_instance()
+        barrier = threading.Barrier(8)
+        instances = []
+
+        def get():
+            barrier.wait()
+            instances.append(FileContentCache.get_instance())
+
+        try:
+            threads = [threading.Thread(target=get) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=5)
+
+            assert len({id(instance) for instance in instances}) == 1
+        finally:
+            FileContentCache.reset_instance()
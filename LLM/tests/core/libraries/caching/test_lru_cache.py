@@ -0,0 +1,411 @@
+"""
+Tests for LRUCache and the @cached decorator.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.caching import LRUCache, cached
+
+
+class TestLRUCache:
+    """Tests for basic LRUCache behaviour."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest untouched key is evicted when full."""
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_stats_track_hits_and_misses(self):
+        """Test hit/miss counters and hit rate."""
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 50.0
+
+
+class TestCachedSingleFlight:
+    """Tests for single-flight behaviour of @cached on plain functions."""
+
+    def test_concurrent_misses_compute_once(self):
+        """Test N threads missing on one key share a single computation."""
+        calls = []
+        gate = threading.Event()
+
+        @cached()
+        def slow(x):
+            calls.append(x)
+            gate.wait(timeout=5)
+            return x * 2
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(slow(5))) for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert calls == [5]
+        assert results == [10] * 8
+
+    def test_leader_exception_propagates_to_waiters(self):
+        """Test waiters see the leader's exception and nothing is cached."""
+        gate = threading.Event()
+        calls = []
+
+        @cached()
+        def failing(x):
+            calls.append(x)
+            gate.wait(timeout=5)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                failing(1)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert len(errors) == 4
+        assert len(calls) == 1
+        assert failing.cache.size() == 0
+
+    def test_none_results_are_cached(self):
+        """Test None is a cacheable result, not a miss."""
+        calls = []
+
+        @cached()
+        def returns_none(x):
+            calls.append(x)
+            return None
+
+        returns_none(1)
+        returns_none(1)
+
+        assert calls == [1]
+
+    def test_shared_cache_keys_by_function(self):
+        """Test functions sharing one cache do not return each other's results."""
+        shared = LRUCache(name="shared")
+
+        @cached(cache=shared)
+        def square(x):
+            return x * x
+
+        @cached(cache=shared)
+        def cube(x):
+            return x * x * x
+
+        assert square(3) == 9
+        assert cube(3) == 27
+        assert shared.size() == 2
+
+    def test_leader_rechecks_cache(self):
+        """Test a new leader reuses a value cached just after its miss."""
+
+        class LateFillCache(LRUCache):
+            """Cache filled by a 'previous leader' right after the first miss."""
+
+            def get(self, key, default=None):
+                value = super().get(key, default)
+                if value is default and not self.filled:
+                    self.filled = True
+                    self.set(key, "from-previous-leader")
+                return value
+
+        cache = LateFillCache(name="late")
+        cache.filled = False
+        calls = []
+
+        @cached(cache=cache, key_func=str)
+        def load(x):
+            calls.append(x)
+            return "recomputed"
+
+        assert load(1) == "from-previous-leader"
+        assert calls == []
+
+
+class TestCachedAsync:
+    """Tests for @cached on coroutine functions."""
+
+    def test_async_results_cached(self):
+        """Test coroutine results are stored in the LRUCache backend."""
+        calls = []
+
+        @cached(max_size=10)
+        async def fetch(x):
+            calls.append(x)
+            return x + 1
+
+        async def run():
+            return [await fetch(1), await fetch(1)]
+
+        assert asyncio.run(run()) == [2, 2]
+        assert calls == [1]
+        assert fetch.cache.stats()["hits"] == 1
+
+    def test_concurrent_awaiters_share_one_call(self):
+        """Test concurrent misses await a single coroutine execution."""
+        calls = []
+
+        @cached()
+        async def slow(x):
+            calls.append(x)
+            await asyncio.sleep(0.01)
+            return x * 3
+
+        async def run():
+            return await asyncio.gather(*(slow(2) for _ in range(10)))
+
+        assert asyncio.run(run()) == [6] * 10
+        assert calls == [2]
+
+    def test_async_exception_not_cached(self):
+        """Test failures propagate to all awaiters and are not cached."""
+        calls = []
+
+        @cached()
+        async def failing(x):
+            calls.append(x)
+            await asyncio.sleep(0)
+            raise RuntimeError("nope")
+
+        async def run():
+            return await asyncio.gather(failing(1), failing(1), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert calls == [1]
+        assert failing.cache.size() == 0
+
+    def test_sync_and_async_share_backend(self):
+        """Test an explicit cache instance is shared across decorated functions."""
+        shared = LRUCache(name="shared")
+
+        @cached(cache=shared, key_func=lambda x: f"load:{x}")
+        def load(x):
+            return f"sync-{x}"
+
+        @cached(cache=shared, key_func=lambda x: f"load:{x}")
+        async def aload(x):
+            pytest.fail("should be served from the shared cache")
+
+        assert load("a") == "sync-a"
+        assert asyncio.run(aload("a")) == "sync-a"
+        assert aload.cache is shared
+
+
+class TestByteWeightedEviction:
+    """Tests for max_bytes / weigher support."""
+
+    def test_evicts_by_weight(self):
+        """Test LRU entries are evicted until the weight budget fits."""
+        cache = LRUCache(max_size=100, max_bytes=250)
+        cache.set("a", "x" * 100)
+        cache.set("b", "x" * 100)
+        cache.set("c", "x" * 100)
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        stats = cache.stats()
+        assert stats["bytes"] == 200
+        assert stats["evictions"] == 1
+
+    def test_oversized_value_not_cached(self):
+        """Test a value heavier than the budget does not flush the cache."""
+        cache = LRUCache(max_bytes=100)
+        cache.set("small", "x" * 10)
+        cache.set("huge", "x" * 1000)
+
+        assert cache.get("huge") is None
+        assert cache.get("small") == "x" * 10
+
+    def test_overwrite_and_delete_release_weight(self):
+        """Test replacing and deleting entries keeps byte accounting exact."""
+        cache = LRUCache(max_bytes=1000)
+        cache.set("a", "x" * 100)
+        cache.set("a", "x" * 40)
+        assert cache.stats()["bytes"] == 40
+
+        cache.delete("a")
+        assert cache.stats()["bytes"] == 0
+
+    def test_custom_weigher(self):
+        """Test a pluggable weigher is used for accounting."""
+        cache = LRUCache(max_bytes=10, weigher=lambda v: v["cost"])
+        cache.set("a", {"cost": 6})
+        cache.set("b", {"cost": 6})
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 6
+
+    def test_bytes_not_tracked_by_default(self):
+        """Test count-only caches skip weighing."""
+        cache = LRUCache(max_size=10)
+        cache.set("a", "value")
+
+        assert cache.stats()["bytes"] is None
+        assert cache.stats()["evictions"] == 0
+
+    def test_estimate_size_walks_containers(self):
+        """Test default weigher accounts for nested contents."""
+        from LLM.core.libraries.caching import estimate_size
+
+        small = estimate_size({"a": 1})
+        large = estimate_size({"a": ["x" * 10_000]})
+
+        assert estimate_size("abc") == 3
+        assert large > small + 10_000
+
+
+class TestExpiry:
+    """Tests for TTL expiry, purging and the background sweeper."""
+
+    def test_expired_entry_is_a_miss(self):
+        """Test get() never returns an expired value."""
+        cache = LRUCache(ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_purge_expired_reclaims_in_bulk(self):
+        """Test purge_expired() drops untouched expired entries."""
+        cache = LRUCache(ttl=0.01, max_bytes=10_000)
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 10)
+        time.sleep(0.02)
+
+        assert cache.purge_expired() == 5
+        assert cache.size() == 0
+        assert cache.stats()["bytes"] == 0
+
+    def test_refreshed_key_not_purged_by_stale_record(self):
+        """Test re-setting a key gives it a fresh expiry."""
+        cache = LRUCache(ttl=0.05)
+        cache.set("a", 1)
+        time.sleep(0.03)
+        cache.set("a", 2)
+        time.sleep(0.03)
+
+        assert cache.purge_expired() == 0
+        assert cache.get("a") == 2
+
+    def test_set_reclaims_expired_entries(self):
+        """Test writes reclaim expired entries without a sweeper."""
+        cache = LRUCache(ttl=0.01)
+        cache.set("old", 1)
+        time.sleep(0.02)
+        cache.set("new", 2)
+
+        assert cache.size() == 1
+
+    def test_background_sweeper(self):
+        """Test the daemon sweeper reclaims expired entries."""
+        cache = LRUCache(ttl=0.01, sweep_interval=0.01)
+        try:
+            cache.set("a", 1)
+            deadline = time.time() + 2
+            while cache.size() and time.time() < deadline:
+                time.sleep(0.01)
+
+            assert cache.size() == 0
+        finally:
+            cache.stop_sweeper()
+
+    def test_sweeper_requires_ttl(self):
+        """Test no thread is started for caches without TTL."""
+        cache = LRUCache(sweep_interval=0.01)
+
+        assert cache._sweeper is None
+
+
+class TestMetrics:
+    """Tests for LRUCache metrics published to the MetricRegistry."""
+
+    @staticmethod
+    def _metric(name):
+        from LLM.core.libraries.metrics import MetricRegistry
+
+        return MetricRegistry.get_instance().get(name)
+
+    def test_hits_and_misses_counted_by_name(self):
+        """Test get() feeds cache_operations_total labelled by cache name."""
+        ops = self._metric("cache_operations_total")
+        hit = {"cache_name": "metrics_ops", "operation": "get", "result": "hit"}
+        miss = {"cache_name": "metrics_ops", "operation": "get", "result": "miss"}
+        hits_before, misses_before = ops.get(hit), ops.get(miss)
+
+        cache = LRUCache(name="metrics_ops")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("a")
+        cache.get("missing")
+
+        assert ops.get(hit) - hits_before == 2
+        assert ops.get(miss) - misses_before == 1
+
+    def test_evictions_expirations_and_size(self):
+        """Test eviction/expiry counters and size gauges track the cache."""
+        labels = {"cache_name": "metrics_evict"}
+        evictions = self._metric("cache_evictions_total")
+        expirations = self._metric("cache_expirations_total")
+        evicted_before = evictions.get(labels)
+        expired_before = expirations.get(labels)
+
+        cache = LRUCache(max_size=2, ttl=0.01, max_bytes=1000, name="metrics_evict")
+        for key in ("a", "b", "c"):
+            cache.set(key, "x" * 10)
+
+        assert evictions.get(labels) - evicted_before == 1
+        assert self._metric("cache_entries").get(labels) == 2
+        assert self._metric("cache_bytes").get(labels) == 20
+
+        time.sleep(0.02)
+        cache.purge_expired()
+
+        assert expirations.get(labels) - expired_before == 2
+        assert self._metric("cache_entries").get(labels) == 0
+
+    def test_metrics_exported_as_prometheus_text(self):
+        """Test cache metrics appear in export_prometheus_text()."""
+        from LLM.core.libraries.metrics import export_prometheus_text
+
+        cache = LRUCache(name="metrics_export")
+        cache.set("a", 1)
+        cache.get("a")
+
+        text = export_prometheus_text()
+        assert 'cache_name="metrics_export"' in text
+        assert "cache_operations_total" in text
+        assert "cache_entries" in text
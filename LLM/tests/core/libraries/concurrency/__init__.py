@@ -0,0 +1 @@
+"""Tests for concurrency library."""
@@ -0,0 +1,166 @@
+"""
+Tests for the asyncio concurrency helpers.
+"""
+
+import asyncio
+
+import pytest
+
+from LLM.core.libraries.concurrency import (
+    ItemFailure,
+    arun_concurrent_map,
+    arun_llm_concurrent,
+    arun_with_tpm,
+)
+
+
+class TestArunConcurrentMap:
+    """Tests for arun_concurrent_map."""
+
+    def test_ordered_results_with_bounded_concurrency(self):
+        """Test results keep input order and the semaphore bounds concurrency."""
+        active = 0
+        peak = 0
+
+        async def work(x):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.001 * (5 - x % 5))
+            active -= 1
+            return x * 2
+
+        results = asyncio.run(arun_concurrent_map(range(20), work, max_concurrency=3))
+
+        assert results == [x * 2 for x in range(20)]
+        assert peak == 3
+
+    def test_on_error_fallback(self):
+        """Test failures are replaced by the on_error value."""
+
+        async def work(x):
+            if x == 1:
+                raise ValueError("bad")
+            return x
+
+        results = asyncio.run(
+            arun_concurrent_map([0, 1, 2], work, on_error=lambda e, item: None)
+        )
+
+        assert results == [0, None, 2]
+
+    def test_error_raised_without_handler(self):
+        """Test the first failure propagates."""
+
+        async def work(x):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(arun_concurrent_map([1, 2], work))
+
+
+class TestArunLLMConcurrent:
+    """Tests for arun_llm_concurrent."""
+
+    def test_retries_then_succeeds(self):
+        """Test failed calls are retried with backoff."""
+        attempts = {}
+
+        class Agent:
+            async def process(self, chunk):
+                attempts[chunk] = attempts.get(chunk, 0) + 1
+                if attempts[chunk] == 1:
+                    raise ConnectionError("transient")
+                return chunk.upper()
+
+        results = asyncio.run(
+            arun_llm_concurrent(
+                ["a", "b"], Agent, "process", retries=1, backoff_s=0.001
+            )
+        )
+
+        assert results == ["A", "B"]
+        assert attempts == {"a": 2, "b": 2}
+
+    def test_qps_shared_across_calls(self):
+        """Test the QPS limit spaces call starts across all coroutines."""
+        loop_times = []
+
+        class Agent:
+            async def process(self, chunk):
+                loop_times.append(asyncio.get_running_loop().time())
+                return chunk
+
+        asyncio.run(arun_llm_concurrent(list(range(5)), Agent, "process", qps=50))
+
+        gaps = [b - a for a, b in zip(loop_times, loop_times[1:])]
+        assert min(gaps) >= 0.015
+
+
+class TestArunWithTpm:
+    """Tests for arun_with_tpm."""
+
+    def test_ordered_pairs_and_failures(self):
+        """Test (item, result) pairs keep order and failures become ItemFailure."""
+
+        async def work(x):
+            if x == 2:
+                raise ValueError("bad")
+            return {"value": x, "usage": {"total_tokens": 5}}
+
+        results = asyncio.run(
+            arun_with_tpm(list(range(4)), work, lambda x: 10, target_rpm=600_000)
+        )
+
+        assert [item for item, _ in results] == [0, 1, 2, 3]
+        assert isinstance(results[2][1], ItemFailure)
+        assert isinstance(results[2][1].error, ValueError)
+        assert results[3][1]["value"] == 3
+
+    def test_captured_call_usage_replaces_estimates(self, monkeypatch):
+        """Test usage recorded by LLM calls reconciles parsed results."""
+        from LLM.core.libraries.concurrency import async_executor
+        from LLM.core.libraries.metrics.tokens import record_usage
+
+        limiters = []
+
+        class RecordingLimiter(async_executor.TPMLimiter):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                limiters.append(self)
+
+        async def work(x):
+            await asyncio.sleep(0)
+            # What acall_llm records for a response with usage
+            record_usage("gpt-4o-mini", {"prompt_tokens": 5, "completion_tokens": 2})
+            return "ok"
+
+        monkeypatch.setattr(async_executor, "TPMLimiter", RecordingLimiter)
+        results = asyncio.run(
+            arun_with_tpm(list(range(3)), work, lambda x: 10, target_rpm=600_000)
+        )
+
+        assert [result for _, result in results] == ["ok"] * 3
+        # 3 items x 7 captured tokens, not 3 x 10 estimated
+        assert limiters[0].current_usage() == 21
+
+    def test_default_estimate_from_item_text(self, monkeypatch):
+        """Test items are estimated with estimate_item_tokens by default."""
+        from LLM.core.libraries.concurrency import async_executor
+        from LLM.core.libraries.metrics import tokens
+
+        reserved = []
+
+        class RecordingLimiter(async_executor.TPMLimiter):
+            async def areserve(self, tokens_needed):
+                reserved.append(tokens_needed)
+                return await super().areserve(tokens_needed)
+
+        async def work(x):
+            return x
+
+        items = [{"text": "a" * 40}, "b" * 8]
+        monkeypatch.setattr(async_executor, "TPMLimiter", RecordingLimiter)
+        asyncio.run(arun_with_tpm(items, work, target_rpm=600_000))
+
+        assert sorted(reserved) == sorted(tokens.estimate_item_tokens(i) for i in items)
@@ -0,0 +1,62 @@
+"""
+Tests for the checkpoint journal.
+"""
+
+import pytest
+
+from LLM.core.libraries.concurrency import CheckpointStore
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    """Provide a checkpoint in a temporary directory."""
+    store = CheckpointStore(tmp_path / "run.sqlite", name="test")
+    yield store
+    store.close()
+
+
+class TestJournal:
+    """Tests for recording and loading outcomes."""
+
+    def test_completed_results_roundtrip(self, checkpoint):
+        """Test recorded results are restored as written."""
+        checkpoint.record_success("a", {"entities": [1, 2]})
+        checkpoint.record_success("b", "text")
+
+        assert checkpoint.completed() == {"a": {"entities": [1, 2]}, "b": "text"}
+        assert checkpoint.completed(["b", "missing"]) == {"b": "text"}
+
+    def test_failure_then_success(self, checkpoint):
+        """Test the latest outcome wins."""
+        checkpoint.record_failure("a", "RateLimitError: 429")
+        assert checkpoint.failed() == {"a"}
+        assert checkpoint.completed() == {}
+
+        checkpoint.record_success("a", 1)
+        assert checkpoint.failed() == set()
+        assert checkpoint.completed() == {"a": 1}
+
+    def test_survives_reopen(self, checkpoint, tmp_path):
+        """Test results written by one store are visible to a new one."""
+        checkpoint.record_success("a", 1)
+        checkpoint.record_failure("b", "boom")
+
+        reopened = CheckpointStore(tmp_path / "run.sqlite")
+        try:
+            assert reopened.completed() == {"a": 1}
+            assert reopened.stats()["done"] == 1
+            assert reopened.stats()["failed"] == 1
+        finally:
+            reopened.close()
+
+    def test_unpicklable_result_not_recorded(self, checkpoint):
+        """Test unpicklable results are skipped so the item reruns."""
+        assert checkpoint.record_success("a", lambda: None) is False
+        assert checkpoint.completed() == {}
+
+    def test_clear(self, checkpoint):
+        """Test clear removes every entry."""
+        checkpoint.record_success("a", 1)
+        checkpoint.clear()
+
+        assert checkpoint.stats()["done"] == 0
@@ -0,0 +1,334 @@
+"""
+Tests for the concurrency executor helpers.
+"""
+
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.concurrency import (
+    iter_concurrent_map,
+    run_concurrent_map,
+    run_llm_concurrent,
+)
+
+
+class TestIterConcurrentMap:
+    """Tests for the streaming iter_concurrent_map."""
+
+    def test_consumes_generator_with_backpressure(self):
+        """Test the source is only advanced as in-flight slots free up."""
+        pulled = []
+        done = []
+        peak = [0]
+        lock = threading.Lock()
+
+        def source():
+            for i in range(50):
+                pulled.append(i)
+                yield i
+
+        def work(x):
+            with lock:
+                peak[0] = max(peak[0], len(pulled) - len(done))
+            time.sleep(0.001)
+            return x * 2
+
+        for item, result in iter_concurrent_map(
+            source(), work, max_workers=2, max_in_flight=4
+        ):
+            done.append(item)
+            assert result == item * 2
+
+        assert sorted(done) == list(range(50))
+        assert peak[0] <= 4
+
+    def test_yields_before_slow_items_finish(self):
+        """Test fast results are yielded while a slow item is still running."""
+        release = threading.Event()
+
+        def work(x):
+            if x == 0:
+                release.wait(timeout=5)
+            return x
+
+        stream = iter_concurrent_map(range(5), work, max_workers=2)
+        first_item, _ = next(stream)
+        release.set()
+        rest = [item for item, _ in stream]
+
+        assert first_item != 0
+        assert sorted([first_item] + rest) == list(range(5))
+
+    def test_order_window_preserves_input_order(self):
+        """Test ordered mode yields in input order despite completion order."""
+
+        def work(x):
+            time.sleep(0.002 * (10 - x))
+            return x
+
+        stream = iter_concurrent_map(range(10), work, max_workers=4, order_window=3)
+        results = [result for _, result in stream]
+
+        assert results == list(range(10))
+
+    def test_on_error_fallback(self):
+        """Test failures are replaced by the on_error value."""
+
+        def work(x):
+            if x == 2:
+                raise ValueError("bad")
+            return x
+
+        results = dict(
+            iter_concurrent_map(range(4), work, on_error=lambda e, item: -1)
+        )
+
+        assert results == {0: 0, 1: 1, 2: -1, 3: 3}
+
+    def test_error_raised_without_handler(self):
+        """Test the first failure propagates and stops the stream."""
+
+        def work(x):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            list(iter_concurrent_map(range(3), work))
+
+    def test_early_close_stops_pulling(self):
+        """Test breaking out of the loop stops consuming the source."""
+        pulled = []
+
+        def source():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        stream = iter_concurrent_map(source(), lambda x: x, max_in_flight=4)
+        next(stream)
+        stream.close()
+
+        assert len(pulled) < 20
+
+    def test_error_waits_for_running_tasks(self):
+        """Test a failing run returns only after its running tasks finish."""
+        finished = []
+
+        def work(x):
+            if x == 0:
+                raise RuntimeError("boom")
+            time.sleep(0.1)
+            finished.append(x)
+            return x
+
+        with pytest.raises(RuntimeError):
+            run_concurrent_map(range(4), work, max_workers=4)
+
+        assert sorted(finished) == [1, 2, 3]
+
+
+_WORKER_STATE = {}
+
+
+def _init_worker(offset):
+    """Process initializer storing per-worker state."""
+    _WORKER_STATE["offset"] = offset
+
+
+def _add_offset(x):
+    """Module-level (picklable) worker using initializer state."""
+    if x == 3:
+        raise ValueError("bad item")
+    return x + _WORKER_STATE.get("offset", 0)
+
+
+class TestProcessExecutor:
+    """Tests for run_concurrent_map(executor="process")."""
+
+    def test_runs_in_processes_with_initializer(self):
+        """Test chunks run in worker processes with initializer state."""
+        results = run_concurrent_map(
+            list(range(10)),
+            _add_offset,
+            max_workers=2,
+            executor="process",
+            chunksize=3,
+            initializer=_init_worker,
+            initargs=(100,),
+            on_error=lambda e, item: -1,
+        )
+
+        assert results == [100, 101, 102, -1, 104, 105, 106, 107, 108, 109]
+
+    def test_error_raised_without_handler(self):
+        """Test worker exceptions propagate to the caller."""
+        with pytest.raises(ValueError):
+            run_concurrent_map(list(range(5)), _add_offset, executor="process")
+
+    def test_unpicklable_callable_falls_back_to_threads(self):
+        """Test lambdas run on threads instead of failing."""
+        results = run_concurrent_map(
+            list(range(5)), lambda x: x * 3, max_workers=2, executor="process"
+        )
+
+        assert results == [0, 3, 6, 9, 12]
+
+    def test_thread_fallback_runs_initializer(self):
+        """Test an unpicklable worker still sees initializer state."""
+        _WORKER_STATE.clear()
+        results = run_concurrent_map(
+            list(range(3)),
+            lambda x: x + _WORKER_STATE["offset"],
+            executor="process",
+            initializer=_init_worker,
+            initargs=(10,),
+        )
+
+        assert results == [10, 11, 12]
+
+    def test_thread_executor_runs_initializer(self):
+        """Test executor="thread" honours initializer too."""
+        _WORKER_STATE.clear()
+        results = run_concurrent_map(
+            [1, 2], _add_offset, initializer=_init_worker, initargs=(5,)
+        )
+
+        assert results == [6, 7]
+
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_accepts_generators(self, executor):
+        """Test non-sequence iterables work in both modes, with desc logging."""
+        _WORKER_STATE.clear()
+        results = run_concurrent_map(
+            (x for x in [1, 2, 4]), _add_offset, executor=executor, desc="gen"
+        )
+
+        assert results == [1, 2, 4]
+
+    def test_rejects_unknown_executor(self):
+        """Test invalid executor names raise ValueError."""
+        with pytest.raises(ValueError):
+            run_concurrent_map([1], abs, executor="fiber")
+
+
+class _RecordingAgent:
+    """Agent that records call start times and the threads using it."""
+
+    created = []
+
+    def __init__(self):
+        self.threads = set()
+        self.starts = []
+        _RecordingAgent.created.append(self)
+
+    def echo(self, chunk):
+        self.threads.add(threading.get_ident())
+        self.starts.append(time.monotonic())
+        if chunk == "fail":
+            raise RuntimeError("boom")
+        return chunk
+
+
+@pytest.fixture
+def agents():
+    """Reset the list of created agents."""
+    _RecordingAgent.created = []
+    return _RecordingAgent.created
+
+
+class TestRunLLMConcurrent:
+    """Tests for run_llm_concurrent."""
+
+    def test_results_in_order(self, agents):
+        """Test results are returned in input order."""
+        chunks = list(range(20))
+        results = run_llm_concurrent(chunks, _RecordingAgent, "echo", max_workers=4)
+
+        assert results == chunks
+
+    def test_results_in_order_regardless_of_preserve_order(self, agents):
+        """Test preserve_order=False still returns input order, as it always has."""
+        chunks = list(range(20))
+        results = run_llm_concurrent(
+            chunks, _RecordingAgent, "echo", max_workers=4, preserve_order=False
+        )
+
+        assert results == chunks
+
+    def test_one_agent_per_worker_thread(self, agents):
+        """Test agents are reused by their thread instead of built per item."""
+        run_llm_concurrent(list(range(40)), _RecordingAgent, "echo", max_workers=3)
+
+        threads = set()
+        for agent in agents:
+            assert len(agent.threads) == 1
+            threads |= agent.threads
+        assert len(agents) == len(threads) < 40
+
+    def test_qps_enforced_across_workers(self, agents):
+        """Test the QPS limit holds for all workers together."""
+        run_llm_concurrent(
+            list(range(6)), _RecordingAgent, "echo", max_workers=6, qps=20
+        )
+
+        starts = sorted(t for agent in agents for t in agent.starts)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert min(gaps) >= 0.04
+        assert starts[-1] - starts[0] >= 0.24
+
+    def test_qps_group_shared_between_calls(self, agents):
+        """Test calls with the same qps_group share one budget."""
+        threads = [
+            threading.Thread(
+                target=run_llm_concurrent,
+                args=([1, 2, 3], _RecordingAgent, "echo"),
+                kwargs={"max_workers": 3, "qps": 20, "qps_group": "shared-test"},
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        starts = sorted(t for agent in agents for t in agent.starts)
+        assert starts[-1] - starts[0] >= 0.24
+
+    @pytest.mark.parametrize(
+        "kwargs, shared",
+        [({}, True), ({"private_qps": True}, False)],
+    )
+    def test_qps_shared_by_default(self, agents, kwargs, shared):
+        """Test concurrent calls share their qps budget unless made private."""
+        threads = [
+            threading.Thread(
+                target=run_llm_concurrent,
+                args=([1, 2, 3], _RecordingAgent, "echo"),
+                kwargs={"max_workers": 3, "qps": 10, **kwargs},
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        starts = sorted(t for agent in agents for t in agent.starts)
+        if shared:
+            assert starts[-1] - starts[0] >= 0.45
+        else:
+            assert starts[-1] - starts[0] < 0.3
+
+    def test_failed_item_uses_on_error(self, agents):
+        """Test exhausted retries are passed to on_error."""
+        results = run_llm_concurrent(
+            ["a", "fail", "b"],
+            _RecordingAgent,
+            "echo",
+            retries=1,
+            backoff_s=0.01,
+            on_error=lambda e, chunk: None,
+        )
+
+        assert results == ["a", None, "b"]
@@ -0,0 +1,153 @@
+"""
+Tests for the shared thread pool registry.
+"""
+
+import threading
+
+import pytest
+
+from LLM.core.libraries.concurrency import (
+    ExecutorRegistry,
+    get_shared_executor,
+    run_concurrent_map,
+    run_concurrent_with_tpm,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    """Give each test its own registry and shut pools down afterwards."""
+    ExecutorRegistry.reset_instance()
+    yield
+    ExecutorRegistry.reset_instance()
+
+
+class TestExecutorRegistry:
+    """Tests for ExecutorRegistry."""
+
+    def test_pools_are_shared_by_name(self):
+        """Test the same named pool is returned on every call."""
+        assert get_shared_executor("a") is get_shared_executor("a")
+        assert get_shared_executor("a") is not get_shared_executor("b")
+
+    def test_configure_sets_size(self):
+        """Test configured sizes are used when the pool is created."""
+        registry = ExecutorRegistry.get_instance()
+        registry.configure("llm", max_workers=3)
+        registry.get("llm")
+
+        assert registry.stats() == {"llm": 3}
+        assert registry.fits("llm", 3)
+        assert not registry.fits("llm", 4)
+
+    def test_concurrent_leases_grow_pool(self):
+        """Test an unconfigured pool grows to cover all concurrent leases."""
+        registry = ExecutorRegistry.get_instance()
+        registry.lease("x", 1)
+        size = registry.stats()["x"]
+        registry.lease("x", size)
+
+        assert registry.stats()["x"] == size + 1
+        assert registry.fits("x", 10 * size)
+
+        registry.release("x", size)
+        registry.release("x", 1)
+
+    def test_configured_pool_is_not_grown(self):
+        """Test leases beyond a configured size share its threads."""
+        registry = ExecutorRegistry.get_instance()
+        registry.configure("llm", max_workers=2)
+        registry.lease("llm", 2)
+        registry.lease("llm", 2)
+
+        assert registry.stats() == {"llm": 2}
+
+    def test_configure_refused_while_leased(self):
+        """Test a leased pool is not shut down under its callers."""
+        registry = ExecutorRegistry.get_instance()
+        pool = registry.lease("llm", 2)
+
+        with pytest.raises(RuntimeError):
+            registry.configure("llm", max_workers=4)
+        assert pool.submit(lambda: 42).result(timeout=5) == 42
+
+        registry.release("llm", 2)
+        registry.configure("llm", max_workers=4)
+        registry.get("llm")
+        assert registry.stats() == {"llm": 4}
+
+    def test_shutdown_recreates_lazily(self):
+        """Test pools can be used again after a graceful shutdown."""
+        registry = ExecutorRegistry.get_instance()
+        first = registry.get("x")
+        registry.shutdown()
+
+        second = registry.get("x")
+        assert second is not first
+        assert second.submit(lambda: 42).result(timeout=5) == 42
+
+
+class TestHelpersReusePools:
+    """Tests that the concurrency helpers run on shared pools."""
+
+    def test_run_concurrent_map_reuses_threads(self):
+        """Test repeated calls run on the same shared worker threads."""
+        names = set()
+
+        def work(x):
+            names.add(threading.current_thread().name)
+            return x
+
+        for _ in range(3):
+            assert run_concurrent_map(range(8), work, max_workers=2) == list(range(8))
+
+        assert all(name.startswith("shared-default") for name in names)
+        assert ExecutorRegistry.get_instance().stats()["default"] >= 2
+
+    def test_nested_calls_do_not_deadlock(self):
+        """Test calls from inside a shared worker fall back to a private pool."""
+        ExecutorRegistry.get_instance().configure("default", max_workers=2)
+
+        def outer(x):
+            return sum(run_concurrent_map(range(3), lambda y: x + y, max_workers=2))
+
+        assert run_concurrent_map(range(4), outer, max_workers=2) == [3, 6, 9, 12]
+
+    def test_tpm_processor_uses_shared_pool(self, monkeypatch):
+        """Test run_concurrent_with_tpm runs batches on the "tpm" pool."""
+        monkeypatch.setenv("RATE_LIMIT_JITTER_MS", "0")
+        results = run_concurrent_with_tpm(
+            items=list(range(5)),
+            processor_fn=lambda x: x * 10,
+            estimate_tokens_fn=lambda x: 1,
+            max_workers=2,
+            batch_size=2,
+        )
+
+        assert results == [(i, i * 10) for i in range(5)]
+        assert "tpm" in ExecutorRegistry.get_instance().stats()
+
+    def test_concurrent_runs_each_get_their_workers(self):
+        """Test two runs sharing the "tpm" pool each keep max_workers busy."""
+        registry = ExecutorRegistry.get_instance()
+        registry.get("tpm")
+        workers = registry.stats()["tpm"]
+        barrier = threading.Barrier(2 * workers, timeout=5)
+
+        def work(x):
+            barrier.wait()
+            return x
+
+        def run():
+            return run_concurrent_map(
+                range(workers), work, max_workers=workers, pool_name="tpm"
+            )
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not barrier.broken
+        assert registry.stats()["tpm"] == 2 * workers
@@ -0,0 +1,414 @@
+"""
+Tests for run_concurrent_with_tpm.
+"""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.concurrency import (
+    CheckpointStore,
+    ItemFailure,
+    run_concurrent_with_tpm,
+)
+from LLM.core.libraries.concurrency import ExecutorRegistry
+from LLM.core.libraries.rate_limiting import (
+    PRIORITY_INTERACTIVE,
+    AdaptiveConcurrencyLimiter,
+    BudgetScheduler,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    """Disable rate limiter jitter so tests run fast."""
+    monkeypatch.setenv("RATE_LIMIT_JITTER_MS", "0")
+
+
+def _run(items, processor_fn, **kwargs):
+    """Run with small, fast limits suitable for tests."""
+    return run_concurrent_with_tpm(
+        items=items,
+        processor_fn=processor_fn,
+        estimate_tokens_fn=lambda item: 10,
+        target_rpm=600_000,
+        **kwargs,
+    )
+
+
+class TestContinuousScheduling:
+    """Tests for the default continuous (barrier-free) mode."""
+
+    def test_results_in_input_order(self):
+        """Test (item, result) pairs keep input order."""
+        results = _run(list(range(20)), lambda x: x * 2, max_workers=4, batch_size=5)
+
+        assert results == [(i, i * 2) for i in range(20)]
+
+    def test_slow_item_does_not_block_later_batches(self):
+        """Test items beyond the first batch run while a slow item is pending."""
+        release = threading.Event()
+        finished = []
+
+        def work(x):
+            if x == 0:
+                # Only released once every other item (all batches) has finished
+                release.wait(timeout=5)
+            else:
+                finished.append(x)
+                if len(finished) == 9:
+                    release.set()
+            return x
+
+        results = _run(list(range(10)), work, max_workers=3, batch_size=3)
+
+        assert release.is_set()
+        assert [r for _, r in results] == list(range(10))
+
+    def test_errors_become_item_failures(self):
+        """Test failing items keep their slot with an ItemFailure result."""
+
+        def work(x):
+            if x == 1:
+                raise ValueError("bad")
+            return None if x == 2 else x
+
+        results = _run([0, 1, 2], work, max_workers=2)
+
+        assert results[0] == (0, 0)
+        assert isinstance(results[1][1], ItemFailure)
+        assert str(results[1][1].error) == "bad"
+        assert not results[1][1]
+        # A legitimate None result stays None
+        assert results[2] == (2, None)
+
+    def test_progress_logged_per_batch(self, caplog):
+        """Test completion is logged every batch_size items."""
+        with caplog.at_level(logging.INFO):
+            _run(list(range(7)), lambda x: x, max_workers=2, batch_size=3)
+
+        completes = [r for r in caplog.messages if "complete in" in r]
+        assert len(completes) == 3
+        assert "1/1 successful" in completes[-1]
+
+
+class TestBatchedScheduling:
+    """Tests for continuous=False (fixed batches)."""
+
+    def test_batched_mode_preserves_order(self):
+        """Test the legacy batch mode still returns ordered results."""
+        results = _run(
+            list(range(7)), lambda x: -x, max_workers=2, batch_size=3, continuous=False
+        )
+
+        assert results == [(i, -i) for i in range(7)]
+
+
+class TestTokenAccounting:
+    """Tests for reserve/reconcile TPM accounting in the processor."""
+
+    def test_actual_usage_replaces_estimates(self, monkeypatch):
+        """Test usage.total_tokens from results is what the window records."""
+        from LLM.core.libraries.concurrency import tpm_processor
+
+        limiters = []
+
+        class RecordingLimiter(tpm_processor.TPMLimiter):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                limiters.append(self)
+
+        monkeypatch.setattr(tpm_processor, "TPMLimiter", RecordingLimiter)
+        _run(list(range(4)), lambda x: {"usage": {"total_tokens": 3}}, max_workers=2)
+
+        # 4 items x 3 actual tokens (estimates of 10 each are not double counted)
+        assert limiters[0].current_usage() == 12
+
+    def test_call_llm_usage_replaces_estimates(self, monkeypatch):
+        """Test usage captured from call_llm reconciles parsed results."""
+        from types import SimpleNamespace
+
+        from LLM.core.libraries.concurrency import tpm_processor
+        from LLM.core.libraries.llm import call_llm
+
+        class StandInClient:
+            """Client answering every request with 7 tokens of usage."""
+
+            def __init__(self):
+                self.chat = SimpleNamespace(
+                    completions=SimpleNamespace(create=self.create)
+                )
+
+            def create(self, **kwargs):
+                message = SimpleNamespace(content="ok")
+                return SimpleNamespace(
+                    choices=[SimpleNamespace(message=message)],
+                    usage=SimpleNamespace(
+                        prompt_tokens=5, completion_tokens=2, total_tokens=7
+                    ),
+                )
+
+        limiters = []
+
+        class RecordingLimiter(tpm_processor.TPMLimiter):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                limiters.append(self)
+
+        monkeypatch.setattr(tpm_processor, "TPMLimiter", RecordingLimiter)
+        client = StandInClient()
+        results = _run(
+            list(range(3)),
+            lambda x: call_llm(client, [{"role": "user", "content": str(x)}]),
+            max_workers=2,
+        )
+
+        assert [result for _, result in results] == ["ok"] * 3
+        # 3 items x 7 tokens from call_llm usage, not 3 x 10 estimated
+        assert limiters[0].current_usage() == 21
+
+    def test_default_estimate_from_item_text(self):
+        """Test items are estimated from their text without estimate_tokens_fn."""
+        results = run_concurrent_with_tpm(
+            [{"text": "a" * 400}, {"text": "b"}], lambda item: item["text"][0]
+        )
+
+        assert results == [({"text": "a" * 400}, "a"), ({"text": "b"}, "b")]
+
+
+class TestAdaptiveConcurrency:
+    """Tests for running under an AdaptiveConcurrencyLimiter."""
+
+    def test_limiter_caps_in_flight_items(self):
+        """Test no more than limiter.limit items run at once."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def slow(x):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return x
+
+        results = _run(
+            list(range(12)), slow, max_workers=8, concurrency_limiter=limiter
+        )
+
+        assert [r for _, r in results] == list(range(12))
+        assert peak[0] <= 2
+        assert limiter.in_flight == 0
+
+    def test_rate_limit_errors_shrink_limit(self):
+        """Test 429s raised by processor_fn back the limiter off."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, cooldown_s=0.0)
+
+        class RateLimitError(Exception):
+            pass
+
+        def throttled(x):
+            raise RateLimitError("429 Too Many Requests")
+
+        results = _run([1, 2], throttled, max_workers=1, concurrency_limiter=limiter)
+
+        assert all(isinstance(result, ItemFailure) for _, result in results)
+        assert limiter.limit == 4
+
+    def test_retried_rate_limits_shrink_limit(self):
+        """Test 429s retried inside processor_fn reach the limiter."""
+        from LLM.core.libraries.retry import with_retry
+
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, cooldown_s=0.0)
+
+        class RateLimitError(Exception):
+            pass
+
+        failed = set()
+
+        @with_retry(max_attempts=2, base_delay=0.0)
+        def call(x):
+            if x not in failed:
+                failed.add(x)
+                raise RateLimitError("429 Too Many Requests")
+            return x
+
+        results = _run([1, 2], call, max_workers=1, concurrency_limiter=limiter)
+
+        assert results == [(1, 1), (2, 2)]
+        assert limiter.limit == 4
+
+    def test_retry_after_pauses_other_workers(self):
+        """Test a retried 429's retry-after delays every worker's next item."""
+        from LLM.core.libraries.retry import with_retry
+
+        class Response:
+            headers = {"retry-after": "0.3"}
+
+        class RateLimitError(Exception):
+            response = Response()
+
+        starts = {}
+        raised_at = []
+
+        @with_retry(max_attempts=2, base_delay=0.0)
+        def call(x):
+            starts.setdefault(x, time.monotonic())
+            if x == 0 and not raised_at:
+                raised_at.append(time.monotonic())
+                raise RateLimitError("429 Too Many Requests")
+            time.sleep(0.05)
+            return x
+
+        results = _run([0, 1, 2, 3], call, max_workers=2)
+
+        assert [r for _, r in results] == [0, 1, 2, 3]
+        assert starts[2] - raised_at[0] >= 0.25
+        assert starts[3] - raised_at[0] >= 0.25
+
+
+class TestCheckpointing:
+    """Tests for checkpointed, resumable runs."""
+
+    @pytest.fixture
+    def checkpoint(self, tmp_path):
+        """Provide a checkpoint in a temporary directory."""
+        store = CheckpointStore(tmp_path / "run.sqlite", name="test")
+        yield store
+        store.close()
+
+    @pytest.mark.parametrize("continuous", [True, False])
+    def test_resume_skips_done_and_requeues_failures(self, checkpoint, continuous):
+        """Test a rerun only processes items that failed the first time."""
+        items = [{"id": f"item-{i}", "value": i} for i in range(10)]
+        calls = []
+        outage = [True]
+
+        def flaky(item):
+            calls.append(item["id"])
+            if item["value"] % 3 == 0 and outage[0]:
+                raise RuntimeError("transient outage")
+            return item["value"] * 10
+
+        kwargs = dict(
+            max_workers=4,
+            batch_size=3,
+            continuous=continuous,
+            checkpoint=checkpoint,
+            item_id_fn=lambda item: item["id"],
+        )
+        first = _run(items, flaky, **kwargs)
+        assert [isinstance(r, ItemFailure) for _, r in first] == [
+            i % 3 == 0 for i in range(10)
+        ]
+        assert [r for _, r in first if r] == [i * 10 for i in range(10) if i % 3]
+        assert checkpoint.failed() == {"item-0", "item-3", "item-6", "item-9"}
+
+        calls.clear()
+        outage[0] = False
+        second = _run(items, flaky, **kwargs)
+
+        assert sorted(calls) == ["item-0", "item-3", "item-6", "item-9"]
+        assert second == [(item, item["value"] * 10) for item in items]
+        assert checkpoint.failed() == set()
+
+    def test_none_result_is_a_success(self, checkpoint):
+        """Test items legitimately returning None are not re-run on resume."""
+        calls = []
+
+        def process(x):
+            calls.append(x)
+            return None if x == "a" else x
+
+        first = _run(["a", "b"], process, checkpoint=checkpoint)
+        second = _run(["a", "b"], process, checkpoint=checkpoint)
+
+        assert first == second == [("a", None), ("b", "b")]
+        assert checkpoint.failed() == set()
+        assert checkpoint.completed() == {"0": None, "1": "b"}
+        assert sorted(calls) == ["a", "b"]
+
+    def test_resume_disabled_reprocesses_everything(self, checkpoint):
+        """Test resume=False ignores recorded results."""
+        calls = []
+
+        def record(x):
+            calls.append(x)
+            return x
+
+        _run([1, 2, 3], record, checkpoint=checkpoint)
+        _run([1, 2, 3], record, checkpoint=checkpoint, resume=False)
+
+        assert sorted(calls) == [1, 1, 2, 2, 3, 3]
+
+
+class TestSharedBudget:
+    """Tests for running as a BudgetScheduler job."""
+
+    def test_job_draws_on_scheduler_budget(self):
+        """Test requests and tokens are accounted to the shared scheduler."""
+        scheduler = BudgetScheduler(tpm=100_000, rpm=600_000, name="test")
+        job = scheduler.job("extraction")
+
+        results = _run(
+            list(range(8)),
+            lambda x: {"value": x, "usage": {"total_tokens": 5}},
+            max_workers=4,
+            job=job,
+        )
+
+        assert [r["value"] for _, r in results] == list(range(8))
+        assert job.stats()["granted"] == 8
+        assert scheduler.current_usage() == 40
+
+    def test_waiting_job_does_not_hold_pool_threads(self):
+        """Test a job waiting for budget leaves pool threads to other jobs."""
+        scheduler = BudgetScheduler(tpm=100, rpm=600_000, name="test")
+        batch = scheduler.job("batch")
+        interactive = scheduler.job("ui", priority=PRIORITY_INTERACTIVE)
+        ExecutorRegistry.reset_instance()
+        ExecutorRegistry.get_instance().configure("tpm", max_workers=2)
+        interactive_done = threading.Event()
+
+        def batch_work(x):
+            # Item 0 holds its 60 tokens until the interactive item ran, so
+            # item 1 has to wait for budget meanwhile
+            if x == 0:
+                interactive_done.wait(timeout=5)
+            return {"usage": {"total_tokens": 0}}
+
+        runner = threading.Thread(
+            target=run_concurrent_with_tpm,
+            kwargs=dict(
+                items=[0, 1],
+                processor_fn=batch_work,
+                estimate_tokens_fn=lambda item: 60,
+                max_workers=2,
+                job=batch,
+            ),
+        )
+        runner.start()
+        try:
+            time.sleep(0.2)
+            start = time.monotonic()
+            results = run_concurrent_with_tpm(
+                items=["prompt"],
+                processor_fn=lambda x: "ok",
+                estimate_tokens_fn=lambda item: 30,
+                max_workers=1,
+                job=interactive,
+            )
+            elapsed = time.monotonic() - start
+        finally:
+            interactive_done.set()
+            runner.join(timeout=10)
+            ExecutorRegistry.reset_instance()
+
+        assert results == [("prompt", "ok")]
+        assert elapsed < 2
+        assert batch.stats()["granted"] == 2
@@ -0,0 +1,323 @@
+"""
+Tests for batch job submission (against a local stand-in batch server).
+"""
+
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+from pydantic import BaseModel
+
+from LLM.core.libraries.concurrency import ItemFailure
+from LLM.core.libraries.llm import BatchJob, BatchRequestError, OpenAIBatchTransport
+
+
+class Entity(BaseModel):
+    """Structured output model for tests."""
+
+    name: str
+
+
+class StandInBatchServer(ThreadingHTTPServer):
+    """Local HTTP server speaking the Files and Batches API subset BatchJob uses.
+
+    Each request in an uploaded file is answered with a function. Batches
+    report "in_progress" for the first `polls_until_done` retrieves and
+    return their output lines in reverse order, like a provider that does
+    not preserve input order. Failed requests go to a separate error file.
+    """
+
+    def __init__(self, answer, polls_until_done=1):
+        super().__init__(("127.0.0.1", 0), StandInBatchHandler)
+        self.answer = answer
+        self.polls_until_done = polls_until_done
+        self.files = {}
+        self.batches = {}
+        self.polls = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def upload(self, filename, content):
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = content
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": "batch",
+            "status": "processed",
+        }
+
+    def create(self, body):
+        batch_id = f"batch-{len(self.batches)}"
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "completion_window": body["completion_window"],
+            "input_file_id": body["input_file_id"],
+            "metadata": body.get("metadata"),
+            "created_at": int(time.time()),
+            "status": "in_progress",
+        }
+        return self.batches[batch_id]
+
+    def retrieve(self, batch_id):
+        batch = self.batches[batch_id]
+        self.polls += 1
+        if batch["status"] == "in_progress" and self.polls > self.polls_until_done:
+            batch["status"] = "completed"
+            output_file_id, error_file_id = self._run(batch["input_file_id"])
+            batch["output_file_id"] = output_file_id
+            batch["error_file_id"] = error_file_id
+        return batch
+
+    def cancel(self, batch_id):
+        batch = self.batches[batch_id]
+        batch["status"] = "cancelled"
+        return batch
+
+    def _run(self, input_file_id):
+        lines, errors = [], []
+        for line in self.files[input_file_id].splitlines():
+            request = json.loads(line)
+            content = self.answer(request["body"])
+            if content is None:
+                error = {"code": "server_error", "message": "boom"}
+                response = {"status_code": 500, "body": {"error": error}}
+                record = {"custom_id": request["custom_id"], "response": response}
+                errors.append(json.dumps(record))
+                continue
+            message = {"role": "assistant", "content": content}
+            body = {"choices": [{"message": message}]}
+            response = {"status_code": 200, "body": body}
+            record = {"custom_id": request["custom_id"], "response": response}
+            lines.append(json.dumps(record))
+        output_id = f"file-{len(self.files)}"
+        self.files[output_id] = "\n".join(reversed(lines))
+        error_id = f"file-{len(self.files)}"
+        self.files[error_id] = "\n".join(errors)
+        return output_id, error_id
+
+
+class StandInBatchHandler(BaseHTTPRequestHandler):
+    """Routes /v1/files and /v1/batches requests to the StandInBatchServer."""
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send(self, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        parts = self.path.strip("/").split("/")
+        with server.lock:
+            if parts == ["v1", "files"]:
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n"
+                form = BytesParser(policy=HTTP).parsebytes(
+                    header.encode() + self._body()
+                )
+                upload = next(
+                    part
+                    for part in form.iter_parts()
+                    if part.get_param("name", header="content-disposition") == "file"
+                )
+                content = upload.get_payload(decode=True).decode("utf-8")
+                self._send(server.upload(upload.get_filename(), content))
+            elif parts == ["v1", "batches"]:
+                self._send(server.create(json.loads(self._body())))
+            elif parts[:2] == ["v1", "batches"] and parts[3:] == ["cancel"]:
+                self._send(server.cancel(parts[2]))
+            else:
+                self.send_error(404)
+
+    def do_GET(self):
+        server = self.server
+        parts = self.path.strip("/").split("/")
+        with server.lock:
+            if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+                self._send(server.retrieve(parts[2]))
+            elif parts[:2] == ["v1", "files"] and parts[3:] == ["content"]:
+                content = server.files[parts[2]].encode("utf-8")
+                self._send(content, "application/octet-stream")
+            else:
+                self.send_error(404)
+
+
+@pytest.fixture
+def serve():
+    """Start stand-in batch servers; returns a transport for each."""
+    servers = []
+
+    def start(answer, polls_until_done=1):
+        server = StandInBatchServer(answer, polls_until_done)
+        threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        ).start()
+        servers.append(server)
+        client = OpenAI(api_key="sk-test", base_url=server.base_url, max_retries=0)
+        return server, OpenAIBatchTransport(client)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def echo(body):
+    """Answer with the user message, failing on "fail"."""
+    text = body["messages"][-1]["content"]
+    return None if text == "fail" else f" {text.upper()} "
+
+
+def to_messages(item):
+    """Chat messages for an item."""
+    return [{"role": "user", "content": item}]
+
+
+class TestBatchJob:
+    """Tests for BatchJob over OpenAIBatchTransport."""
+
+    def test_results_in_input_order(self, serve, tmp_path):
+        """Test results come back as (item, result) in input order."""
+        _, transport = serve(echo)
+        job = BatchJob(transport, work_dir=tmp_path)
+
+        results = job.run(["a", "b", "c"], to_messages, poll_interval=0)
+
+        assert results == [("a", "A"), ("b", "B"), ("c", "C")]
+
+    def test_failed_requests_map_to_item_failure(self, serve, tmp_path):
+        """Test failed requests yield an ItemFailure with the provider's reason."""
+        _, transport = serve(echo)
+        job = BatchJob(transport, work_dir=tmp_path)
+
+        results = job.run(["a", "fail", "c"], to_messages, poll_interval=0)
+
+        assert [results[0], results[2]] == [("a", "A"), ("c", "C")]
+        failure = results[1][1]
+        assert isinstance(failure, ItemFailure)
+        assert isinstance(failure.error, BatchRequestError)
+        assert "server_error: boom" in str(failure.error)
+        assert "status 500" in str(failure.error)
+        assert not failure
+
+    def test_temp_work_dir_removed(self, serve):
+        """Test run() removes the request files it wrote to a temp dir."""
+        _, transport = serve(echo)
+        job = BatchJob(transport)
+        assert job.work_dir is None
+
+        paths = job.build(["a"], to_messages)
+        assert paths[0].exists()
+        job.cleanup()
+        assert not paths[0].parent.exists()
+
+        assert job.run(["a"], to_messages, poll_interval=0) == [("a", "A")]
+        assert job.work_dir is None
+
+    def test_given_work_dir_kept(self, serve, tmp_path):
+        """Test cleanup() leaves a caller-provided work_dir alone."""
+        _, transport = serve(echo)
+        job = BatchJob(transport, work_dir=tmp_path)
+
+        (path,) = job.build(["a"], to_messages)
+        job.cleanup()
+
+        assert path.exists()
+
+    def test_split_over_batches(self, serve, tmp_path):
+        """Test items beyond max_requests_per_batch go to further batches."""
+        server, transport = serve(echo, polls_until_done=0)
+        job = BatchJob(transport, work_dir=tmp_path, max_requests_per_batch=2)
+        items = ["a", "b", "c", "d", "e"]
+
+        results = job.run(items, to_messages, poll_interval=0)
+
+        assert len(server.batches) == 3
+        assert [r for _, r in results] == ["A", "B", "C", "D", "E"]
+
+    def test_submit_uploads_and_creates_batch(self, serve, tmp_path):
+        """Test request files are uploaded and batches carry job metadata."""
+        server, transport = serve(echo)
+        job = BatchJob(transport, work_dir=tmp_path, name="extract")
+
+        (batch_id,) = job.submit(job.build(["a"], to_messages))
+
+        batch = server.batches[batch_id]
+        assert batch["endpoint"] == "/v1/chat/completions"
+        assert batch["completion_window"] == "24h"
+        assert batch["metadata"] == {"job": "extract", "file": "extract-0000.jsonl"}
+        request = json.loads(server.files[batch["input_file_id"]])
+        assert request["body"]["messages"] == to_messages("a")
+
+    def test_request_file_format(self, serve, tmp_path):
+        """Test request lines carry custom_id, url and the request body."""
+        _, transport = serve(echo)
+        job = BatchJob(transport, work_dir=tmp_path, model="m", max_tokens=50)
+
+        (path,) = job.build(["a"], to_messages)
+        request = json.loads(path.read_text(encoding="utf-8"))
+
+        assert request["custom_id"] == "0"
+        assert request["url"] == "/v1/chat/completions"
+        assert request["body"]["model"] == "m"
+        assert request["body"]["max_tokens"] == 50
+
+    def test_structured_results_parsed(self, serve, tmp_path):
+        """Test response_format outputs are validated into the model."""
+
+        def answer(body):
+            assert body["response_format"]["type"] == "json_schema"
+            text = body["messages"][-1]["content"]
+            return "not json" if text == "bad" else json.dumps({"name": text})
+
+        _, transport = serve(answer)
+        job = BatchJob(transport, work_dir=tmp_path, response_format=Entity)
+
+        results = job.run(["py", "bad"], to_messages, poll_interval=0)
+
+        assert results[0] == ("py", Entity(name="py"))
+        assert isinstance(results[1][1], ItemFailure)
+
+    def test_wait_times_out(self, serve, tmp_path):
+        """Test wait() raises when the batch does not finish in time."""
+        _, transport = serve(echo, polls_until_done=1_000)
+        job = BatchJob(transport, work_dir=tmp_path)
+        (batch_id,) = job.submit(job.build(["a"], to_messages))
+
+        with pytest.raises(TimeoutError):
+            job.wait(batch_id, poll_interval=0.01, timeout=0.05)
+
+    def test_cancel(self, serve, tmp_path):
+        """Test a cancelled batch ends with no results."""
+        server, transport = serve(echo, polls_until_done=1_000)
+        job = BatchJob(transport, work_dir=tmp_path)
+        (batch_id,) = job.submit(job.build(["a"], to_messages))
+
+        transport.cancel(batch_id)
+        batch = job.wait(batch_id, poll_interval=0)
+
+        assert batch["status"] == "cancelled"
+        ((item, result),) = job.collect(["a"], [batch])
+        assert item == "a"
+        assert isinstance(result, ItemFailure)
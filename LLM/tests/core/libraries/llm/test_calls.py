@@ -0,0 +1,282 @@
+"""
+Tests for the LLM call helpers (against a local stand-in client).
+"""
+
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from LLM.core.libraries.llm import ResponseCache, call_llm, stream_llm
+from LLM.core.libraries.metrics import MetricRegistry
+from LLM.core.libraries.rate_limiting import (
+    INTERACTIVE_JOB,
+    PRIORITY_INTERACTIVE,
+    BudgetScheduler,
+    CompositeLimiter,
+    interactive_job,
+)
+
+
+class StandInClient:
+    """Minimal stand-in for the OpenAI client's chat.completions API."""
+
+    def __init__(
+        self, content="  answer  ", total_tokens=42, fail_times=0, headers=None
+    ):
+        self.requests = []
+        self.content = content
+        self.total_tokens = total_tokens
+        self.fail_times = fail_times
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        if headers is not None:
+            # Raw responses expose HTTP headers alongside parse()
+            self.chat.completions.with_raw_response = SimpleNamespace(
+                create=lambda **kwargs: SimpleNamespace(
+                    headers=headers, parse=lambda: self._create(**kwargs)
+                )
+            )
+
+    def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        if len(self.requests) <= self.fail_times:
+            raise ConnectionError("connection reset")
+        if kwargs.get("stream"):
+            return self._chunks()
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message)],
+            usage=SimpleNamespace(total_tokens=self.total_tokens),
+        )
+
+    def _chunks(self):
+        """Stream the content a few characters at a time, then the usage."""
+        for start in range(0, len(self.content), 3):
+            delta = SimpleNamespace(content=self.content[start : start + 3])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+        usage = SimpleNamespace(total_tokens=self.total_tokens)
+        yield SimpleNamespace(choices=[], usage=usage)
+
+
+class Entity(BaseModel):
+    """Structured output model for tests."""
+
+    name: str
+    tags: List[str] = []
+
+
+MESSAGES = [{"role": "user", "content": "What is Python?"}]
+
+
+@pytest.fixture(autouse=True)
+def no_env_overrides(monkeypatch):
+    """Disable rate limiter env overrides."""
+    monkeypatch.delenv("RATE_LIMIT_RPM", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_JITTER_MS", raising=False)
+
+
+@pytest.fixture(autouse=True)
+def fresh_scheduler():
+    """Give each test its own process-wide scheduler (streams draw on it)."""
+    BudgetScheduler.reset_instance()
+    yield
+    BudgetScheduler.reset_instance()
+
+
+class TestCallLLM:
+    """Tests for call_llm."""
+
+    def test_returns_stripped_content(self):
+        """Test plain completions are returned stripped."""
+        client = StandInClient()
+
+        assert call_llm(client, MESSAGES) == "answer"
+        assert client.requests[0]["model"] == "gpt-4o-mini"
+
+    def test_limiter_reconciles_reported_usage(self):
+        """Test the limiter is charged the usage reported by the response."""
+        limiter = CompositeLimiter(rpm=60_000, tpm=100_000, max_concurrency=4)
+        client = StandInClient(total_tokens=42)
+
+        call_llm(client, MESSAGES, max_tokens=500, limiter=limiter)
+
+        stats = limiter.stats()
+        assert stats["tokens_used"] == 42
+        assert stats["in_flight"] == 0
+
+    def test_limiter_permit_released_on_failure(self, monkeypatch):
+        """Test failed attempts give their permit back before retrying."""
+        monkeypatch.setattr("time.sleep", lambda s: None)
+        limiter = CompositeLimiter(max_concurrency=1)
+        client = StandInClient(fail_times=1)
+
+        assert call_llm(client, MESSAGES, limiter=limiter) == "answer"
+        assert len(client.requests) == 2
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_exhausted_window_pauses_limiter(self):
+        """Test x-ratelimit headers of a success hold back the next request."""
+        limiter = CompositeLimiter(max_concurrency=4)
+        client = StandInClient(
+            headers={
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "1s",
+            }
+        )
+
+        assert call_llm(client, MESSAGES, limiter=limiter) == "answer"
+        assert limiter.acquire(timeout=0.05) is None
+
+
+class TestResponseCache:
+    """Tests for call_llm with a response cache."""
+
+    def test_deterministic_replay_skips_request(self, tmp_path):
+        """Test an identical low-temperature call is answered from disk."""
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        client = StandInClient()
+
+        assert call_llm(client, MESSAGES, temperature=0, cache=cache) == "answer"
+        assert call_llm(client, MESSAGES, temperature=0, cache=cache) == "answer"
+        assert len(client.requests) == 1
+        cache.close()
+
+    def test_sampled_calls_not_cached(self, tmp_path):
+        """Test calls above max_temperature always reach the provider."""
+        cache = ResponseCache(tmp_path / "responses.sqlite")
+        client = StandInClient()
+
+        call_llm(client, MESSAGES, temperature=0.9, cache=cache)
+        call_llm(client, MESSAGES, temperature=0.9, cache=cache)
+
+        assert len(client.requests) == 2
+        assert cache.stats()["size"] == 0
+        cache.close()
+
+
+class TestStreaming:
+    """Tests for streamed calls."""
+
+    def test_yields_text_deltas(self):
+        """Test stream=True yields the completion piece by piece."""
+        client = StandInClient(content="Python is a language.")
+
+        deltas = list(call_llm(client, MESSAGES, stream=True))
+
+        assert len(deltas) > 1
+        assert "".join(deltas) == "Python is a language."
+        assert client.requests[0]["stream"] is True
+
+    def test_structured_stream_yields_partial_then_final(self):
+        """Test JSON output is parsed into growing partial models."""
+        client = StandInClient(content='{"name": "Python", "tags": ["lang", "oss"]}')
+
+        models = list(stream_llm(client, MESSAGES, response_format=Entity))
+
+        assert models[-1] == Entity(name="Python", tags=["lang", "oss"])
+        assert any(m.name and m.name != "Python" for m in models[:-1])
+        assert len(models) > 3
+
+    def test_records_time_to_first_token(self):
+        """Test the TTFT histogram is observed per model."""
+        histogram = MetricRegistry.get_instance().get("llm_time_to_first_token_seconds")
+        labels = {"model": "ttft-test-model"}
+        before = histogram.summary(labels=labels)["count"]
+
+        list(stream_llm(StandInClient(), MESSAGES, model="ttft-test-model"))
+
+        assert histogram.summary(labels=labels)["count"] == before + 1
+
+    def test_limiter_released_with_streamed_usage(self):
+        """Test the permit is held for the stream and reconciled at the end."""
+        limiter = CompositeLimiter(tpm=100_000, max_concurrency=1)
+        stream = stream_llm(StandInClient(total_tokens=7), MESSAGES, limiter=limiter)
+
+        next(stream)
+        assert limiter.stats()["in_flight"] == 1
+        list(stream)
+
+        assert limiter.stats()["in_flight"] == 0
+        assert limiter.stats()["tokens_used"] == 7
+
+
+class TestScheduledCalls:
+    """Tests for calls drawing on the process-wide scheduler budget."""
+
+    def test_job_reconciles_reported_usage(self):
+        """Test call_llm charges its job the usage reported by the response."""
+        scheduler = BudgetScheduler(tpm=100_000, rpm=6_000_000, name="test")
+        job = scheduler.job("extraction")
+
+        call_llm(StandInClient(total_tokens=42), MESSAGES, max_tokens=500, job=job)
+
+        assert scheduler.current_usage() == 42
+        assert job.stats()["granted"] == 1
+
+    def test_exhausted_window_pauses_scheduler(self):
+        """Test x-ratelimit headers on the job path hold back the scheduler."""
+        scheduler = BudgetScheduler(tpm=100_000, rpm=6_000_000, name="test")
+        job = scheduler.job("extraction")
+        client = StandInClient(
+            headers={
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "1s",
+            }
+        )
+
+        assert call_llm(client, MESSAGES, job=job) == "answer"
+        assert job.acquire(10, timeout=0.05) is None
+
+    def test_failed_attempt_keeps_estimate(self, monkeypatch):
+        """Test a failed attempt stays charged at its estimate."""
+        monkeypatch.setattr("time.sleep", lambda s: None)
+        scheduler = BudgetScheduler(tpm=100_000, rpm=6_000_000, name="test")
+        job = scheduler.job("extraction")
+        client = StandInClient(total_tokens=42, fail_times=1)
+
+        assert call_llm(client, MESSAGES, max_tokens=500, job=job) == "answer"
+
+        assert job.stats()["granted"] == 2
+        assert scheduler.current_usage() > 500 + 42
+
+    def test_stream_runs_as_interactive_job(self):
+        """Test streams passed interactive_job() draw on the scheduler."""
+        stream = stream_llm(
+            StandInClient(total_tokens=7), MESSAGES, job=interactive_job()
+        )
+        next(stream)
+        list(stream)
+
+        scheduler = BudgetScheduler.get_instance()
+        job = scheduler.stats()["jobs"][INTERACTIVE_JOB]
+        assert job["priority"] == PRIORITY_INTERACTIVE
+        assert job["granted"] == 1
+        assert scheduler.current_usage() == 7
+
+    def test_stream_is_unscheduled_by_default(self):
+        """Test streams without a job do not use the shared scheduler."""
+        list(stream_llm(StandInClient(), MESSAGES))
+
+        assert BudgetScheduler.get_instance().stats()["jobs"] == {}
+
+
+class TestUsageCapture:
+    """Tests for per-call usage capture."""
+
+    def test_on_usage_receives_reported_usage(self):
+        """Test call_llm hands each call's usage to on_usage."""
+        usages = []
+
+        call_llm(StandInClient(total_tokens=42), MESSAGES, on_usage=usages.append)
+
+        assert [u["total_tokens"] for u in usages] == [42]
+
+    def test_streamed_usage_captured(self):
+        """Test the usage chunk at the end of a stream is captured."""
+        usages = []
+        client = StandInClient(total_tokens=9)
+
+        list(stream_llm(client, MESSAGES, on_usage=usages.append))
+
+        assert [u["total_tokens"] for u in usages] == [9]
@@ -0,0 +1,98 @@
+"""
+Tests for the cached OpenAI client registry.
+"""
+
+import pytest
+
+from openai import DEFAULT_CONNECTION_LIMITS
+
+from LLM.core.libraries.llm import (
+    close_openai_clients,
+    get_async_openai_client,
+    get_openai_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_registry(monkeypatch):
+    """Use a fake key and start every test with an empty registry."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    close_openai_clients()
+    yield
+    close_openai_clients()
+
+
+class TestClientRegistry:
+    """Tests for get_openai_client caching and teardown."""
+
+    def test_same_settings_reuse_client(self):
+        """Test repeated calls return the cached client."""
+        assert get_openai_client() is get_openai_client()
+
+    def test_settings_are_part_of_the_key(self):
+        """Test api_key, base_url and timeout select different clients."""
+        client = get_openai_client()
+
+        assert get_openai_client(api_key="sk-other") is not client
+        assert get_openai_client(base_url="http://localhost:8000/v1") is not client
+        assert get_openai_client(timeout=5) is not client
+
+    def test_unshared_client_is_private(self):
+        """Test shared=False bypasses the registry."""
+        assert get_openai_client(shared=False) is not get_openai_client()
+
+    def test_close_clears_registry(self):
+        """Test teardown drops cached clients."""
+        client = get_openai_client()
+        close_openai_clients()
+
+        assert get_openai_client() is not client
+
+    def test_cached_clients_share_one_pool(self):
+        """Test clients with different settings reuse one HTTP client."""
+        assert get_openai_client()._client is get_openai_client(timeout=5)._client
+
+    def test_closing_one_client_keeps_pool_open(self):
+        """Test close() and context-manager exit do not close the shared pool."""
+        client = get_openai_client()
+        other = get_openai_client(timeout=5)
+
+        client.close()
+        with get_openai_client(max_retries=0):
+            pass
+
+        assert not other._client.is_closed
+
+        close_openai_clients()
+        assert other._client.is_closed
+
+    def test_shared_pool_keeps_sdk_connection_limit(self, monkeypatch):
+        """Test the shared pool allows as many connections as the SDK default."""
+        from LLM.core.libraries.llm import client as client_module
+
+        built = []
+        shared_http_client = client_module._SharedHttpClient
+
+        def recording_http_client(**kwargs):
+            built.append(kwargs)
+            return shared_http_client(**kwargs)
+
+        monkeypatch.setattr(client_module, "_SharedHttpClient", recording_http_client)
+        get_openai_client()
+
+        limits = built[0]["limits"]
+        assert limits.max_connections == DEFAULT_CONNECTION_LIMITS.max_connections
+
+    def test_async_client_accepts_base_url(self):
+        """Test the async factory takes base_url like the sync one."""
+        client = get_async_openai_client(base_url="http://localhost:8000/v1")
+
+        assert str(client.base_url) == "http://localhost:8000/v1/"
+
+    def test_missing_key_raises(self, monkeypatch):
+        """Test a missing API key is reported."""
+        monkeypatch.delenv("OPENAI_API_KEY")
+
+        with pytest.raises(RuntimeError):
+            get_openai_client()
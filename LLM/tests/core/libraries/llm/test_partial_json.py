@@ -0,0 +1,94 @@
+"""
+Tests for incremental JSON parsing.
+"""
+
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from LLM.core.libraries.llm import PartialJSONParser, parse_partial_json, partial_model
+
+
+class Entity(BaseModel):
+    """Model for partial construction tests."""
+
+    name: str
+    tags: List[str] = []
+
+
+class TestParsePartialJson:
+    """Tests for parse_partial_json."""
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('{"name": "Pyth', {"name": "Pyth"}),
+            ('{"tags": ["a", "b"], "n', {"tags": ["a", "b"]}),
+            ('{"a": 1, "b": ', {"a": 1}),
+            ('{"a": tr', {}),
+            ('{"a": "x\\', {"a": "x"}),
+            ('{"a": {"b": [1, {"c": "d', {"a": {"b": [1, {"c": "d"}]}}),
+            ("[1, 2, 3", [1, 2, 3]),
+            ('{"done": true}', {"done": True}),
+        ],
+    )
+    def test_prefixes(self, text, expected):
+        """Test truncated JSON is read as far as it is valid."""
+        assert parse_partial_json(text) == expected
+
+    @pytest.mark.parametrize("text", ["", "   ", "tr"])
+    def test_nothing_parseable(self, text):
+        """Test prefixes without any value yield None."""
+        assert parse_partial_json(text) is None
+
+    def test_every_prefix_parses(self):
+        """Test each prefix of a document parses without raising."""
+        document = '{"name": "Py, \\"thon\\"", "tags": ["x", "y"], "n": 12.5}'
+        for end in range(len(document) + 1):
+            parse_partial_json(document[:end])
+        assert parse_partial_json(document)["n"] == 12.5
+
+
+    def test_separators_inside_strings_are_not_cut_points(self):
+        """Test an unparseable open string is dropped, not cut at its comma."""
+        assert parse_partial_json('{"a": "x, \\u12') == {}
+
+
+class TestPartialJSONParser:
+    """Tests for incremental parsing with PartialJSONParser."""
+
+    DOCUMENT = '{"name": "Py, {thon}", "tags": ["x", "y"], "n": 12.5, "ok": true}'
+
+    def test_fed_in_pieces_matches_whole_prefix(self):
+        """Test feeding deltas reads each prefix like parse_partial_json."""
+        parser = PartialJSONParser()
+        for end in range(1, len(self.DOCUMENT) + 1):
+            parser.feed(self.DOCUMENT[end - 1 : end])
+            assert parser.parse() == parse_partial_json(self.DOCUMENT[:end])
+        assert parser.text == self.DOCUMENT
+
+    def test_reparsing_is_throttled(self):
+        """Test long streams are re-parsed a logarithmic number of times."""
+        document = "[" + ", ".join(str(i) for i in range(5000)) + "]"
+        parser = PartialJSONParser()
+        parses = 0
+        for ch in document:
+            parser.feed(ch)
+            if parser.should_parse():
+                parses += 1
+                parser.parse()
+
+        assert parses < 100
+        assert parser.parse() == list(range(5000))
+
+
+class TestPartialModel:
+    """Tests for partial_model."""
+
+    def test_missing_required_fields_are_none(self):
+        """Test fields not yet streamed read as None or their default."""
+        partial = partial_model(Entity, {})
+
+        assert partial.name is None
+        assert partial.tags == []
@@ -0,0 +1,90 @@
+"""
+Tests for the content-addressed LLM response cache.
+"""
+
+import pytest
+from pydantic import BaseModel
+
+from LLM.core.libraries.llm import ResponseCache, get_default_response_cache
+
+MESSAGES = [{"role": "user", "content": "Extract entities from: Python."}]
+
+
+class Entity(BaseModel):
+    """Structured output model for tests."""
+
+    name: str
+    type: str
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Response cache in a temporary directory."""
+    response_cache = ResponseCache(tmp_path / "responses.sqlite")
+    yield response_cache
+    response_cache.close()
+
+
+class TestKeys:
+    """Tests for request keys."""
+
+    def test_stable_and_content_addressed(self):
+        """Test equal requests share a key and any field change alters it."""
+        key = ResponseCache.key("gpt-4o-mini", MESSAGES, 0.0, 100)
+
+        assert key == ResponseCache.key("gpt-4o-mini", list(MESSAGES), 0.0, 100)
+        assert key != ResponseCache.key("gpt-4o", MESSAGES, 0.0, 100)
+        assert key != ResponseCache.key("gpt-4o-mini", MESSAGES, 0.0, 200)
+
+    def test_structured_outputs_in_own_namespace(self):
+        """Test structured requests are keyed apart from plain ones."""
+        text_key = ResponseCache.key("gpt-4o-mini", MESSAGES)
+        structured_key = ResponseCache.key(
+            "gpt-4o-mini", MESSAGES, response_format=Entity
+        )
+
+        assert text_key.startswith("text:")
+        assert structured_key.startswith("structured:")
+
+
+class TestStorage:
+    """Tests for storing and reading responses."""
+
+    def test_text_round_trip(self, cache):
+        """Test completion text is returned unchanged."""
+        key = cache.key("gpt-4o-mini", MESSAGES)
+        assert cache.get(key) is None
+
+        assert cache.set(key, "Python: language")
+        assert cache.get(key) == "Python: language"
+
+    def test_structured_round_trip(self, cache):
+        """Test parsed models come back as model instances."""
+        key = cache.key("gpt-4o-mini", MESSAGES, response_format=Entity)
+        cache.set(key, Entity(name="Python", type="language"))
+
+        assert cache.get(key, Entity) == Entity(name="Python", type="language")
+
+    def test_invalid_structured_entry_dropped(self, cache):
+        """Test entries no longer matching the model are treated as misses."""
+        key = cache.key("gpt-4o-mini", MESSAGES, response_format=Entity)
+        cache.set(key, "not json")
+
+        assert cache.get(key, Entity) is None
+        assert cache.stats()["size"] == 0
+
+    def test_only_low_temperatures_cacheable(self, cache):
+        """Test sampling temperatures above max_temperature are not cached."""
+        assert cache.cacheable(0.0)
+        assert cache.cacheable(0.1)
+        assert not cache.cacheable(0.7)
+
+    def test_default_cache_is_opt_in(self, monkeypatch, tmp_path):
+        """Test the default cache needs LLM_CACHE_DIR."""
+        monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+        assert get_default_response_cache() is None
+
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+        default = get_default_response_cache()
+        assert default is not None
+        default.close()
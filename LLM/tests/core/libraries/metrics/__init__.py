@@ -0,0 +1 @@
+"""Tests for metrics library."""
@@ -0,0 +1,120 @@
+"""
+Tests for token counting and usage capture.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from LLM.core.libraries.metrics import tokens
+from LLM.core.libraries.metrics.tokens import (
+    capture_usage,
+    count_tokens,
+    estimate_item_tokens,
+    estimate_message_tokens,
+    record_usage,
+)
+from LLM.core.libraries.metrics import MetricRegistry, estimate_llm_cost
+
+
+@pytest.fixture
+def heuristic(monkeypatch):
+    """Force the character heuristic (no tokenizer)."""
+    monkeypatch.setattr(tokens, "tiktoken", None)
+    tokens._encoding.cache_clear()
+    yield
+    tokens._encoding.cache_clear()
+
+
+class TestEstimates:
+    """Tests for token estimates."""
+
+    def test_heuristic_fallback(self, heuristic):
+        """Test ~4 characters per token without a tokenizer."""
+        assert count_tokens("") == 0
+        assert count_tokens("abcd") == 1
+        assert count_tokens("abcde") == 2
+
+    def test_message_estimate_includes_overhead_and_max_tokens(self, heuristic):
+        """Test chat overhead and max_tokens are counted."""
+        messages = [{"role": "user", "content": "a" * 40}]
+
+        # reply (3) + message (3) + "user" (1) + content (10) + max_tokens
+        assert estimate_message_tokens(messages, max_tokens=100) == 117
+
+    def test_item_estimate(self, heuristic):
+        """Test items are estimated from messages, text fields or str()."""
+        assert estimate_item_tokens({"text": "a" * 8, "id": 1}) == 2
+        assert estimate_item_tokens("a" * 12) == 3
+        assert estimate_item_tokens([{"role": "user", "content": "abcd"}]) == 8
+
+    @pytest.mark.skipif(tokens.tiktoken is None, reason="tiktoken not installed")
+    def test_tokenizer_counts(self):
+        """Test tiktoken-backed counts when available."""
+        if tokens._encoding("gpt-4o-mini") is None:
+            pytest.skip("tiktoken encoding could not be loaded")
+        assert count_tokens("hello world", "gpt-4o-mini") == 2
+
+    def test_unloadable_default_encoding_falls_back(self, monkeypatch):
+        """Test an unknown model uses the heuristic if no encoding loads."""
+
+        class OfflineTiktoken:
+            @staticmethod
+            def encoding_for_model(model):
+                raise KeyError(model)
+
+            @staticmethod
+            def get_encoding(name):
+                raise ConnectionError("offline")
+
+        monkeypatch.setattr(tokens, "tiktoken", OfflineTiktoken)
+        tokens._encoding.cache_clear()
+        try:
+            assert count_tokens("abcde", "unknown-model") == 2
+        finally:
+            tokens._encoding.cache_clear()
+
+
+class TestRecordUsage:
+    """Tests for record_usage."""
+
+    def test_feeds_metrics_and_cost(self):
+        """Test reported usage lands in token and cost metrics by model."""
+        registry = MetricRegistry.get_instance()
+        model = "usage-test-model"
+        prompt_labels = {"model": model, "type": "prompt"}
+        before = registry.get("llm_tokens_total").get(labels=prompt_labels)
+
+        reported = SimpleNamespace(
+            prompt_tokens=1000, completion_tokens=500, total_tokens=1500
+        )
+        usage = record_usage(model, reported)
+
+        assert usage["total_tokens"] == 1500
+        assert usage["cost_usd"] == pytest.approx(estimate_llm_cost(model, 1000, 500))
+        tokens_total = registry.get("llm_tokens_total")
+        assert tokens_total.get(labels=prompt_labels) == before + 1000
+        assert registry.get("llm_cost_usd_total").get(
+            labels={"model": model}
+        ) == pytest.approx(usage["cost_usd"])
+
+    def test_dict_usage_and_missing_usage(self):
+        """Test usage dicts are accepted and None is ignored."""
+        usage = record_usage(
+            "gpt-4o-mini", {"prompt_tokens": 3, "completion_tokens": 4}
+        )
+
+        assert usage["total_tokens"] == 7
+        assert record_usage("gpt-4o-mini", None) is None
+
+    def test_capture_usage_totals_nested_blocks(self):
+        """Test captures total the usage recorded inside them."""
+        with capture_usage() as outer:
+            record_usage("gpt-4o-mini", {"prompt_tokens": 3, "completion_tokens": 4})
+            with capture_usage() as inner:
+                record_usage("gpt-4o-mini", {"total_tokens": 5, "prompt_tokens": 5})
+        record_usage("gpt-4o-mini", {"total_tokens": 100})
+
+        assert (inner.calls, inner.total_tokens) == (1, 5)
+        assert (outer.calls, outer.total_tokens) == (2, 12)
+        assert outer.prompt_tokens == 8
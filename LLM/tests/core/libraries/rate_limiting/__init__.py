@@ -0,0 +1 @@
+"""Tests for rate limiting library."""
@@ -0,0 +1,183 @@
+"""
+Tests for the adaptive (AIMD) concurrency limiter.
+"""
+
+import threading
+
+import pytest
+
+from LLM.core.libraries.metrics import MetricRegistry
+from LLM.core.libraries.rate_limiting import AdaptiveConcurrencyLimiter
+from LLM.core.libraries.retry import with_retry
+
+
+class RateLimitError(Exception):
+    """Stand-in with the OpenAI SDK's exception name."""
+
+
+def _limiter(**kwargs):
+    """Create a limiter with no decrease cooldown."""
+    kwargs.setdefault("cooldown_s", 0.0)
+    return AdaptiveConcurrencyLimiter(**kwargs)
+
+
+class TestAIMD:
+    """Tests for additive increase and multiplicative decrease."""
+
+    def test_limit_grows_after_limit_successes(self):
+        """Test one step up after `limit` consecutive successes."""
+        limiter = _limiter(initial_limit=4, max_limit=10)
+        limiter.acquire()
+        limiter.acquire()
+        for _ in range(4):
+            limiter.on_success(0.1)
+
+        assert limiter.limit == 5
+
+    def test_no_growth_while_underused(self):
+        """Test successes with few calls in flight do not raise the limit."""
+        limiter = _limiter(initial_limit=10, max_limit=20)
+        limiter.acquire()
+        for _ in range(50):
+            limiter.on_success(0.1)
+
+        assert limiter.limit == 10
+
+    def test_limit_capped_at_max(self):
+        """Test probing never exceeds max_limit."""
+        limiter = _limiter(initial_limit=2, max_limit=3)
+        limiter.acquire()
+        limiter.acquire()
+        for _ in range(50):
+            limiter.on_success(0.1)
+
+        assert limiter.limit == 3
+
+    def test_rate_limit_error_halves_limit(self):
+        """Test 429-style errors cut the limit multiplicatively."""
+        limiter = _limiter(initial_limit=40, min_limit=4)
+
+        assert limiter.on_error(RateLimitError("429 Too Many Requests")) is True
+        assert limiter.limit == 20
+        for _ in range(5):
+            limiter.on_error(RateLimitError("429"))
+        assert limiter.limit == 4
+
+    def test_other_errors_ignored(self):
+        """Test errors unrelated to rate limits leave the limit unchanged."""
+        limiter = _limiter(initial_limit=8)
+
+        assert limiter.on_error(ValueError("bad json")) is False
+        assert limiter.limit == 8
+
+    def test_cooldown_collapses_error_bursts(self):
+        """Test a burst of 429s from in-flight calls counts once."""
+        limiter = _limiter(initial_limit=40, cooldown_s=60.0)
+        for _ in range(10):
+            limiter.on_error(RateLimitError("429"))
+
+        assert limiter.limit == 20
+
+    def test_latency_regression_backs_off(self):
+        """Test a p95 well above the baseline shrinks the limit."""
+        limiter = _limiter(initial_limit=50, max_limit=50, latency_window=10)
+        for _ in range(10):
+            limiter.on_success(0.1)
+        for _ in range(10):
+            limiter.on_success(1.0)
+
+        assert limiter.limit == 25
+        assert limiter.stats()["decreases"] == 1
+
+    def test_latency_step_backs_off_once(self):
+        """Test a lasting latency increase is re-baselined after one decrease."""
+        limiter = _limiter(
+            initial_limit=50, min_limit=1, max_limit=50, latency_window=10
+        )
+        for _ in range(10):
+            limiter.on_success(0.1)
+        for _ in range(100):
+            limiter.on_success(1.0)
+
+        assert limiter.limit == 25
+        assert limiter.stats()["decreases"] == 1
+        assert limiter.stats()["baseline_p95"] == pytest.approx(1.0)
+
+    def test_p95_sampled_once_per_window(self):
+        """Test a window is only evaluated once it is full, then restarted."""
+        limiter = _limiter(initial_limit=50, max_limit=50, latency_window=10)
+        for _ in range(10):
+            limiter.on_success(0.1)
+        # One slow call does not trigger a decrease before its window fills
+        limiter.on_success(1.0)
+        for _ in range(8):
+            limiter.on_success(0.1)
+
+        assert limiter.stats()["decreases"] == 0
+        assert limiter.stats()["baseline_p95"] == pytest.approx(0.1)
+
+
+class TestSlots:
+    """Tests for acquire/release and the slot() context manager."""
+
+    def test_acquire_blocks_at_limit(self):
+        """Test acquire times out while all slots are held."""
+        limiter = _limiter(initial_limit=2)
+        assert limiter.acquire()
+        assert limiter.acquire()
+
+        assert limiter.acquire(timeout=0.05) is False
+        limiter.release()
+        assert limiter.acquire(timeout=0.05) is True
+
+    def test_release_wakes_waiter(self):
+        """Test a blocked acquire proceeds once a slot is released."""
+        limiter = _limiter(initial_limit=1)
+        limiter.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(limiter.acquire(2)))
+        waiter.start()
+        limiter.release()
+        waiter.join()
+
+        assert acquired == [True]
+
+    def test_slot_reports_errors_and_reraises(self):
+        """Test slot() feeds exceptions to the limiter and frees the slot."""
+        limiter = _limiter(initial_limit=10)
+        with pytest.raises(RateLimitError):
+            with limiter.slot():
+                raise RateLimitError("429")
+
+        assert limiter.limit == 5
+        assert limiter.in_flight == 0
+
+    def test_slot_sees_rate_limits_retried_inside(self):
+        """Test a 429 absorbed by a retry decorator still backs the limit off."""
+        limiter = _limiter(initial_limit=10)
+        attempts = []
+
+        @with_retry(max_attempts=3, base_delay=0.0)
+        def call():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RateLimitError("429 Too Many Requests")
+            return "ok"
+
+        with limiter.slot():
+            assert call() == "ok"
+
+        assert limiter.limit == 5
+
+
+class TestMetrics:
+    """Tests for the concurrency_limit gauge."""
+
+    def test_limit_published_as_gauge(self):
+        """Test the current limit is visible in MetricRegistry."""
+        limiter = _limiter(initial_limit=12, name="gauge-test")
+        gauge = MetricRegistry.get_instance().get("concurrency_limit")
+
+        assert gauge.get(labels={"limiter": "gauge-test"}) == 12
+        limiter.on_error(RateLimitError("429"))
+        assert gauge.get(labels={"limiter": "gauge-test"}) == 6
@@ -0,0 +1,106 @@
+"""
+Tests for the composite RPM + TPM + concurrency limiter.
+"""
+
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.rate_limiting import CompositeLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_env_overrides(monkeypatch):
+    """Disable env overrides so limits are exact."""
+    monkeypatch.delenv("RATE_LIMIT_RPM", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_JITTER_MS", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_STATE_DIR", raising=False)
+
+
+class TestConcurrency:
+    """Tests for the in-flight cap."""
+
+    def test_caps_in_flight_requests(self):
+        """Test no more than max_concurrency permits are held at once."""
+        limiter = CompositeLimiter(max_concurrency=2)
+        first = limiter.acquire()
+        limiter.acquire()
+
+        assert limiter.acquire(timeout=0.05) is None
+        limiter.release(first)
+        assert limiter.acquire(timeout=0.05) is not None
+
+    def test_release_is_idempotent(self):
+        """Test releasing a permit twice frees one slot only."""
+        limiter = CompositeLimiter(max_concurrency=1)
+        permit = limiter.acquire()
+        limiter.release(permit)
+        limiter.release(permit)
+
+        assert limiter.stats()["in_flight"] == 0
+
+
+class TestTokens:
+    """Tests for the TPM dimension."""
+
+    def test_waits_for_tokens_without_holding_a_permit(self):
+        """Test a request blocked on tokens does not use a concurrency slot."""
+        limiter = CompositeLimiter(tpm=1000, max_concurrency=2)
+        held = limiter.acquire(900)
+
+        assert limiter.acquire(200, timeout=0.05) is None
+        assert limiter.stats()["in_flight"] == 1
+        small = limiter.acquire(100, timeout=0.05)
+        assert small is not None
+        limiter.release(small)
+        limiter.release(held)
+
+    def test_reconcile_refund_wakes_waiter(self):
+        """Test actual usage below the estimate admits a waiting request."""
+        limiter = CompositeLimiter(tpm=1000)
+        held = limiter.acquire(1000)
+        granted = []
+        waiter = threading.Thread(
+            target=lambda: granted.append(limiter.acquire(500, timeout=2))
+        )
+        waiter.start()
+        time.sleep(0.02)
+
+        limiter.release(held, actual_tokens=300)
+        waiter.join()
+
+        assert granted[0] is not None
+        assert limiter.stats()["tokens_used"] == 800
+
+    def test_limit_context_reconciles_actual_tokens(self):
+        """Test permit.actual_tokens set inside limit() is applied."""
+        limiter = CompositeLimiter(tpm=10_000)
+        with limiter.limit(2000) as permit:
+            permit.actual_tokens = 150
+
+        assert limiter.stats()["tokens_used"] == 150
+        assert limiter.stats()["in_flight"] == 0
+
+
+class TestRequests:
+    """Tests for the RPM dimension."""
+
+    def test_requests_spaced_by_rpm(self):
+        """Test granted requests respect the RPM spacing."""
+        limiter = CompositeLimiter(rpm=1200, tpm=100_000, max_concurrency=8)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.release(limiter.acquire(10))
+
+        assert time.monotonic() - start >= 0.14
+
+    def test_delay_holds_back_every_dimension(self):
+        """Test delay() pauses grants even without an RPM limit."""
+        limiter = CompositeLimiter(max_concurrency=8)
+        limiter.delay(0.1)
+
+        assert limiter.acquire(timeout=0.02) is None
+        start = time.monotonic()
+        limiter.release(limiter.acquire())
+        assert time.monotonic() - start >= 0.05
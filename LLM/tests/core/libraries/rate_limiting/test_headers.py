@@ -0,0 +1,133 @@
+"""
+Tests for rate limit header parsing.
+"""
+
+from email.utils import formatdate
+import time
+
+import pytest
+
+from LLM.core.libraries.rate_limiting.headers import (
+    apply_rate_limit_headers,
+    headers_of,
+    parse_duration,
+    parse_rate_limit_headers,
+)
+
+
+class RecordingLimiter:
+    """Limiter stand-in recording delay() calls."""
+
+    name = "recording"
+
+    def __init__(self):
+        self.delays = []
+
+    def delay(self, seconds):
+        self.delays.append(seconds)
+
+
+class TestParseDuration:
+    """Tests for parse_duration."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("1.5", 1.5),
+            ("1s", 1.0),
+            ("20ms", 0.02),
+            ("6m0s", 360.0),
+            ("1h2m3.5s", 3723.5),
+        ],
+    )
+    def test_formats(self, value, expected):
+        """Test plain seconds and Go-style durations."""
+        assert parse_duration(value) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("value", [None, "", "soon", "5x", "1s later"])
+    def test_malformed(self, value):
+        """Test malformed values yield None."""
+        assert parse_duration(value) is None
+
+
+class TestParseHeaders:
+    """Tests for parse_rate_limit_headers."""
+
+    def test_remaining_and_reset(self):
+        """Test x-ratelimit-* headers are parsed."""
+        info = parse_rate_limit_headers(
+            {
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-remaining-tokens": "1200",
+                "x-ratelimit-reset-requests": "250ms",
+                "x-ratelimit-reset-tokens": "6m0s",
+            }
+        )
+
+        assert info.remaining_requests == 0
+        assert info.remaining_tokens == 1200
+        assert info.reset_requests == pytest.approx(0.25)
+        # Only the exhausted request budget pauses
+        assert info.pause_seconds() == pytest.approx(0.25)
+
+    def test_retry_after_ms_wins(self):
+        """Test retry-after-ms takes precedence over retry-after."""
+        info = parse_rate_limit_headers({"retry-after-ms": "1500", "retry-after": "9"})
+
+        assert info.pause_seconds() == pytest.approx(1.5)
+
+    def test_retry_after_http_date(self):
+        """Test retry-after given as an HTTP date."""
+        headers = {"retry-after": formatdate(time.time() + 30, usegmt=True)}
+
+        assert 25 <= parse_rate_limit_headers(headers).retry_after <= 31
+
+    def test_nothing_exhausted(self):
+        """Test no pause when budgets remain or headers are missing."""
+        info = parse_rate_limit_headers(
+            {"x-ratelimit-remaining-requests": "10", "x-ratelimit-reset-requests": "1s"}
+        )
+
+        assert info.pause_seconds() is None
+        assert parse_rate_limit_headers(None).pause_seconds() is None
+
+
+class TestApplyHeaders:
+    """Tests for apply_rate_limit_headers and headers_of."""
+
+    def test_pauses_limiter(self):
+        """Test an exhausted budget pauses the limiter until it resets."""
+        limiter = RecordingLimiter()
+
+        pause = apply_rate_limit_headers(
+            limiter,
+            {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "2s"},
+        )
+
+        assert pause == pytest.approx(2.0)
+        assert limiter.delays == [pytest.approx(2.0)]
+
+    def test_pause_capped(self):
+        """Test long reset hints are capped at max_pause."""
+        limiter = RecordingLimiter()
+        headers = {
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "6m0s",
+        }
+
+        assert apply_rate_limit_headers(limiter, headers) == pytest.approx(60.0)
+        uncapped = apply_rate_limit_headers(limiter, headers, max_pause=None)
+        assert uncapped == pytest.approx(360.0)
+        assert limiter.delays == [pytest.approx(60.0), pytest.approx(360.0)]
+
+    def test_headers_of_error_response(self):
+        """Test headers are found on an SDK error's response."""
+
+        class Response:
+            headers = {"retry-after": "3"}
+
+        class RateLimitError(Exception):
+            response = Response()
+
+        assert headers_of(RateLimitError()) == {"retry-after": "3"}
+        assert headers_of(ValueError()) is None
@@ -0,0 +1,269 @@
+"""
+Tests for RateLimiter and its state backends.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.rate_limiting import (
+    FileLockBackend,
+    LocalBackend,
+    RateLimiter,
+    RedisBackend,
+)
+from LLM.core.libraries.rate_limiting.backends import get_default_backend
+
+
+@pytest.fixture(autouse=True)
+def no_env_overrides(monkeypatch):
+    """Disable jitter and env overrides so limits are exact."""
+    monkeypatch.setenv("RATE_LIMIT_JITTER_MS", "0")
+    monkeypatch.delenv("RATE_LIMIT_RPM", raising=False)
+    monkeypatch.delenv("RATE_LIMIT_STATE_DIR", raising=False)
+
+
+def _gaps(stamps):
+    """Differences between consecutive sorted timestamps."""
+    stamps = sorted(stamps)
+    return [b - a for a, b in zip(stamps, stamps[1:])]
+
+
+def _wait_in_process(path, stamps, calls):
+    """Process target: wait on a file-backed limiter and record send times."""
+    os.environ["RATE_LIMIT_JITTER_MS"] = "0"
+    limiter = RateLimiter(rpm=1200, name="shared", backend=FileLockBackend(path))
+    for _ in range(calls):
+        limiter.wait()
+        stamps.put(time.time())
+
+
+class RecordingBackend(LocalBackend):
+    """Custom backend recording the calls it receives."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def reserve(self, key, cost, burst=0.0, max_wait=None):
+        self.calls.append(("reserve", key, round(cost, 3)))
+        return super().reserve(key, cost, burst, max_wait)
+
+    def delay(self, key, seconds, burst=0.0):
+        self.calls.append(("delay", key, seconds))
+        super().delay(key, seconds, burst)
+
+
+class TestLocalBackend:
+    """Tests for the default process-local state."""
+
+    def test_requests_spaced_across_threads(self):
+        """Test concurrent callers are spaced by 60 / rpm seconds."""
+        limiter = RateLimiter(rpm=1200, name="threads")
+        stamps = []
+        lock = threading.Lock()
+
+        def call():
+            limiter.wait()
+            with lock:
+                stamps.append(time.monotonic())
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert min(_gaps(stamps)) >= 0.045
+        assert max(stamps) - min(stamps) < 0.5
+
+    def test_delay_pushes_next_request(self):
+        """Test delay() holds back the next wait()."""
+        limiter = RateLimiter(rpm=600_000, name="delayed")
+        limiter.delay(0.1)
+
+        start = time.monotonic()
+        limiter.wait()
+        assert time.monotonic() - start >= 0.09
+
+    def test_limiters_do_not_share_local_state(self):
+        """Test limiters without a backend keep separate budgets."""
+        first = RateLimiter(rpm=1, name="same")
+        second = RateLimiter(rpm=1, name="same")
+        first.wait()
+
+        start = time.monotonic()
+        second.wait()
+        assert time.monotonic() - start < 0.05
+
+
+class TestFileLockBackend:
+    """Tests for the host-wide file backend."""
+
+    def test_budget_shared_between_limiters(self, tmp_path):
+        """Test limiters with the same name share one budget."""
+        path = tmp_path / "ratelimit.json"
+        first = RateLimiter(rpm=1200, name="api", backend=FileLockBackend(path))
+        second = RateLimiter(rpm=1200, name="api", backend=FileLockBackend(path))
+        other = RateLimiter(rpm=1200, name="other", backend=FileLockBackend(path))
+
+        first.wait()
+
+        # Assert on the backend's decision, not wall-clock time (flock I/O)
+        assert second.try_acquire() is False
+        assert other.try_acquire() is True
+
+    def test_budget_shared_across_processes(self, tmp_path):
+        """Test worker processes together stay under one RPM budget."""
+        path = tmp_path / "ratelimit.json"
+        stamps = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=_wait_in_process, args=(path, stamps, 3))
+            for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(10)
+
+        sent = [stamps.get(timeout=1) for _ in range(9)]
+        # Slots are 50ms apart; stamps are taken after wait() returns, so
+        # allow for process scheduling jitter
+        assert min(_gaps(sent)) >= 0.03
+
+    def test_delay_visible_to_other_limiters(self, tmp_path):
+        """Test a Retry-After delay applies to every limiter on the key."""
+        path = tmp_path / "ratelimit.json"
+        RateLimiter(rpm=600_000, name="api", backend=FileLockBackend(path)).delay(0.1)
+
+        start = time.monotonic()
+        RateLimiter(rpm=600_000, name="api", backend=FileLockBackend(path)).wait()
+        assert time.monotonic() - start >= 0.09
+
+    def test_env_enables_shared_state(self, tmp_path, monkeypatch):
+        """Test RATE_LIMIT_STATE_DIR switches the default backend."""
+        assert isinstance(get_default_backend(), LocalBackend)
+
+        monkeypatch.setenv("RATE_LIMIT_STATE_DIR", str(tmp_path))
+        backend = get_default_backend()
+        assert isinstance(backend, FileLockBackend)
+        assert backend.path == tmp_path / "ratelimit.json"
+
+    def test_same_name_different_rate_not_shared(self, tmp_path):
+        """Test same-named limiters with different rates keep separate state."""
+        path = tmp_path / "ratelimit.json"
+        slow = RateLimiter(rpm=60, name="default", backend=FileLockBackend(path))
+        fast = RateLimiter(rpm=1200, name="default", backend=FileLockBackend(path))
+        slow.wait()
+
+        assert fast.try_acquire() is True
+
+
+class TestPluggableBackend:
+    """Tests for custom backends."""
+
+    def test_wait_and_delay_go_through_backend(self):
+        """Test RateLimiter delegates its state to the given backend."""
+        backend = RecordingBackend()
+        limiter = RateLimiter(rpm=600, name="custom", backend=backend)
+        limiter.wait()
+        limiter.delay(0)
+
+        key = "custom:600rpm:1"
+        assert backend.calls == [("reserve", key, 0.1), ("delay", key, 0.0)]
+
+
+@pytest.mark.skipif(not os.getenv("REDIS_URL"), reason="REDIS_URL not set")
+class TestRedisBackend:
+    """Tests against a real Redis server (e.g. a local container)."""
+
+    def test_budget_shared_between_clients(self):
+        """Test two clients on one key share the budget."""
+        redis = pytest.importorskip("redis")
+        client = redis.Redis.from_url(os.environ["REDIS_URL"])
+        key = f"test-{time.time()}"
+        first = RateLimiter(rpm=1200, name=key, backend=RedisBackend(client))
+        second = RateLimiter(rpm=1200, name=key, backend=RedisBackend(client))
+
+        first.wait()
+        start = time.monotonic()
+        second.wait()
+        assert time.monotonic() - start >= 0.04
+
+
+class TestTokenBucket:
+    """Tests for burst capacity and weighted/non-blocking acquires."""
+
+    def test_capacity_allows_burst(self):
+        """Test a full bucket serves `capacity` requests without waiting."""
+        limiter = RateLimiter(rpm=60, capacity=5, name="burst")
+
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        assert time.monotonic() - start < 0.05
+        assert limiter.try_acquire() is False
+
+    def test_default_capacity_spaces_requests(self):
+        """Test the default capacity of 1 keeps the strict interval."""
+        limiter = RateLimiter(rpm=60, name="strict")
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+
+    def test_weighted_acquire(self):
+        """Test acquire(n) takes n tokens at once."""
+        limiter = RateLimiter(rpm=60, capacity=10, name="weighted")
+
+        assert limiter.acquire(8) is True
+        assert limiter.try_acquire(3) is False
+        assert limiter.try_acquire(2) is True
+        assert limiter.try_acquire() is False
+
+    def test_refill_rate(self):
+        """Test tokens come back at rpm / 60 per second."""
+        limiter = RateLimiter(rpm=1200, capacity=2, name="refill")
+        assert limiter.refill_rate == pytest.approx(20.0)
+        limiter.acquire(2)
+
+        time.sleep(0.06)
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+
+    def test_acquire_timeout_takes_nothing(self):
+        """Test a timed-out acquire leaves the bucket untouched."""
+        limiter = RateLimiter(rpm=1200, capacity=1, name="timeout")
+        limiter.acquire()
+
+        assert limiter.acquire(timeout=0.0) is False
+        assert limiter.acquire(timeout=0.2) is True
+
+    def test_waiters_sleep_outside_lock(self):
+        """Test try_acquire answers immediately while other threads sleep."""
+        limiter = RateLimiter(rpm=300, name="sleepers")
+        limiter.acquire()
+        sleeper = threading.Thread(target=limiter.acquire)
+        sleeper.start()
+        time.sleep(0.02)
+
+        start = time.monotonic()
+        assert limiter.try_acquire() is False
+        assert time.monotonic() - start < 0.05
+        sleeper.join()
+
+    def test_async_acquire(self):
+        """Test aacquire awaits the same schedule."""
+        limiter = RateLimiter(rpm=1200, name="async")
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(3):
+                async with limiter:
+                    pass
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) >= 0.09
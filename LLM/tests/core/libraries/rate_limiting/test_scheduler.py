@@ -0,0 +1,169 @@
+"""
+Tests for the process-wide budget scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from LLM.core.libraries.rate_limiting import (
+    INTERACTIVE_JOB,
+    PRIORITY_INTERACTIVE,
+    BudgetScheduler,
+    interactive_job,
+)
+
+
+def _wait_until(predicate, timeout=2.0):
+    """Poll until predicate() is true."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _start(job, tokens, granted):
+    """Acquire in a background thread, appending the job name when granted."""
+    thread = threading.Thread(
+        target=lambda: granted.append((job.name, job.acquire(tokens)))
+    )
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def scheduler():
+    """Provide a scheduler with a small TPM and effectively unlimited RPM."""
+    return BudgetScheduler(tpm=1000, rpm=6_000_000, name="test")
+
+
+class TestAdmission:
+    """Tests for basic acquire/reconcile behaviour."""
+
+    def test_acquire_within_budget(self, scheduler):
+        """Test requests that fit the window are admitted at once."""
+        job = scheduler.job("extraction")
+        reservation = job.acquire(300)
+
+        assert reservation.tokens == 300
+        assert scheduler.current_usage() == 300
+        assert job.stats()["granted"] == 1
+
+    def test_timeout_returns_none(self, scheduler):
+        """Test a request that cannot fit gives up after its timeout."""
+        job = scheduler.job("extraction")
+        job.acquire(1000)
+
+        assert job.acquire(10, timeout=0.05) is None
+        assert job.stats()["waiting"] == 0
+
+    def test_refund_admits_waiter(self, scheduler):
+        """Test reconciling an over-estimate lets queued requests in."""
+        job = scheduler.job("extraction")
+        first = job.acquire(1000)
+        granted = []
+        thread = _start(job, 500, granted)
+        _wait_until(lambda: job.stats()["waiting"] == 1)
+
+        job.reconcile(first, 200)
+        thread.join(2)
+
+        assert [name for name, _ in granted] == ["extraction"]
+
+    def test_delay_holds_back_admissions(self, scheduler):
+        """Test delay() (e.g. from Retry-After) pauses every job."""
+        job = scheduler.job("extraction")
+        scheduler.delay(0.1)
+
+        assert job.acquire(10, timeout=0.02) is None
+        start = time.monotonic()
+        assert job.acquire(10) is not None
+        assert time.monotonic() - start >= 0.05
+
+    def test_configure_admits_waiter(self, scheduler):
+        """Test raising the budget admits requests queued on the old one."""
+        job = scheduler.job("extraction")
+        job.acquire(1000)
+        granted = []
+        thread = _start(job, 500, granted)
+        _wait_until(lambda: job.stats()["waiting"] == 1)
+
+        scheduler.configure(tpm=2000)
+        thread.join(2)
+
+        assert [name for name, _ in granted] == ["extraction"]
+        assert scheduler.stats()["tpm"] == 2000
+
+    def test_weight_must_be_positive(self, scheduler):
+        """Test invalid weights are rejected."""
+        with pytest.raises(ValueError):
+            scheduler.job("bad", weight=0)
+
+    def test_interactive_job_keeps_explicit_priority(self):
+        """Test interactive_job() only sets the priority when registering."""
+        BudgetScheduler.reset_instance()
+        try:
+            assert interactive_job().priority == PRIORITY_INTERACTIVE
+            BudgetScheduler.get_instance().job(INTERACTIVE_JOB, priority=5)
+
+            assert interactive_job().priority == 5
+        finally:
+            BudgetScheduler.reset_instance()
+
+
+class TestPriority:
+    """Tests for priority admission."""
+
+    def test_interactive_admitted_before_batch(self, scheduler):
+        """Test interactive requests jump ahead of queued batch requests."""
+        batch = scheduler.job("batch")
+        interactive = scheduler.job("dashboard", priority=PRIORITY_INTERACTIVE)
+        held = batch.acquire(1000)
+        granted = []
+
+        threads = [_start(batch, 600, granted)]
+        _wait_until(lambda: batch.stats()["waiting"] == 1)
+        threads.append(_start(interactive, 600, granted))
+        _wait_until(lambda: interactive.stats()["waiting"] == 1)
+
+        batch.release(held)
+        _wait_until(lambda: len(granted) == 1)
+        assert granted[0][0] == "dashboard"
+        assert batch.stats()["waiting"] == 1
+
+        interactive.release(granted[0][1])
+        for thread in threads:
+            thread.join(2)
+        assert [name for name, _ in granted] == ["dashboard", "batch"]
+
+
+class TestFairShare:
+    """Tests for weighted sharing between equal-priority jobs."""
+
+    def test_capacity_split_by_weight(self, scheduler):
+        """Test a 1:3 weight ratio yields a 1:3 split of admitted tokens."""
+        light = scheduler.job("light", weight=1.0)
+        heavy = scheduler.job("heavy", weight=3.0)
+        held = scheduler.job("filler").acquire(1000)
+        granted = []
+
+        threads = []
+        for _ in range(40):
+            threads.append(_start(light, 25, granted))
+            threads.append(_start(heavy, 25, granted))
+        _wait_until(
+            lambda: light.stats()["waiting"] + heavy.stats()["waiting"] == 80
+        )
+
+        # Room for exactly 40 of the 80 queued requests
+        light.release(held)
+        _wait_until(lambda: len(granted) == 40)
+
+        assert light.stats()["granted"] == 10
+        assert heavy.stats()["granted"] == 30
+
+        for _, reservation in list(granted):
+            light.release(reservation)
+        for thread in threads:
+            thread.join(2)
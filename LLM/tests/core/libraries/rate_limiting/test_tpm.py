@@ -0,0 +1,107 @@
+"""
+Tests for the TPM limiter.
+"""
+
+import threading
+import time
+
+from LLM.core.libraries.rate_limiting import TPMLimiter
+
+
+class TestTPMLimiter:
+    """Tests for TPMLimiter reserve/reconcile accounting."""
+
+    def test_reservations_counted_once(self):
+        """Test each reservation adds its tokens exactly once."""
+        limiter = TPMLimiter(tpm=1000)
+        limiter.reserve(100)
+        limiter.reserve(200)
+
+        assert limiter.current_usage() == 300
+
+    def test_reconcile_replaces_estimate(self):
+        """Test actual usage replaces the reserved estimate."""
+        limiter = TPMLimiter(tpm=1000)
+        reservation = limiter.reserve(500)
+        limiter.reconcile(reservation, 120)
+
+        assert limiter.current_usage() == 120
+
+        limiter.reconcile(reservation, None)
+        assert limiter.current_usage() == 120
+
+    def test_blocks_until_window_has_capacity(self):
+        """Test reserve() waits for old usage to leave the window."""
+        limiter = TPMLimiter(tpm=100, window_seconds=0.2)
+        limiter.reserve(80)
+
+        start = time.monotonic()
+        limiter.reserve(50)
+        waited = time.monotonic() - start
+
+        assert 0.15 <= waited < 1.0
+        assert limiter.current_usage() == 50
+
+    def test_timeout_returns_none(self):
+        """Test a bounded wait gives up without reserving."""
+        limiter = TPMLimiter(tpm=100, window_seconds=10)
+        limiter.reserve(100)
+
+        assert limiter.reserve(1, timeout=0.01) is None
+        assert limiter.current_usage() == 100
+
+    def test_refund_wakes_waiters(self):
+        """Test reconciling an over-estimate admits a blocked caller early."""
+        limiter = TPMLimiter(tpm=100, window_seconds=10)
+        reservation = limiter.reserve(100)
+        admitted = threading.Event()
+
+        def reserve():
+            limiter.reserve(60)
+            admitted.set()
+
+        thread = threading.Thread(target=reserve)
+        thread.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+
+        limiter.reconcile(reservation, 30)
+        thread.join(timeout=2)
+        assert admitted.is_set()
+        assert limiter.current_usage() == 90
+
+    def test_raising_budget_wakes_waiters(self):
+        """Test set_tpm() admits a caller blocked on the old budget."""
+        limiter = TPMLimiter(tpm=100, window_seconds=10)
+        limiter.reserve(100)
+        admitted = threading.Event()
+
+        def reserve():
+            limiter.reserve(60)
+            admitted.set()
+
+        thread = threading.Thread(target=reserve)
+        thread.start()
+        time.sleep(0.05)
+        assert not admitted.is_set()
+
+        limiter.set_tpm(200)
+        thread.join(timeout=2)
+        assert admitted.is_set()
+        assert limiter.tpm == 200
+
+    def test_delay_holds_back_reservations(self):
+        """Test delay() (e.g. from a reset header) pauses the window."""
+        limiter = TPMLimiter(tpm=1000, name="test")
+        limiter.delay(0.1)
+
+        assert limiter.reserve(10, timeout=0.02) is None
+        start = time.monotonic()
+        assert limiter.reserve(10) is not None
+        assert time.monotonic() - start >= 0.05
+
+    def test_oversized_request_clamped(self):
+        """Test a request larger than the budget is admitted on an empty window."""
+        limiter = TPMLimiter(tpm=100)
+
+        assert limiter.reserve(500, timeout=0.01) is not None
@@ -0,0 +1 @@
+"""Tests for retry library."""
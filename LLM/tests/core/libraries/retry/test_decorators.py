@@ -0,0 +1,146 @@
+"""
+Tests for the retry decorators.
+"""
+
+import asyncio
+
+import pytest
+
+from LLM.core.libraries.retry import FixedDelay, with_retry
+
+
+class TestWithRetry:
+    """Tests for with_retry on plain functions and coroutines."""
+
+    def test_sync_retries_until_success(self):
+        """Test a failing function is retried per policy."""
+        calls = []
+
+        @with_retry(policy=FixedDelay(max_attempts=3, delay=0))
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ConnectionError("transient")
+            return "ok"
+
+        assert flaky() == "ok"
+        assert len(calls) == 3
+
+    def test_async_retries_until_success(self):
+        """Test coroutine functions are retried and stay awaitable."""
+        calls = []
+
+        @with_retry(policy=FixedDelay(max_attempts=3, delay=0))
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise ConnectionError("transient")
+            return "ok"
+
+        assert asyncio.iscoroutinefunction(flaky)
+        assert asyncio.run(flaky()) == "ok"
+        assert len(calls) == 2
+
+    def test_async_gives_up_after_max_attempts(self):
+        """Test the last error is raised once attempts are exhausted."""
+        calls = []
+
+        @with_retry(policy=FixedDelay(max_attempts=2, delay=0))
+        async def failing():
+            calls.append(1)
+            raise TimeoutError("slow")
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(failing())
+        assert len(calls) == 2
+
+    def test_quota_errors_not_retried(self):
+        """Test quota errors stop immediately for coroutines too."""
+        calls = []
+
+        class RateLimitError(Exception):
+            pass
+
+        @with_retry(policy=FixedDelay(max_attempts=3, delay=0))
+        async def over_quota():
+            calls.append(1)
+            raise RateLimitError("insufficient_quota")
+
+        with pytest.raises(RateLimitError):
+            asyncio.run(over_quota())
+        assert len(calls) == 1
+
+    def test_rate_limit_headers_set_delay_and_pause_limiter(self, monkeypatch):
+        """Test retry-after replaces the backoff and pauses the shared limiter."""
+        sleeps = []
+        monkeypatch.setattr("time.sleep", sleeps.append)
+        calls = []
+
+        class Response:
+            status_code = 429
+            headers = {"retry-after": "7"}
+
+            def json(self):
+                return {"error": {"code": "rate_limit_exceeded"}}
+
+        class RateLimitError(Exception):
+            response = Response()
+
+        class RecordingLimiter:
+            name = "shared"
+
+            def __init__(self):
+                self.delays = []
+
+            def delay(self, seconds):
+                self.delays.append(seconds)
+
+        limiter = RecordingLimiter()
+
+        @with_retry(policy=FixedDelay(max_attempts=2, delay=0.5), limiter=limiter)
+        def throttled():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RateLimitError("rate limit reached")
+            return "ok"
+
+        assert throttled() == "ok"
+        assert sleeps == [7.0]
+        assert limiter.delays == [7.0]
+
+    def test_header_delay_capped_at_max_delay(self, monkeypatch):
+        """Test a long reset hint is capped at the policy's max_delay."""
+        sleeps = []
+        monkeypatch.setattr("time.sleep", sleeps.append)
+        calls = []
+
+        class Response:
+            headers = {
+                "x-ratelimit-remaining-tokens": "0",
+                "x-ratelimit-reset-tokens": "6m0s",
+            }
+
+        class RateLimitError(Exception):
+            response = Response()
+
+        class RecordingLimiter:
+            name = "shared"
+
+            def __init__(self):
+                self.delays = []
+
+            def delay(self, seconds):
+                self.delays.append(seconds)
+
+        limiter = RecordingLimiter()
+
+        @with_retry(max_attempts=2, max_delay=5.0, limiter=limiter)
+        def throttled():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RateLimitError("429 Too Many Requests")
+            return "ok"
+
+        assert throttled() == "ok"
+        assert sleeps == [5.0]
+        assert limiter.delays == [5.0]